@@ -4,68 +4,93 @@ OTCC Document Analyzer CLI
 
 This script provides a command-line interface to the OTCC Document Analyzer.
 It processes documents and generates an assessment report for OTCC compliance.
+
+With --serve it runs as a long-lived worker instead: the NLP model and control
+catalog are loaded once, and assessment jobs are read from stdin as
+newline-delimited JSON, e.g.
+
+    {"job_id": "abc", "assessment_id": "abc", "documents": [...], "output_dir": "..."}
+
+Progress for each job is written to stdout as the same JSON lines the one-shot
+CLI prints, tagged with the job's "job_id". Jobs beyond --max-jobs wait in a
+queue of at most --max-queued jobs; when the queue is full a job is answered
+with a "Rejected" event instead. {"command": "status", "job_id": "abc"} reports
+a job's state and the queue depth and wait times, {"command": "cancel",
+"job_id": "abc"} cancels a queued or running job, and {"command": "shutdown"}
+or closing stdin stops the worker once queued and running jobs have finished.
+
+With --batch, the assessments of many backend manifest.json files are run in
+one pass: documents shared between them (by content) are analyzed once, and
+each assessment gets its own results.json next to its manifest.
+
+Each run also saves an index of every keyword match by document and section
+in evidence_index/ next to results.json; --query <output dir> with --control
+or --keyword answers lookups from it without extracting documents again.
+
+With --fast (or "fast": true in a job), controls whose status can no longer
+change are not scanned for in the remaining documents (see
+OTCCDocumentAnalyzer.analyze_documents_fast).
+
+PDF and Word documents are extracted in child processes under the
+--extract-timeout, --extract-page-timeout and --extract-max-mb limits (see
+document_extraction); results.json reports how each document's extraction
+went under "documentExtraction".
+
+Each run also saves its per-document evidence as evidence_state.json next to
+results.json. A later run (or job) given "added" and/or "removed" document
+lists instead of "documents" only analyzes the added documents and
+re-evaluates the controls whose evidence changed.
 """
 
 import argparse
 import json
 import os
 import sys
-from otcc_document_analyzer import OTCCDocumentAnalyzer
+import threading
+import time
+from itertools import chain
+from otcc_document_analyzer import OTCCDocumentAnalyzer, NLP_MODES, MAX_EVIDENCE_PER_CONTROL
+from evidence_cache import EvidenceCache, hash_file
+from control_catalog import CatalogError, load_catalog
+from evidence_index import INDEX_DIR, EvidenceIndex
+from columnar_export import EXPORT_FORMATS, ExportError, require_export_format, write_tables
+from document_extraction import ExtractionLimits
+from instrumentation import RunMetrics, profiled
 
-def main():
-    """Main entry point for the OTCC Document Analyzer CLI."""
-    parser = argparse.ArgumentParser(description='OTCC Document Analyzer')
-    parser.add_argument('--assessment-id', required=True, help='Assessment ID')
-    parser.add_argument('--documents', required=True, help='JSON string with document paths')
-    parser.add_argument('--output-dir', required=True, help='Output directory for results')
-    
-    args = parser.parse_args()
-    
-    # Parse documents
-    try:
-        document_paths = json.loads(args.documents)
-    except json.JSONDecodeError:
-        print(json.dumps({
-            "error": "Invalid JSON in documents parameter",
-            "status": "Failed"
-        }))
-        sys.exit(1)
-    
-    # Initialize analyzer
-    analyzer = OTCCDocumentAnalyzer()
-    
-    # Process each document
-    for i, doc_path in enumerate(document_paths):
-        progress = int(10 + (i / len(document_paths) * 70))
-        print(json.dumps({
-            "progress": progress,
-            "status": f"Analyzing document {i+1} of {len(document_paths)}"
-        }))
-        analyzer.analyze_document(doc_path)
-    
-    # Generate assessment
-    print(json.dumps({
-        "progress": 80,
-        "status": "Generating assessment results"
-    }))
-    results = analyzer.generate_assessment()
-    
-    # Generate recommendations
-    print(json.dumps({
-        "progress": 90,
-        "status": "Preparing recommendations"
-    }))
-    recommendations = analyzer.generate_recommendations()
-    
+# Per-document evidence saved next to results.json for incremental updates
+STATE_FILE = 'evidence_state.json'
+
+# Summary of a --batch run, written to --output-dir
+BATCH_SUMMARY_FILE = 'batch_summary.json'
+
+# Analyzer document types of the categories the backend gives documents in
+# manifests; other categories are guessed from the file name
+CATEGORY_DOCUMENT_TYPES = {
+    'Policy': 'policy',
+    'Procedure': 'procedure',
+    'Architecture': 'diagram',
+    'Logs': 'report'
+}
+
+# Jobs waiting for a free slot in --serve mode before new jobs are rejected
+DEFAULT_MAX_QUEUED = 8
+
+
+def print_event(event):
+    """Write a single JSON progress line to stdout."""
+    print(json.dumps(event), flush=True)
+
+
+def build_results(analyzer, recommendations):
+    """Build the results.json payload consumed by the backend and dashboard."""
     # Calculate overall compliance
     overall_compliance = analyzer.get_overall_compliance()
     domain_scores = analyzer.get_domain_scores()
-    
-    # Prepare final results
-    final_results = {
+
+    results = {
         "overallScore": overall_compliance,
         "domainScores": [
-            {"domain": domain, "score": score} 
+            {"domain": domain, "score": score}
             for domain, score in domain_scores.items()
         ],
         "findings": [
@@ -91,21 +116,749 @@ def main():
         ],
         "controlsAssessed": len(analyzer.controls),
         "documentsAnalyzed": len(analyzer.analyzed_documents),
+        "documentExtraction": [
+            {"document": doc_info["file_name"], **doc_info["extraction"]}
+            for doc_info in analyzer.analyzed_documents
+        ],
         "complianceStatus": "Non-Compliant" if overall_compliance < 50 else "Partially Compliant",
-        "assessmentDate": analyzer.assessment_date
+        "assessmentDate": analyzer.assessment_date,
+        "metrics": analyzer.metrics.summary()
     }
-    
-    # Write results to output directory
-    os.makedirs(args.output_dir, exist_ok=True)
-    output_path = os.path.join(args.output_dir, 'results.json')
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(final_results, f, indent=2)
-    
-    print(json.dumps({
+    if analyzer.short_circuited or analyzer.skipped_documents:
+        results["fastAssessment"] = analyzer.fast_assessment_summary()
+    return results
+
+
+def run_assessment(analyzer, document_paths, output_dir, emit=print_event,
+                   workers=1, executor=None, fast=False):
+    """
+    Analyze the documents of one assessment and write its results.json.
+
+    Args:
+        analyzer: A fresh OTCCDocumentAnalyzer holding no evidence yet
+        document_paths: List of document paths to analyze
+        output_dir: Directory that receives results.json
+        emit: Callable receiving each progress event dict
+        workers: Number of worker processes to analyze documents in
+        executor: Optional shared process pool from create_process_pool
+        fast: Stop scanning for controls once their status is settled (see
+            OTCCDocumentAnalyzer.analyze_documents_fast)
+
+    Returns:
+        Path of the written results.json
+    """
+    analyze_documents(analyzer, document_paths, emit, workers, executor, fast)
+    return finish_assessment(analyzer, output_dir, emit)
+
+
+def load_state(output_dir, state_path=None):
+    """Read the evidence state saved by an earlier run (default: the one in output_dir)."""
+    with open(state_path or os.path.join(output_dir, STATE_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def run_incremental_assessment(analyzer, state, output_dir, added_paths, removed_paths,
+                               emit=print_event, workers=1, executor=None):
+    """
+    Update an earlier assessment after documents were added or removed.
+
+    Only the added documents are analyzed; the evidence of removed documents
+    is retracted, and only the controls whose evidence changed are
+    re-evaluated. If the saved state cannot be used (e.g. the control catalog
+    changed), the remaining documents are analyzed again from scratch.
+
+    Args:
+        analyzer: A fresh OTCCDocumentAnalyzer holding no evidence yet
+        state: Evidence state of the earlier run (see load_state)
+        output_dir: Directory that receives results.json
+        added_paths: Paths of documents added since the earlier run
+        removed_paths: Paths of documents removed since the earlier run
+
+    Returns:
+        Path of the written results.json
+    """
+    removed = set(removed_paths)
+    # A document added again under the same path replaces its earlier version
+    replaced = removed | set(added_paths)
+
+    with analyzer.metrics.stage("restore_state"):
+        restored = analyzer.restore_state(state)
+
+    if not restored:
+        emit({
+            "progress": 10,
+            "status": "Saved evidence is from another analyzer or catalog version, from a fast "
+                      "assessment, or semantic evidence differs; analyzing all documents"
+        })
+        kept_paths = [
+            file_path
+            for file_path in chain(
+                (document["doc_info"]["file_path"] for document in state["documents"]),
+                state.get("skipped_documents", [])
+            )
+            if file_path not in replaced
+        ]
+        return run_assessment(analyzer, kept_paths + list(added_paths), output_dir, emit, workers, executor)
+
+    affected_controls = set()
+    for doc_path in replaced:
+        affected_controls |= analyzer.remove_document(doc_path)
+
+    first_added = len(analyzer.analyzed_documents)
+    analyze_documents(analyzer, list(added_paths), emit, workers, executor)
+    for evidence in analyzer.document_evidence[first_added:]:
+        affected_controls |= set(evidence)
+
+    return finish_assessment(analyzer, output_dir, emit, affected_controls)
+
+
+def analyze_documents(analyzer, document_paths, emit, workers=1, executor=None, fast=False):
+    """Analyze documents into the analyzer, reporting progress per document."""
+    emit({
+        "progress": 10,
+        "status": f"Analyzing {len(document_paths)} documents"
+    })
+
+    def document_done(completed, total, doc_path):
+        # Documents may finish out of order in a pool; report completed count
+        emit({
+            "progress": int(10 + (completed / total * 70)),
+            "status": f"Analyzed document {completed} of {total}",
+            "document": os.path.basename(doc_path)
+        })
+
+    # Process each document
+    with analyzer.metrics.stage("analyze_documents"):
+        analyze = analyzer.analyze_documents_fast if fast else analyzer.analyze_documents
+        analyze(
+            document_paths,
+            workers=workers,
+            progress_callback=document_done,
+            executor=executor
+        )
+
+    if analyzer.short_circuited or analyzer.skipped_documents:
+        emit({
+            "progress": 80,
+            "status": f"Fast assessment settled {len(analyzer.short_circuited)} controls early "
+                      f"and skipped {len(analyzer.skipped_documents)} documents",
+            "short_circuited": sorted(analyzer.short_circuited)
+        })
+
+
+def finish_assessment(analyzer, output_dir, emit, control_ids=None):
+    """
+    Evaluate the controls, write results.json and save the evidence state
+    used for later incremental updates.
+
+    Args:
+        control_ids: Optional controls to re-evaluate (default: all)
+
+    Returns:
+        Path of the written results.json
+    """
+    # Generate assessment
+    emit({
+        "progress": 80,
+        "status": "Generating assessment results"
+    })
+    with analyzer.metrics.stage("assessment"):
+        analyzer.generate_assessment(control_ids)
+
+    # Generate recommendations
+    emit({
+        "progress": 90,
+        "status": "Preparing recommendations"
+    })
+    with analyzer.metrics.stage("recommendations"):
+        recommendations = analyzer.generate_recommendations()
+
+    with analyzer.metrics.stage("export"):
+        # Prepare final results
+        final_results = build_results(analyzer, recommendations)
+
+        # Write results to output directory
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, 'results.json')
+
+        if analyzer.export_format == "json":
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(final_results, f, indent=2)
+        else:
+            # Control results and evidence go to tables; results.json stays a
+            # compact summary that references them
+            final_results["evidenceTables"] = write_tables(
+                analyzer, output_dir, analyzer.export_format, analyzer.assessment_id
+            )
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(final_results, f, separators=(",", ":"))
+
+        # Keep per-document evidence next to the results for incremental updates
+        analyzer.save_state(os.path.join(output_dir, STATE_FILE))
+        analyzer.save_index(os.path.join(output_dir, INDEX_DIR))
+
+    return output_path
+
+
+def load_manifest(manifest_path, documents_root=None):
+    """
+    Read an assessment manifest written by the backend.
+
+    Args:
+        manifest_path: Path of the manifest.json
+        documents_root: Directory relative document paths are resolved
+            against (default: the current directory)
+
+    Returns:
+        Tuple of (assessment ID, output directory, list of (document path,
+        document type or None))
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    # Results go next to the manifest, where the backend expects them
+    output_dir = os.path.dirname(os.path.abspath(manifest_path))
+    documents = [
+        (
+            os.path.join(documents_root or os.getcwd(), document["path"]),
+            CATEGORY_DOCUMENT_TYPES.get(document.get("category"))
+        )
+        for document in manifest["documents"]
+    ]
+    return manifest.get("assessmentId") or os.path.basename(output_dir), output_dir, documents
+
+
+def run_batch(analyzer, manifest_paths, summary_dir, emit=print_event, workers=1, documents_root=None):
+    """
+    Run many assessments whose documents overlap in one pass.
+
+    Documents are deduplicated across all manifests by content, each unique
+    document is analyzed once (in worker processes with workers > 1), and
+    its evidence is shared by every assessment that includes it. Each
+    assessment then gets its own results.json and evidence state next to
+    its manifest, and a batch summary with throughput figures is written to
+    summary_dir.
+
+    Returns:
+        The batch summary dict
+    """
+    started = time.perf_counter()
+    assessments = []
+    summaries = []
+    for manifest_path in manifest_paths:
+        try:
+            assessments.append(load_manifest(manifest_path, documents_root))
+        except (OSError, ValueError, KeyError) as e:
+            summaries.append({"manifest": manifest_path, "error": f"Cannot load manifest: {e}"})
+
+    # Identical uploads (in any assessment) are analyzed from their first
+    # path; a document that cannot be hashed is analyzed from each of its
+    # paths, which reports it as a failed extraction like a single run does
+    content_hashes = {}
+    unique_paths = {}
+    with analyzer.metrics.stage("hash_documents"):
+        for _, _, documents in assessments:
+            for doc_path, _ in documents:
+                if doc_path in content_hashes:
+                    continue
+                try:
+                    content_hashes[doc_path] = hash_file(doc_path)
+                except OSError:
+                    content_hashes[doc_path] = ("unreadable", doc_path)
+                unique_paths.setdefault(content_hashes[doc_path], doc_path)
+
+    referenced = sum(len(documents) for _, _, documents in assessments)
+    emit({
+        "progress": 10,
+        "status": f"Analyzing {len(unique_paths)} unique documents of {referenced} "
+                  f"in {len(assessments)} assessments"
+    })
+
+    def document_done(completed, total, doc_path):
+        emit({
+            "progress": int(10 + (completed / total * 70)),
+            "status": f"Analyzed document {completed} of {total}",
+            "document": os.path.basename(doc_path)
+        })
+
+    results = {}
+    with analyzer.metrics.stage("analyze_documents"):
+        document_results = analyzer.iter_document_results(
+            list(unique_paths.values()), workers=workers, progress_callback=document_done
+        )
+        for result, content_hash in zip(document_results, unique_paths):
+            results[content_hash] = result
+            if result is not None:
+                analyzer.metrics.record_document(result[0])
+                if analyzer.evidence_cache is not None and "cache" in result[0]:
+                    hit = result[0]["cache"] == "hit"
+                    analyzer.evidence_cache.record_lookup(hit)
+                    if not hit:
+                        analyzer.evidence_cache.evict()
+
+    # Fan the shared evidence out to each assessment
+    with analyzer.metrics.stage("assessments"):
+        for i, (assessment_id, output_dir, documents) in enumerate(assessments):
+            session = analyzer.new_session()
+            session.assessment_id = assessment_id
+            skipped = []
+            for doc_path, document_type in documents:
+                result = results.get(content_hashes[doc_path])
+                if result is None:
+                    # Of an unsupported type
+                    skipped.append(doc_path)
+                    continue
+                session.add_analyzed_document(result, doc_path, document_type)
+
+            output_path = finish_assessment(session, output_dir, lambda event: None)
+            summaries.append({
+                "assessment_id": assessment_id,
+                "results_path": output_path,
+                "documents": len(session.analyzed_documents),
+                "skipped_documents": skipped,
+                "overall_score": session.get_overall_compliance()
+            })
+            emit({
+                "progress": int(80 + (i + 1) / len(assessments) * 20),
+                "status": f"Assessed {i + 1} of {len(assessments)} assessments",
+                "assessment_id": assessment_id,
+                "results_path": output_path
+            })
+
+    elapsed = time.perf_counter() - started
+    metrics = analyzer.metrics.summary()
+    analyze_seconds = metrics["stages"]["analyze_documents"]["seconds"] or elapsed
+    unique_bytes = sum(result[0]["metrics"]["bytes"] for result in results.values() if result is not None)
+    summary = {
+        "assessments": summaries,
+        "documents": {
+            "referenced": referenced,
+            "unique": len(unique_paths),
+            "unique_bytes": unique_bytes
+        },
+        "throughput": {
+            "elapsed_seconds": round(elapsed, 3),
+            "assessments_per_sec": round(len(assessments) / elapsed, 3) if elapsed else None,
+            "unique_docs_per_sec": round(len(unique_paths) / analyze_seconds, 3) if analyze_seconds else None,
+            "referenced_docs_per_sec": round(referenced / elapsed, 3) if elapsed else None,
+            "mb_per_sec": round(unique_bytes / analyze_seconds / (1024 * 1024), 3) if analyze_seconds else None
+        },
+        "metrics": metrics
+    }
+
+    os.makedirs(summary_dir, exist_ok=True)
+    with open(os.path.join(summary_dir, BATCH_SUMMARY_FILE), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def query_index(index_path, control_id=None, keyword=None, limit=None, sections=False):
+    """
+    Answer a control or keyword lookup from a saved evidence index.
+
+    Args:
+        index_path: The index directory, or an output directory holding one
+        control_id: Control to list the supporting documents (and matches) of
+        keyword: Keyword to list the mentions of
+        limit: Maximum number of matches to list
+        sections: Summarize matches per document section instead of listing them
+
+    Returns:
+        The answer as a dict
+    """
+    started = time.perf_counter()
+    if os.path.isdir(os.path.join(index_path, INDEX_DIR)):
+        index_path = os.path.join(index_path, INDEX_DIR)
+    index = EvidenceIndex(index_path)
+
+    if control_id is not None:
+        answer = {"control_id": control_id, "documents": index.control_documents(control_id)}
+        postings = index.control_postings(control_id, None if sections else limit)
+    else:
+        answer = {"keyword": keyword}
+        postings = index.keyword_postings(keyword, None if sections else limit)
+    # The index of a fast assessment does not hold every match
+    missing = index.missing(control_id, keyword)
+    if missing is not None:
+        answer["partial"] = missing
+
+    if sections:
+        answer["sections"] = index.section_summary(postings)
+    else:
+        answer["matches"] = postings
+    answer["query_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return answer
+
+
+def create_analyzer(args):
+    """Create an analyzer configured from the command-line options."""
+    metrics = RunMetrics(print_event if args.emit_metrics else None)
+    try:
+        # Fail before any work if e.g. pyarrow is missing for Parquet export
+        require_export_format(args.export_format)
+        with metrics.stage("load_catalog"):
+            catalog = load_catalog(args.catalog, args.sector,
+                                   os.path.join(args.cache_dir, "catalogs") if args.cache_dir else None)
+    except (CatalogError, ExportError) as e:
+        print(json.dumps({
+            "error": str(e),
+            "status": "Failed"
+        }))
+        sys.exit(1)
+
+    evidence_cache = None
+    if args.cache_dir:
+        evidence_cache = EvidenceCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024))
+
+    return OTCCDocumentAnalyzer(
+        catalog=catalog,
+        evidence_cache=evidence_cache,
+        nlp_mode=args.nlp_mode,
+        metrics=metrics,
+        max_evidence=args.max_evidence or None,
+        export_format=args.export_format,
+        extraction_limits=None if args.no_extract_isolation else ExtractionLimits(
+            args.extract_timeout, args.extract_page_timeout, args.extract_max_mb
+        )
+    )
+
+
+def emit_cache_stats(analyzer, emit):
+    """Report the evidence cache statistics on the progress stream."""
+    if analyzer.evidence_cache is not None:
+        emit({
+            "status": "Cache statistics",
+            "cache": analyzer.evidence_cache.stats()
+        })
+
+
+def emit_metrics_summary(analyzer):
+    """Report the complete run metrics (including export) if metric events are enabled."""
+    if analyzer.metrics.emit:
+        analyzer.metrics.emit({"metric": "summary", **analyzer.metrics.summary()})
+
+
+def serve(base_analyzer, max_jobs, workers=1, cache_stats=False, emit_metrics=False,
+          max_queued=DEFAULT_MAX_QUEUED):
+    """
+    Run as a long-lived analyzer worker reading jobs from stdin.
+
+    The NLP model and control definitions are loaded once and shared by every
+    job; each job gets its own analyzer session so evidence never leaks
+    between assessments. At most max_jobs jobs run at once and at most
+    max_queued wait for a slot; further jobs are rejected with a "Rejected"
+    event so the caller can retry later. With workers > 1, documents of all
+    jobs are analyzed in one shared process pool. With emit_metrics, each job
+    also reports its stage and document metrics as events.
+    """
+    # Load the NLP model (if the mode uses one) before accepting jobs
+    base_analyzer.load_nlp()
+    process_pool = base_analyzer.create_process_pool(workers) if workers > 1 else None
+    output_lock = threading.Lock()
+
+    def emit_for(job_id):
+        def emit(event):
+            with output_lock:
+                print_event({"job_id": job_id, **event})
+        return emit
+
+    def run_job(job):
+        request = job.request
+        emit = emit_for(job.job_id)
+
+        def job_emit(event):
+            # Progress events are the points where a cancelled job stops
+            job.check_cancelled()
+            emit(event)
+
+        session = base_analyzer.new_session(RunMetrics(emit if emit_metrics else None))
+        session.assessment_id = request.get("assessment_id") or job.job_id
+        if "added" in request or "removed" in request:
+            output_path = run_incremental_assessment(
+                session,
+                load_state(request["output_dir"]),
+                request["output_dir"],
+                request.get("added", []),
+                request.get("removed", []),
+                job_emit,
+                executor=process_pool
+            )
+        else:
+            output_path = run_assessment(
+                session,
+                request["documents"],
+                request["output_dir"],
+                job_emit,
+                executor=process_pool,
+                fast=bool(request.get("fast"))
+            )
+        if cache_stats:
+            emit_cache_stats(base_analyzer, emit)
+        emit_metrics_summary(session)
+        return {"results_path": output_path}
+
+    # The job runner (and asyncio) is only needed by the worker
+    import asyncio
+    from job_runner import JobRunner
+
+    runner = JobRunner(
+        run_job,
+        max_concurrent=max_jobs,
+        max_queued=max_queued,
+        on_event=lambda job, event: emit_for(job.job_id)(event)
+    )
+    try:
+        asyncio.run(_serve_requests(runner, emit_for))
+    finally:
+        if process_pool:
+            process_pool.shutdown()
+
+
+async def _serve_requests(runner, emit_for):
+    """Read job requests and commands from stdin and hand them to the runner."""
+    import asyncio
+    from job_runner import QueueFullError
+
+    await runner.start()
+    loop = asyncio.get_running_loop()
+    emit_for(None)({"status": "Ready", "queue": runner.stats()})
+
+    while True:
+        # Reading stdin blocks, so it happens off the event loop
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            break
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            emit_for(None)({"error": "Invalid JSON job request", "status": "Failed"})
+            continue
+
+        job_id = request.get("job_id") or request.get("assessment_id")
+        command = request.get("command")
+        if command == "shutdown":
+            break
+        if command == "status":
+            status = {"status": "Queue status", "queue": runner.stats()}
+            if job_id:
+                status["job"] = runner.status(job_id)
+            emit_for(job_id)(status)
+            continue
+        if command == "cancel":
+            # A cancelled job reports a "Cancelled" event once it has stopped
+            if not runner.cancel(job_id):
+                emit_for(job_id)({"status": "Cancel failed", "reason": "Job is not queued or running"})
+            continue
+
+        incremental = "added" in request or "removed" in request
+        missing = [key for key in ("documents", "output_dir")
+                   if key not in request and not (incremental and key == "documents")]
+        if missing or not job_id:
+            emit_for(job_id)({
+                "error": f"Job request is missing: {', '.join(missing) or 'job_id'}",
+                "status": "Failed"
+            })
+            continue
+        if incremental and request.get("fast"):
+            emit_for(job_id)({"error": "Fast assessments cannot be updated incrementally", "status": "Failed"})
+            continue
+
+        try:
+            runner.submit(job_id, request)
+        except QueueFullError as e:
+            emit_for(job_id)({"error": str(e), "status": "Rejected", "queue": runner.stats()})
+        except ValueError as e:
+            emit_for(job_id)({"error": str(e), "status": "Failed"})
+        else:
+            emit_for(job_id)({"status": "Queued", "queue": runner.stats()})
+
+    # Let queued and running jobs finish before exiting
+    await runner.shutdown()
+
+
+def main():
+    """Main entry point for the OTCC Document Analyzer CLI."""
+    parser = argparse.ArgumentParser(description='OTCC Document Analyzer')
+    parser.add_argument('--assessment-id', help='Assessment ID')
+    parser.add_argument('--documents', help='JSON string with document paths')
+    parser.add_argument('--output-dir', help='Output directory for results')
+    parser.add_argument('--added',
+                        help='JSON list of documents added since the previous run in --output-dir '
+                             '(incremental update instead of --documents)')
+    parser.add_argument('--removed',
+                        help='JSON list of documents removed since the previous run in --output-dir')
+    parser.add_argument('--previous-state',
+                        help=f'Evidence state of the previous run (default: {STATE_FILE} in --output-dir)')
+    parser.add_argument('--batch', nargs='+', metavar='MANIFEST',
+                        help='Run the assessments of these manifest.json files in one pass, analyzing '
+                             f'documents shared between them once ({BATCH_SUMMARY_FILE} goes to --output-dir)')
+    parser.add_argument('--documents-root',
+                        help='Directory relative document paths in --batch manifests are resolved against '
+                             '(default: the current directory)')
+    parser.add_argument('--query',
+                        help=f'Answer a lookup from the evidence index in this output (or {INDEX_DIR}) '
+                             'directory instead of analyzing; use with --control or --keyword')
+    parser.add_argument('--control', help='Control ID to look up with --query')
+    parser.add_argument('--keyword', help='Keyword to look up with --query')
+    parser.add_argument('--sections', action='store_true',
+                        help='With --query, count matches per document section instead of listing them')
+    parser.add_argument('--limit', type=int, help='With --query, maximum number of matches to list')
+    parser.add_argument('--serve', action='store_true',
+                        help='Run as a long-lived worker reading JSON jobs from stdin')
+    parser.add_argument('--max-jobs', type=int, default=2,
+                        help='Maximum assessments analyzed concurrently in --serve mode')
+    parser.add_argument('--max-queued', type=int, default=DEFAULT_MAX_QUEUED,
+                        help='Maximum assessments waiting for a free slot in --serve mode; '
+                             'further jobs are rejected until the queue drains')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of worker processes used to analyze documents in parallel')
+    parser.add_argument('--extract-timeout', type=float, default=120,
+                        help='Seconds a PDF or Word document may take to extract; the pages extracted by then are kept')
+    parser.add_argument('--extract-page-timeout', type=float, default=30,
+                        help='Seconds a single PDF page may take to extract before it is skipped')
+    parser.add_argument('--extract-max-mb', type=float, default=2048,
+                        help='Memory limit (address space) of each extraction process in MB, 0 for none')
+    parser.add_argument('--no-extract-isolation', action='store_true',
+                        help='Extract PDF and Word documents in the analyzer process, without time or memory limits')
+    parser.add_argument('--export-format', choices=EXPORT_FORMATS, default='json',
+                        help='json: results.json only; ndjson or parquet (needs pyarrow): also write control '
+                             'results and evidence as controls/evidence tables next to a compact results.json')
+    parser.add_argument('--fast', action='store_true',
+                        help='Fast assessment: analyze the most useful documents first and stop scanning '
+                             'for controls whose status can no longer change')
+    parser.add_argument('--catalog',
+                        help='Control catalog file (JSON or YAML); defaults to the bundled OTCC catalog')
+    parser.add_argument('--sector',
+                        help='Sector overlay of the control catalog to apply')
+    parser.add_argument('--nlp-mode', choices=NLP_MODES, default='none',
+                        help='spaCy processing per document: none (keyword evidence only), '
+                             'tokenize (tokenizer and vectors), full pipeline, or semantic (also '
+                             'sentences similar to each control, by word vectors)')
+    parser.add_argument('--max-evidence', type=int, default=MAX_EVIDENCE_PER_CONTROL,
+                        help='Evidence matches kept per control, most confident first (0 keeps all); '
+                             'every match still counts towards the score')
+    parser.add_argument('--cache-dir',
+                        help='Directory for the cache of evidence per document (and of compiled control '
+                             'catalogs, in its catalogs subdirectory)')
+    parser.add_argument('--cache-max-mb', type=float, default=512,
+                        help='Size limit of the evidence cache in MB (least recently used entries are evicted)')
+    parser.add_argument('--cache-stats', action='store_true',
+                        help='Report evidence cache statistics (alone with --cache-dir: report and exit)')
+    parser.add_argument('--emit-metrics', action='store_true',
+                        help='Emit stage and per-document timing events on the progress stream '
+                             '(a summary is always written to results.json under "metrics")')
+    parser.add_argument('--profile',
+                        help='Write a cProfile (pstats) dump of the run to this file '
+                             '(one-shot runs; worker processes are not profiled)')
+
+    args = parser.parse_args()
+
+    assessing = args.serve or args.batch or args.documents or args.added is not None or args.removed is not None
+    if args.cache_stats and args.cache_dir and not assessing:
+        print_event({"cache": EvidenceCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024)).stats()})
+        return
+
+    if args.query:
+        if (args.control is None) == (args.keyword is None):
+            parser.error('--query needs exactly one of --control or --keyword')
+        try:
+            print_event(query_index(args.query, args.control, args.keyword, args.limit, args.sections))
+        except (OSError, KeyError) as e:
+            print(json.dumps({
+                "error": f"Cannot answer query: {e.args[-1]}",
+                "status": "Failed"
+            }))
+            sys.exit(1)
+        return
+
+    if args.serve:
+        if args.batch:
+            parser.error('--batch is not supported with --serve')
+        if args.profile:
+            parser.error('--profile is not supported with --serve')
+        if args.fast:
+            parser.error('--fast is not supported with --serve (set "fast" per job)')
+        serve(create_analyzer(args), max(1, args.max_jobs), args.workers, args.cache_stats, args.emit_metrics,
+              max(0, args.max_queued))
+        return
+
+    if args.batch:
+        if args.fast:
+            parser.error('--fast is not supported with --batch')
+        with profiled(args.profile):
+            analyzer = create_analyzer(args)
+            summary_dir = args.output_dir or os.getcwd()
+            summary = run_batch(analyzer, args.batch, summary_dir, workers=args.workers,
+                                documents_root=args.documents_root)
+
+        if args.cache_stats:
+            emit_cache_stats(analyzer, print_event)
+        print_event({
+            "progress": 100,
+            "status": "Batch complete",
+            "summary_path": os.path.join(summary_dir, BATCH_SUMMARY_FILE),
+            "throughput": summary["throughput"]
+        })
+        return
+
+    incremental = args.added is not None or args.removed is not None
+    if not (args.assessment_id and (args.documents or incremental) and args.output_dir):
+        parser.error('--assessment-id, --documents (or --added/--removed) and --output-dir are required')
+    if incremental and args.fast:
+        parser.error('--fast is not supported with --added/--removed')
+
+    # Parse documents
+    try:
+        document_lists = {
+            name: json.loads(value) if value is not None else []
+            for name, value in (("documents", args.documents), ("added", args.added), ("removed", args.removed))
+        }
+    except json.JSONDecodeError:
+        print(json.dumps({
+            "error": "Invalid JSON in documents parameter",
+            "status": "Failed"
+        }))
+        sys.exit(1)
+
+    with profiled(args.profile):
+        # Initialize analyzer
+        analyzer = create_analyzer(args)
+        analyzer.assessment_id = args.assessment_id
+
+        if incremental:
+            try:
+                state = load_state(args.output_dir, args.previous_state)
+            except (OSError, ValueError) as e:
+                print(json.dumps({
+                    "error": f"Cannot load previous evidence state: {e}",
+                    "status": "Failed"
+                }))
+                sys.exit(1)
+
+            run_incremental_assessment(
+                analyzer,
+                state,
+                args.output_dir,
+                document_lists["added"],
+                document_lists["removed"],
+                workers=args.workers
+            )
+        else:
+            run_assessment(analyzer, document_lists["documents"], args.output_dir, workers=args.workers,
+                           fast=args.fast)
+
+    if args.cache_stats:
+        emit_cache_stats(analyzer, print_event)
+    emit_metrics_summary(analyzer)
+
+    print_event({
         "progress": 100,
         "status": "Assessment complete"
-    }))
+    })
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+End-to-end analyzer benchmark on a synthetic OTCC document corpus.
+
+Generates policy, procedure, standard, diagram and report documents in each
+requested format and size, then repeatedly runs analyze_document on every
+document followed by generate_assessment, generate_recommendations and
+export_results_to_json. Reports docs/sec, MB/sec, latency percentiles per
+stage and per format, and peak memory (measured in a separate traced run).
+
+    python analyzer/benchmarks/bench_analyzer.py --sizes-kb 16 256 --save baseline.json
+    python analyzer/benchmarks/bench_analyzer.py --sizes-kb 16 256 --compare baseline.json
+
+With --compare, throughput and latencies are checked against the saved
+baseline and the run exits with status 1 if any is slower by more than
+--threshold (and, for latencies, by more than --min-delta-ms, so stages that
+take a fraction of a millisecond do not fail the check on timer noise).
+Throughput and latency percentiles are the median of those of the --repeat
+runs, so a run slowed down by something else on the machine does not count.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from control_catalog import load_catalog
+from instrumentation import peak_rss_bytes
+from otcc_document_analyzer import OTCCDocumentAnalyzer, NLP_MODES
+from synthetic_corpus import DOCUMENT_KINDS, FORMATS, generate_corpus
+
+PERCENTILES = (50, 90, 99)
+
+# Result figures compared against a baseline, and whether higher is better
+COMPARED_FIGURES = {"docs_per_sec": True, "mb_per_sec": True, "p50_ms": False, "p90_ms": False}
+
+# Latency increase (ms) below which a stage is not reported as regressed
+DEFAULT_MIN_DELTA_MS = 1.0
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    rank = max(1, -(-q * len(ordered) // 100))
+    return ordered[int(rank) - 1]
+
+
+def latency_summary(runs):
+    """
+    Summarize durations in milliseconds, given as one list per run: each
+    percentile is the median of the runs' percentiles.
+    """
+    seconds = [duration for run in runs for duration in run]
+    summary = {"count": len(seconds), "mean_ms": round(sum(seconds) / len(seconds) * 1000, 3)}
+    for q in PERCENTILES:
+        summary[f"p{q}_ms"] = round(statistics.median(percentile(run, q) for run in runs) * 1000, 3)
+    return summary
+
+
+def run_once(catalog, documents, nlp_mode, output_path, latencies):
+    """Analyze the corpus once, appending each stage's duration to latencies."""
+    analyzer = OTCCDocumentAnalyzer(catalog=catalog, nlp_mode=nlp_mode)
+    analyzer.load_nlp()
+
+    for path, kind in documents:
+        started = time.perf_counter()
+        analyzer.analyze_document(path, kind)
+        elapsed = time.perf_counter() - started
+        latencies.setdefault("analyze_document", []).append(elapsed)
+        latencies.setdefault(f"analyze_document.{os.path.splitext(path)[1][1:]}", []).append(elapsed)
+
+    for stage, run_stage in (
+        ("generate_assessment", analyzer.generate_assessment),
+        ("generate_recommendations", analyzer.generate_recommendations),
+        ("export_results_to_json", lambda: analyzer.export_results_to_json(output_path)),
+    ):
+        started = time.perf_counter()
+        run_stage()
+        latencies.setdefault(stage, []).append(time.perf_counter() - started)
+
+
+def run_benchmark(args):
+    catalog = load_catalog(args.catalog)
+    keywords = [keyword for control_info in catalog.controls.values() for keyword in control_info["keywords"]]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus_dir = args.corpus_dir or os.path.join(workdir, "corpus")
+        documents = generate_corpus(
+            corpus_dir, keywords, args.formats, args.sizes_kb, args.density, args.kinds, args.seed
+        )
+        corpus_bytes = sum(os.path.getsize(path) for path, _ in documents)
+        output_path = os.path.join(workdir, "results.json")
+
+        # Warm-up run: model loading and regex compilation
+        run_once(catalog, documents, args.nlp_mode, output_path, {})
+
+        runs = []
+        for _ in range(args.repeat):
+            latencies = {}
+            run_once(catalog, documents, args.nlp_mode, output_path, latencies)
+            runs.append(latencies)
+
+        # Allocation tracing slows everything down, so memory gets its own run
+        tracemalloc.start()
+        run_once(catalog, documents, args.nlp_mode, output_path, {})
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        analyze_seconds = statistics.median(sum(latencies["analyze_document"]) for latencies in runs)
+
+    return {
+        "config": {
+            "formats": list(args.formats),
+            "sizes_kb": list(args.sizes_kb),
+            "kinds": list(args.kinds),
+            "density": args.density,
+            "nlp_mode": args.nlp_mode,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "catalog_version": catalog.version
+        },
+        "corpus": {"documents": len(documents), "bytes": corpus_bytes},
+        "throughput": {
+            "docs_per_sec": round(len(documents) / analyze_seconds, 2),
+            "mb_per_sec": round(corpus_bytes / analyze_seconds / (1024 * 1024), 3)
+        },
+        "stages": {
+            stage: latency_summary([latencies[stage] for latencies in runs]) for stage in sorted(runs[0])
+        },
+        "memory": {
+            "traced_peak_bytes": traced_peak,
+            "peak_rss_bytes": peak_rss_bytes()
+        }
+    }
+
+
+def compare(result, baseline, threshold, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """
+    Compare a result with a baseline result. A latency only regresses if it
+    grew by more than threshold and by more than min_delta_ms.
+
+    Returns:
+        List of (figure, baseline value, current value, relative change, regressed)
+    """
+    rows = []
+
+    def check(name, old, new, higher_is_better):
+        if not old:
+            return
+        change = (new - old) / old
+        if higher_is_better:
+            regressed = change < -threshold
+        else:
+            regressed = change > threshold and new - old > min_delta_ms
+        rows.append((name, old, new, change, regressed))
+
+    for figure, higher_is_better in COMPARED_FIGURES.items():
+        if figure in result["throughput"]:
+            check(figure, baseline["throughput"].get(figure), result["throughput"][figure], higher_is_better)
+    for stage, summary in result["stages"].items():
+        old_summary = baseline["stages"].get(stage, {})
+        for figure, higher_is_better in COMPARED_FIGURES.items():
+            if figure in summary:
+                check(f"{stage}.{figure}", old_summary.get(figure), summary[figure], higher_is_better)
+    return rows
+
+
+def print_report(result):
+    corpus = result["corpus"]
+    print(f"Corpus: {corpus['documents']} documents, {corpus['bytes'] / 1024:,.0f} KB "
+          f"({', '.join(result['config']['formats'])}; nlp mode {result['config']['nlp_mode']})")
+    print(f"Throughput: {result['throughput']['docs_per_sec']} docs/sec, {result['throughput']['mb_per_sec']} MB/sec")
+    print(f"Peak memory: {result['memory']['traced_peak_bytes'] / (1024 * 1024):.1f} MB traced, "
+          f"{(result['memory']['peak_rss_bytes'] or 0) / (1024 * 1024):.1f} MB RSS")
+    print()
+    print(f"{'stage':<32} {'count':>6} {'mean ms':>9} " + " ".join(f"{'p%d ms' % q:>9}" for q in PERCENTILES))
+    for stage, summary in result["stages"].items():
+        print(f"{stage:<32} {summary['count']:>6} {summary['mean_ms']:>9} "
+              + " ".join(f"{summary['p%d_ms' % q]:>9}" for q in PERCENTILES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the analyzer on a synthetic OTCC corpus')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS),
+                        help='Document formats to generate')
+    parser.add_argument('--sizes-kb', type=int, nargs='+', default=[16, 128],
+                        help='Text size of the generated documents in KB')
+    parser.add_argument('--kinds', nargs='+', choices=list(DOCUMENT_KINDS), default=list(DOCUMENT_KINDS),
+                        help='Document kinds to generate')
+    parser.add_argument('--density', type=float, default=0.02,
+                        help='Fraction of words that are control keywords')
+    parser.add_argument('--nlp-mode', choices=NLP_MODES, default='none', help='NLP mode of the analyzer')
+    parser.add_argument('--catalog', help='Control catalog to assess against (defaults to the bundled catalog)')
+    parser.add_argument('--repeat', type=int, default=5, help='Measured runs over the corpus (after one warm-up)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic corpus')
+    parser.add_argument('--corpus-dir', help='Keep the generated corpus in this directory')
+    parser.add_argument('--save', help='Write the results to this JSON file (e.g. as a baseline)')
+    parser.add_argument('--compare', help='Baseline JSON file to compare the results with')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='Relative slowdown versus the baseline reported as a regression')
+    parser.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help='Latency increase in ms a stage must also exceed to be reported as a regression')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+
+    if not args.compare:
+        return
+
+    with open(args.compare, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline["config"] != result["config"]:
+        print("Warning: baseline was measured with a different configuration", file=sys.stderr)
+
+    rows = compare(result, baseline, args.threshold, args.min_delta_ms)
+    regressions = [row for row in rows if row[4]]
+    print()
+    print(f"{'figure':<48} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, old, new, change, regressed in rows:
+        print(f"{name:<48} {old:>10} {new:>10} {change:>+8.1%}{'  SLOWER' if regressed else ''}")
+
+    if regressions:
+        print(f"\n{len(regressions)} figures regressed by more than {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark keyword scanning time versus control catalog size.
+
+Compares the original approach (one case-insensitive re.finditer per keyword
+per control) with the single-pass KeywordMatcher on a synthetic document, and
+checks that both report the same (control, keyword, offset) tuples.
+
+    python analyzer/benchmarks/bench_keyword_matcher.py --sizes 6 50 200 800
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_matcher import KeywordMatcher
+
+# Real OTCC phrasing mixed with filler words so hit rates look like policy text
+OTCC_TERMS = [
+    "security policy", "firewall", "DMZ", "backup", "backup procedure", "event log",
+    "audit trail", "SIEM", "network segmentation", "air gap", "security zone",
+    "policy review", "annual review", "vendor security", "vendor management",
+    "disaster recovery", "business continuity", "log retention", "remote access",
+    "patch management", "asset inventory", "incident response", "access control",
+]
+FILLER = (
+    "the plant operators coordinate with engineering staff to maintain safe "
+    "operation of control systems across all sites and substations each shift"
+).split()
+
+
+def make_vocabulary(rng, size=2000):
+    """Generate pseudo-words used to build synthetic control keywords."""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def make_catalog(rng, vocabulary, size):
+    """Generate a synthetic control catalog with the given number of controls."""
+    controls = {}
+    for i in range(size):
+        keywords = rng.sample(OTCC_TERMS, 2) + [
+            " ".join(rng.sample(vocabulary, rng.randint(1, 3))) for _ in range(6)
+        ]
+        controls[f"{i // 100 + 1}-{i // 10 % 10 + 1}-{i % 10 + 1}"] = {"keywords": keywords}
+    return controls
+
+
+def make_text(rng, vocabulary, size_kb):
+    """Generate synthetic document text of roughly the given size."""
+    words = []
+    length = 0
+    while length < size_kb * 1024:
+        roll = rng.random()
+        if roll < 0.02:
+            word = rng.choice(OTCC_TERMS).upper() if roll < 0.005 else rng.choice(OTCC_TERMS)
+        elif roll < 0.10:
+            word = rng.choice(vocabulary)
+        else:
+            word = rng.choice(FILLER)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def scan_per_keyword(controls, text):
+    """The original approach: rescan the text once per keyword per control."""
+    hits = []
+    for control_id, control_info in controls.items():
+        for keyword in control_info["keywords"]:
+            for match in re.finditer(re.escape(keyword), text, re.IGNORECASE):
+                hits.append((control_id, keyword, match.start()))
+    return hits
+
+
+def scan_single_pass(controls, matcher, text):
+    """Scan the text once with the compiled matcher."""
+    keyword_hits = matcher.find_all(text)
+    hits = []
+    for control_id, control_info in controls.items():
+        for keyword in control_info["keywords"]:
+            for start, _ in keyword_hits.get(keyword, ()):
+                hits.append((control_id, keyword, start))
+    return hits
+
+
+def best_of(repeat, func, *args):
+    """Run func repeat times and return (best seconds, last result)."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark keyword scanning versus catalog size')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[6, 50, 200, 800],
+                        help='Catalog sizes (number of controls) to benchmark')
+    parser.add_argument('--text-kb', type=int, default=512, help='Synthetic document size in KB')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions per measurement (best is reported)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic corpus')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng)
+    text = make_text(rng, vocabulary, args.text_kb)
+
+    rows = []
+    for size in args.sizes:
+        controls = make_catalog(rng, vocabulary, size)
+
+        compile_start = time.perf_counter()
+        matcher = KeywordMatcher.from_controls(controls)
+        compile_time = time.perf_counter() - compile_start
+
+        legacy_time, legacy_hits = best_of(args.repeat, scan_per_keyword, controls, text)
+        matcher_time, matcher_hits = best_of(args.repeat, scan_single_pass, controls, matcher, text)
+
+        if legacy_hits != matcher_hits:
+            print(f"Mismatch between scanners for catalog size {size}", file=sys.stderr)
+            sys.exit(1)
+
+        rows.append({
+            "controls": size,
+            "keywords": len(matcher.keywords),
+            "hits": len(matcher_hits),
+            "compile_ms": round(compile_time * 1000, 2),
+            "per_keyword_ms": round(legacy_time * 1000, 2),
+            "single_pass_ms": round(matcher_time * 1000, 2),
+            "speedup": round(legacy_time / matcher_time, 2) if matcher_time else None
+        })
+
+    if args.json:
+        print(json.dumps({"text_chars": len(text), "results": rows}, indent=2))
+        return
+
+    print(f"Synthetic document: {len(text):,} characters")
+    print(f"{'controls':>8} {'keywords':>8} {'hits':>8} {'compile ms':>11} "
+          f"{'per-keyword ms':>15} {'single-pass ms':>15} {'speedup':>8}")
+    for row in rows:
+        print(f"{row['controls']:>8} {row['keywords']:>8} {row['hits']:>8} {row['compile_ms']:>11} "
+              f"{row['per_keyword_ms']:>15} {row['single_pass_ms']:>15} {row['speedup']:>8}")
+
+
+if __name__ == "__main__":
+    main()
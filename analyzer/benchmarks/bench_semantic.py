@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark semantic sentence matching throughput.
+
+Embeds a synthetic document's sentences with the spaCy model and scores them
+against every control of the catalog with SemanticMatcher (batched nlp.pipe,
+one matrix product per batch, top-K per control), and compares it with the
+naive approach on a sample of the sentences: one nlp() call per sentence and
+a Doc.similarity per sentence and control description or keyword. Both must
+select the same sentences for each control.
+
+    python analyzer/benchmarks/bench_semantic.py --sentences 20000
+    python analyzer/benchmarks/bench_semantic.py --model en_core_web_lg --threshold 0.75
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from control_catalog import load_catalog
+from otcc_document_analyzer import NLP_MODEL, NLP_TRAINED_COMPONENTS
+from semantic_matching import SEMANTIC_THRESHOLD, SEMANTIC_TOP_K, SemanticMatcher
+from synthetic_corpus import FILLER
+
+
+def make_sentences(rng, catalog, count):
+    """
+    Generate sentences of filler text mixed with words of the control
+    descriptions, so that some of them resemble a control without using its
+    keywords.
+    """
+    description_words = [
+        word.strip(".,()").lower()
+        for control_info in catalog.controls.values()
+        for word in control_info["description"].split()
+    ]
+    sentences = []
+    offset = 0
+    for _ in range(count):
+        words = [
+            rng.choice(description_words) if rng.random() < 0.3 else rng.choice(FILLER)
+            for _ in range(rng.randint(8, 30))
+        ]
+        text = " ".join(words).capitalize() + "."
+        sentences.append((offset, offset + len(text), text))
+        offset += len(text) + 1
+    return sentences
+
+
+def match_naive(nlp, catalog, matcher, sentences):
+    """
+    Compare every sentence with every control description and keyword one
+    Doc.similarity at a time, keeping the same top-K sentences per control.
+    """
+    control_docs = {
+        control_id: [nlp(control_info["description"])] + [nlp(keyword) for keyword in dict.fromkeys(control_info["keywords"])]
+        for control_id, control_info in catalog.controls.items()
+    }
+    mentions = matcher.term_scorer.presence_matrix([text for _, _, text in sentences])
+    found = {control_id: [] for control_id in catalog.controls}
+    for row, (_, _, text) in enumerate(sentences):
+        doc = nlp(text)
+        for control_id, docs in control_docs.items():
+            keywords = catalog.controls[control_id]["keywords"]
+            if mentions[row, matcher.term_scorer.column_indexes(keywords)].any():
+                continue
+            similarity = max(doc.similarity(control_doc) if doc.vector_norm and control_doc.vector_norm else 0.0
+                             for control_doc in docs)
+            if similarity >= matcher.threshold:
+                found[control_id].append((-similarity, row))
+    return {
+        control_id: [row for _, row in sorted(rows)[:matcher.top_k]]
+        for control_id, rows in found.items() if rows
+    }
+
+
+def selected_rows(matches, sentences):
+    """Sentence rows selected per control by SemanticMatcher.match."""
+    row_by_start = {start: row for row, (start, _, _) in enumerate(sentences)}
+    return {
+        control_id: [row_by_start[start] for _, start, _, _, _ in control_matches]
+        for control_id, control_matches in matches.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark semantic sentence matching')
+    parser.add_argument('--model', default=NLP_MODEL, help='spaCy model with word vectors')
+    parser.add_argument('--sentences', type=int, default=20000, help='Sentences in the synthetic document')
+    parser.add_argument('--naive-sentences', type=int, default=500,
+                        help='Sentences compared one at a time for the naive baseline (0 to skip)')
+    parser.add_argument('--threshold', type=float, default=SEMANTIC_THRESHOLD, help='Similarity threshold')
+    parser.add_argument('--top-k', type=int, default=SEMANTIC_TOP_K, help='Sentences kept per control')
+    parser.add_argument('--catalog', help='Control catalog (defaults to the bundled catalog)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic sentences')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    import spacy
+
+    catalog = load_catalog(args.catalog)
+    load_start = time.perf_counter()
+    nlp = spacy.load(args.model, exclude=NLP_TRAINED_COMPONENTS)
+    load_time = time.perf_counter() - load_start
+
+    embed_start = time.perf_counter()
+    matcher = SemanticMatcher(catalog.controls, nlp, catalog.term_scorer, args.threshold, args.top_k)
+    embed_time = time.perf_counter() - embed_start
+
+    sentences = make_sentences(random.Random(args.seed), catalog, args.sentences)
+    match_start = time.perf_counter()
+    matches = matcher.match(nlp, sentences)
+    match_time = time.perf_counter() - match_start
+
+    result = {
+        "config": {"model": args.model, "controls": len(catalog.controls), "control_rows": len(matcher.labels),
+                   "threshold": args.threshold, "top_k": args.top_k},
+        "load_model_ms": round(load_time * 1000, 2),
+        "embed_controls_ms": round(embed_time * 1000, 2),
+        "sentences": len(sentences),
+        "match_ms": round(match_time * 1000, 2),
+        "sentences_per_sec": round(len(sentences) / match_time, 1),
+        "matched_controls": len(matches)
+    }
+
+    if args.naive_sentences:
+        sample = sentences[:args.naive_sentences]
+        sample_matches = matcher.match(nlp, sample)
+        naive_start = time.perf_counter()
+        naive_rows = match_naive(nlp, catalog, matcher, sample)
+        naive_time = time.perf_counter() - naive_start
+        if naive_rows != selected_rows(sample_matches, sample):
+            print("Mismatch between the naive and batched matchers", file=sys.stderr)
+            sys.exit(1)
+        naive_rate = len(sample) / naive_time
+        result["naive_sentences"] = len(sample)
+        result["naive_sentences_per_sec"] = round(naive_rate, 1)
+        result["speedup"] = round(result["sentences_per_sec"] / naive_rate, 2)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    config = result["config"]
+    print(f"Model {config['model']}: loaded in {result['load_model_ms']} ms; "
+          f"{config['controls']} controls ({config['control_rows']} descriptions and keywords) "
+          f"embedded in {result['embed_controls_ms']} ms")
+    print(f"Batched: {result['sentences']:,} sentences in {result['match_ms']} ms "
+          f"({result['sentences_per_sec']:,} sentences/sec), {result['matched_controls']} controls matched")
+    if "naive_sentences" in result:
+        print(f"Naive:   {result['naive_sentences']:,} sentences at {result['naive_sentences_per_sec']:,} sentences/sec "
+              f"(batched is {result['speedup']}x faster, same sentences selected)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark of the analyzer CLI.
+
+Runs analyzer_cli.py in fresh interpreter processes, the way the backend
+launches it for a one-shot assessment, and reports the wall time per
+scenario: the invalid-arguments error path and small assessments of text
+only, Word only, PDF only and mixed documents. Each run is made with
+-X importtime, so the report also shows which heavy dependencies the
+scenario imported and how long importing them took.
+
+    python analyzer/benchmarks/bench_startup.py --repeat 10
+    python analyzer/benchmarks/bench_startup.py --nlp-mode tokenize --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_corpus import generate_corpus
+
+ANALYZER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI_PATH = os.path.join(ANALYZER_DIR, "analyzer_cli.py")
+
+# Top-level packages whose import time is reported
+HEAVY_MODULES = ("spacy", "numpy", "PyPDF2", "docx", "pandas", "asyncio", "multiprocessing")
+
+# Scenario -> document formats of its assessment (None: the error path)
+SCENARIOS = {
+    "error": None,
+    "txt": ("txt", "md"),
+    "docx": ("docx",),
+    "pdf": ("pdf",),
+    "mixed": ("txt", "md", "docx", "pdf"),
+}
+
+# A few keywords are enough to give every scenario some evidence
+KEYWORDS = ("access control", "backup", "incident response", "network segmentation", "patch management")
+
+
+def parse_importtime(stderr):
+    """
+    Sum the cumulative import time (ms) of each top-level heavy module from
+    -X importtime output.
+    """
+    imported = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        # Top-level imports are the least indented entries of their package
+        name = parts[2].rstrip()
+        module = name.strip()
+        if module in HEAVY_MODULES:
+            depth = len(name) - len(name.lstrip())
+            previous = imported.get(module)
+            if previous is None or depth < previous[0]:
+                imported[module] = (depth, int(parts[1]) / 1000)
+    return {module: round(ms, 1) for module, (_, ms) in sorted(imported.items())}
+
+
+def scenario_args(scenario, documents, output_dir, nlp_mode):
+    """Command-line arguments of the CLI for a scenario."""
+    if SCENARIOS[scenario] is None:
+        return ["--assessment-id", "bench", "--documents", "not json", "--output-dir", output_dir]
+    paths = [path for path, _ in documents if path.rsplit(".", 1)[1] in SCENARIOS[scenario]]
+    return ["--assessment-id", "bench", "--documents", json.dumps(paths), "--output-dir", output_dir,
+            "--nlp-mode", nlp_mode]
+
+
+def run_scenario(scenario, documents, workdir, nlp_mode, repeat):
+    """Run a scenario repeat times, each in a new process."""
+    seconds = []
+    imported = {}
+    for run in range(repeat):
+        output_dir = os.path.join(workdir, f"{scenario}-{run}")
+        command = [sys.executable, "-X", "importtime", CLI_PATH]
+        command += scenario_args(scenario, documents, output_dir, nlp_mode)
+        started = time.perf_counter()
+        completed = subprocess.run(command, cwd=ANALYZER_DIR, capture_output=True, text=True)
+        seconds.append(time.perf_counter() - started)
+
+        expected = 1 if SCENARIOS[scenario] is None else 0
+        if completed.returncode != expected:
+            raise RuntimeError(f"Scenario {scenario} exited with status {completed.returncode}:\n"
+                               f"{completed.stdout}{completed.stderr[-2000:]}")
+        imported = parse_importtime(completed.stderr)
+
+    return {
+        "runs": repeat,
+        "median_ms": round(statistics.median(seconds) * 1000, 1),
+        "min_ms": round(min(seconds) * 1000, 1),
+        "max_ms": round(max(seconds) * 1000, 1),
+        "imports_ms": imported
+    }
+
+
+def run_benchmark(args):
+    with tempfile.TemporaryDirectory() as workdir:
+        documents = generate_corpus(os.path.join(workdir, "corpus"), KEYWORDS, sizes_kb=[args.size_kb],
+                                    kinds=("policy", "procedure"), seed=args.seed)
+        # Python itself, as the floor every scenario starts from
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        interpreter_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        results = {
+            scenario: run_scenario(scenario, documents, workdir, args.nlp_mode, args.repeat)
+            for scenario in args.scenarios
+        }
+
+    return {
+        "config": {"nlp_mode": args.nlp_mode, "size_kb": args.size_kb, "repeat": args.repeat},
+        "interpreter_ms": interpreter_ms,
+        "scenarios": results
+    }
+
+
+def print_report(result):
+    print(f"Interpreter start: {result['interpreter_ms']} ms (nlp mode {result['config']['nlp_mode']})")
+    print()
+    print(f"{'scenario':<10} {'median ms':>10} {'min ms':>8} {'max ms':>8}  imports (ms)")
+    for scenario, summary in result["scenarios"].items():
+        imports = ", ".join(f"{module} {ms}" for module, ms in summary["imports_ms"].items()) or "-"
+        print(f"{scenario:<10} {summary['median_ms']:>10} {summary['min_ms']:>8} {summary['max_ms']:>8}  {imports}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cold starts of the analyzer CLI')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS),
+                        help='Scenarios to run')
+    parser.add_argument('--nlp-mode', choices=('none', 'tokenize', 'full'), default='none',
+                        help='NLP mode of the analyzed assessments')
+    parser.add_argument('--size-kb', type=int, default=8, help='Text size of each generated document in KB')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per scenario')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic corpus')
+    parser.add_argument('--save', help='Write the results to this JSON file')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+
+
+if __name__ == "__main__":
+    main()
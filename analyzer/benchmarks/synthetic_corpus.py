@@ -0,0 +1,176 @@
+"""
+Synthetic OTCC document corpus for benchmarks.
+
+Generates policy, procedure, standard, diagram and report documents as .txt,
+.md, .docx and .pdf files of a given size, with control keywords from the
+catalog mixed into filler text at a given density. The same seed always
+produces the same corpus. PDFs are written directly (a minimal single-font
+text PDF) so no PDF library beyond the analyzer's own requirements is needed.
+"""
+
+import os
+import random
+
+import docx
+
+# Document kinds, named so that _guess_document_type recognizes them
+DOCUMENT_KINDS = {
+    "policy": "OT Security Policy",
+    "procedure": "Backup Procedure",
+    "standard": "Vendor Security Standard",
+    "diagram": "Network Architecture Diagram",
+    "report": "Event Log Report",
+}
+FORMATS = ("txt", "md", "docx", "pdf")
+
+FILLER = (
+    "the plant operators coordinate with engineering staff to maintain safe "
+    "operation of control systems across all sites and substations during each "
+    "shift and record any deviation in the maintenance system for later review"
+).split()
+
+PDF_LINE_CHARS = 95
+PDF_PAGE_LINES = 60
+
+
+def make_paragraphs(rng, keywords, size_bytes, density):
+    """
+    Generate paragraphs of filler text with keywords mixed in.
+
+    Args:
+        rng: random.Random to draw from
+        keywords: Keywords to mix in (e.g. all catalog keywords)
+        size_bytes: Approximate total text size
+        density: Fraction of words that are keywords
+    """
+    paragraphs = []
+    length = 0
+    while length < size_bytes:
+        words = []
+        for _ in range(rng.randint(40, 120)):
+            if rng.random() < density:
+                keyword = rng.choice(keywords)
+                # Vary the case, as real documents do
+                words.append(keyword.upper() if rng.random() < 0.1 else keyword)
+            else:
+                words.append(rng.choice(FILLER))
+        paragraph = " ".join(words).capitalize() + "."
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 1
+    return paragraphs
+
+
+def write_text(path, title, paragraphs, markdown=False):
+    """Write a plain-text (or Markdown) document."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"# {title}\n\n" if markdown else f"{title}\n\n")
+        for i, paragraph in enumerate(paragraphs):
+            if markdown and i % 10 == 0:
+                f.write(f"## Section {i // 10 + 1}\n\n")
+            f.write(paragraph + "\n\n")
+
+
+def write_docx(path, title, paragraphs):
+    """Write a Word document with a heading every ten paragraphs."""
+    document = docx.Document()
+    document.add_heading(title, 1)
+    for i, paragraph in enumerate(paragraphs):
+        if i % 10 == 0:
+            document.add_heading(f"Section {i // 10 + 1}", 2)
+        document.add_paragraph(paragraph)
+    document.save(path)
+
+
+def _wrap(text, width):
+    """Split text into lines of at most width characters at spaces."""
+    lines = []
+    line = ""
+    for word in text.split():
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, title, paragraphs):
+    """Write a minimal text PDF (Helvetica, A4 pages) of the paragraphs."""
+    lines = [title, ""]
+    for paragraph in paragraphs:
+        lines.extend(_wrap(paragraph, PDF_LINE_CHARS))
+        lines.append("")
+    pages = [lines[i:i + PDF_PAGE_LINES] for i in range(0, len(lines), PDF_PAGE_LINES)]
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content stream per page
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for page_lines in pages:
+        content = ["BT", "/F1 9 Tf", "12 TL", "40 800 Td"]
+        for line in page_lines:
+            content.append(f"({_pdf_escape(line)}) Tj T*")
+        content.append("ET")
+        stream = "\n".join(content).encode("latin-1", "replace")
+
+        page_ids.append(len(objects) + 1)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects) + 2} 0 R >>".encode("ascii")
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("ascii")
+
+    with open(path, 'wb') as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+        xref_offset = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset))
+
+
+def generate_corpus(directory, keywords, formats=FORMATS, sizes_kb=(64,), density=0.02,
+                    kinds=tuple(DOCUMENT_KINDS), seed=42):
+    """
+    Write one document per kind, format and size into directory.
+
+    Returns:
+        List of (path, document kind) tuples in a stable order
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    keywords = sorted(set(keywords))
+    documents = []
+
+    for size_kb in sizes_kb:
+        for kind in kinds:
+            title = DOCUMENT_KINDS[kind]
+            paragraphs = make_paragraphs(rng, keywords, size_kb * 1024, density)
+            for file_format in formats:
+                path = os.path.join(directory, f"{title} {size_kb}kb.{file_format}")
+                if file_format == "pdf":
+                    write_pdf(path, title, paragraphs)
+                elif file_format == "docx":
+                    write_docx(path, title, paragraphs)
+                else:
+                    write_text(path, title, paragraphs, markdown=file_format == "md")
+                documents.append((path, kind))
+
+    return documents
@@ -0,0 +1,196 @@
+"""
+Columnar export of an assessment's control results and evidence.
+
+Instead of nesting every evidence item in results.json, an assessment can be
+exported as two tables next to it, one row per control and one row per
+evidence item, written row by row (NDJSON) or in row groups (Parquet), so
+neither the rows nor the file are ever held in memory as a whole. results.json
+then only carries the summary and references the tables, and analytics across
+many assessments can scan the tables directly (e.g. with DuckDB or pandas).
+
+Parquet needs pyarrow, which is optional (pip install pyarrow).
+"""
+
+import json
+import os
+
+from evidence_records import top_records
+
+# "json" nests evidence in results.json; the others write the tables
+EXPORT_FORMATS = ("json", "ndjson", "parquet")
+
+TABLE_EXTENSIONS = {"ndjson": ".ndjson", "parquet": ".parquet"}
+
+CONTROLS_TABLE = "controls"
+EVIDENCE_TABLE = "evidence"
+
+# Rows buffered per Parquet row group
+PARQUET_ROW_GROUP_ROWS = 10000
+
+
+class ExportError(RuntimeError):
+    """Raised when an export format cannot be written."""
+
+
+def require_export_format(export_format):
+    """
+    Check that an export format is known and its dependencies are installed.
+
+    Raises:
+        ExportError: If it is not
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown export format: {export_format} (expected one of {', '.join(EXPORT_FORMATS)})")
+    if export_format == "parquet":
+        try:
+            import pyarrow
+        except ImportError:
+            raise ExportError("pyarrow is required for Parquet export (pip install pyarrow)")
+
+
+def _parquet_schemas():
+    import pyarrow as pa
+
+    return {
+        CONTROLS_TABLE: pa.schema([
+            ("assessment_id", pa.string()),
+            ("control_id", pa.string()),
+            ("domain", pa.string()),
+            ("subdomain", pa.string()),
+            ("status", pa.string()),
+            ("confidence", pa.float64()),
+            ("evidence_strength", pa.float64()),
+            ("evidence_count", pa.int64()),
+            ("keyword_counts", pa.map_(pa.string(), pa.int64())),
+            ("short_circuited", pa.bool_()),
+        ]),
+        EVIDENCE_TABLE: pa.schema([
+            ("assessment_id", pa.string()),
+            ("control_id", pa.string()),
+            ("rank", pa.int32()),
+            ("document", pa.string()),
+            ("document_type", pa.string()),
+            ("keyword", pa.string()),
+            ("context", pa.string()),
+            ("confidence", pa.float64()),
+            ("start", pa.int64()),
+            ("end", pa.int64()),
+            ("match_type", pa.string()),
+        ]),
+    }
+
+
+class _NdjsonTableWriter:
+    """Writes rows as compact JSON lines."""
+
+    def __init__(self, path, schema=None):
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, row):
+        self._file.write(json.dumps(row, separators=(",", ":")))
+        self._file.write("\n")
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetTableWriter:
+    """Writes rows to a Parquet file one row group at a time."""
+
+    def __init__(self, path, schema):
+        import pyarrow.parquet as pq
+
+        self._schema = schema
+        self._writer = pq.ParquetWriter(path, schema)
+        self._rows = []
+
+    def write(self, row):
+        if "keyword_counts" in row:
+            row = dict(row, keyword_counts=list(row["keyword_counts"].items()))
+        self._rows.append(row)
+        if len(self._rows) >= PARQUET_ROW_GROUP_ROWS:
+            self._flush()
+
+    def _flush(self):
+        import pyarrow as pa
+
+        if self._rows:
+            self._writer.write_table(pa.Table.from_pylist(self._rows, schema=self._schema))
+            self._rows = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+def control_rows(analyzer, assessment_id=None):
+    """Yield a row per control result of the analyzer's assessment."""
+    for control_id, result in analyzer.assessment_results.items():
+        yield {
+            "assessment_id": assessment_id,
+            "control_id": control_id,
+            "domain": result["domain"],
+            "subdomain": result["subdomain"],
+            "status": result["status"],
+            "confidence": result["confidence"],
+            "evidence_strength": result["evidence_strength"],
+            "evidence_count": result["evidence_count"],
+            "keyword_counts": result["keyword_counts"],
+            "short_circuited": result.get("short_circuited", False)
+        }
+
+
+def evidence_rows(analyzer, assessment_id=None):
+    """
+    Yield a row per reported evidence item, control by control with the
+    most confident item of each control first (rank 1).
+    """
+    for control_id in analyzer.assessment_results:
+        records = top_records(analyzer.evidence_map.get(control_id, []), analyzer.max_evidence)
+        for rank, (doc_info, record) in enumerate(records, start=1):
+            yield {"assessment_id": assessment_id, "control_id": control_id, "rank": rank,
+                   **record.to_item(doc_info)}
+
+
+def write_tables(analyzer, output_dir, export_format, assessment_id=None):
+    """
+    Write the controls and evidence tables of an assessed analyzer.
+
+    Args:
+        analyzer: An OTCCDocumentAnalyzer after generate_assessment
+        output_dir: Directory to write the tables to
+        export_format: "ndjson" or "parquet"
+        assessment_id: Optional assessment ID stored in every row
+
+    Returns:
+        The reference to the tables stored in results.json: the format and,
+        per table, its file name (relative to output_dir) and row count
+    """
+    require_export_format(export_format)
+    if export_format == "parquet":
+        writer_class, schemas = _ParquetTableWriter, _parquet_schemas()
+    else:
+        writer_class, schemas = _NdjsonTableWriter, {}
+
+    os.makedirs(output_dir, exist_ok=True)
+    tables = {}
+    for table, rows in ((CONTROLS_TABLE, control_rows), (EVIDENCE_TABLE, evidence_rows)):
+        file_name = table + TABLE_EXTENSIONS[export_format]
+        # Written under a temporary name so readers never see a partial table
+        tmp_path = os.path.join(output_dir, f"{file_name}.{os.getpid()}.tmp")
+        writer = writer_class(tmp_path, schemas.get(table))
+        count = 0
+        try:
+            try:
+                for row in rows(analyzer, assessment_id):
+                    writer.write(row)
+                    count += 1
+            finally:
+                writer.close()
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, os.path.join(output_dir, file_name))
+        tables[table] = {"file": file_name, "rows": count}
+
+    return {"format": export_format, "tables": tables}
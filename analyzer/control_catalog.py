@@ -0,0 +1,272 @@
+"""
+OTCC control catalog loading.
+
+Controls are defined in a JSON (or YAML) file:
+
+    {
+      "name": "...",
+      "version": "...",
+      "controls": {
+        "1-1-1": {
+          "domain": "...",
+          "subdomain": "...",
+          "description": "...",
+          "keywords": ["..."],
+          "required_evidence": ["..."]
+        }
+      },
+      "sectors": {
+        "<sector>": {
+          "controls": {"<control id>": {<fields to add or replace>}},
+          "remove": ["<control id>"]
+        }
+      }
+    }
+
+A sector overlay replaces the given fields of existing controls, adds new
+(complete) controls and removes listed ones. The validated catalog is
+compiled once into a ControlCatalog (keyword matcher, scoring terms and a
+domain index) and cached as a pickle, which is reused until the catalog
+file changes. Loading a pickle can run code, so the cache lives in a
+directory only the current user can write to and is ignored otherwise.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import re
+from collections import defaultdict
+
+from keyword_matcher import KeywordMatcher
+from evidence_scoring import TermPresenceScorer
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "controls", "otcc_controls.json")
+
+# Bump when the compiled form changes so stale pickles are rebuilt
+COMPILED_FORMAT_VERSION = 3
+
+
+def default_cache_dir():
+    """The per-user directory compiled catalogs are cached in by default."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "otcc-analyzer", "catalogs")
+
+CONTROL_ID_PATTERN = re.compile(r"^\d+(-\d+)+$")
+TEXT_FIELDS = ("domain", "subdomain", "description")
+TERM_FIELDS = ("keywords", "required_evidence")
+
+
+class CatalogError(ValueError):
+    """Raised when a control catalog file cannot be read or is invalid."""
+
+
+class ControlCatalog:
+    """
+    A validated control catalog compiled for matching.
+
+    Attributes:
+        controls: Dict of control ID -> control definition
+        version: Hash of the effective control definitions
+        keyword_matcher: KeywordMatcher over all control keywords
+        term_scorer: TermPresenceScorer over all scoring terms
+        controls_by_domain: Dict of domain -> list of control IDs
+    """
+
+    def __init__(self, controls, name=None, sector=None):
+        self.controls = controls
+        self.name = name
+        self.sector = sector
+        self.version = hashlib.sha256(
+            json.dumps(controls, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        self.keyword_matcher = KeywordMatcher.from_controls(controls)
+        self.term_scorer = TermPresenceScorer.from_controls(controls)
+
+        self.controls_by_domain = defaultdict(list)
+        for control_id, control_info in controls.items():
+            self.controls_by_domain[control_info["domain"]].append(control_id)
+        self.controls_by_domain = dict(self.controls_by_domain)
+
+
+def _read_catalog_file(path):
+    """Parse a JSON or YAML catalog file."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.lower().endswith(('.yaml', '.yml')):
+                try:
+                    import yaml
+                except ImportError:
+                    raise CatalogError("PyYAML is required to load YAML catalogs (pip install pyyaml)")
+                try:
+                    return yaml.safe_load(f)
+                except yaml.YAMLError as e:
+                    # Neither an OSError nor a ValueError
+                    raise CatalogError(f"Cannot parse control catalog {path}: {e}")
+            return json.load(f)
+    except OSError as e:
+        raise CatalogError(f"Cannot read control catalog {path}: {e}")
+    except ValueError as e:
+        if isinstance(e, CatalogError):
+            raise
+        raise CatalogError(f"Cannot parse control catalog {path}: {e}")
+
+
+def _validate_control(control_id, control_info, problems):
+    """Append a description of each problem with a control definition to problems."""
+    if not CONTROL_ID_PATTERN.match(str(control_id)):
+        problems.append(f"{control_id}: control ID must look like 1-1-1")
+    if not isinstance(control_info, dict):
+        problems.append(f"{control_id}: control definition must be an object")
+        return
+
+    for field in TEXT_FIELDS:
+        if not isinstance(control_info.get(field), str) or not control_info[field].strip():
+            problems.append(f"{control_id}: '{field}' must be a non-empty string")
+
+    for field in TERM_FIELDS:
+        terms = control_info.get(field)
+        if not isinstance(terms, list) or not terms:
+            problems.append(f"{control_id}: '{field}' must be a non-empty list")
+        elif not all(isinstance(term, str) and term.strip() for term in terms):
+            problems.append(f"{control_id}: '{field}' must only contain non-empty strings")
+
+
+def resolve_controls(data, sector=None):
+    """
+    Validate raw catalog data and apply a sector overlay.
+
+    Returns:
+        Dict of control ID -> control definition
+
+    Raises:
+        CatalogError: Listing every problem found
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("controls"), dict):
+        raise CatalogError("Control catalog must be an object with a 'controls' object")
+
+    controls = {control_id: dict(info) if isinstance(info, dict) else info
+                for control_id, info in data["controls"].items()}
+
+    if sector:
+        overlay = (data.get("sectors") or {}).get(sector)
+        if overlay is None:
+            raise CatalogError(f"Unknown sector overlay: {sector}")
+
+        for control_id in overlay.get("remove", []):
+            controls.pop(control_id, None)
+        for control_id, fields in (overlay.get("controls") or {}).items():
+            if not isinstance(fields, dict):
+                raise CatalogError(f"{control_id}: sector overlay entry must be an object")
+            controls[control_id] = {**controls.get(control_id, {}), **fields}
+
+    problems = []
+    if not controls:
+        problems.append("catalog defines no controls")
+    for control_id, control_info in controls.items():
+        _validate_control(control_id, control_info, problems)
+    if problems:
+        raise CatalogError("Invalid control catalog: " + "; ".join(problems))
+
+    return controls
+
+
+def compile_catalog(path, sector=None):
+    """Read, validate and compile a catalog file (without the compiled cache)."""
+    data = _read_catalog_file(path)
+    return ControlCatalog(resolve_controls(data, sector), name=data.get("name"), sector=sector)
+
+
+def _file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_catalog(path=None, sector=None, cache_dir=None):
+    """
+    Load a compiled control catalog, reusing the cached compiled form when
+    the catalog file is unchanged.
+
+    The cache is checked by file modification time and size first, and by
+    content hash if those differ (e.g. after a checkout), so unchanged
+    catalogs are never revalidated or recompiled.
+
+    Args:
+        path: Catalog file (defaults to the bundled OTCC catalog)
+        sector: Optional sector overlay to apply
+        cache_dir: Directory for compiled catalogs (default:
+            default_cache_dir()); it is created private to the current user,
+            and not used if it or a cached file could be written by others
+
+    Returns:
+        ControlCatalog
+    """
+    path = os.path.abspath(path or DEFAULT_CATALOG_PATH)
+    cache_dir = _private_dir(cache_dir or default_cache_dir())
+
+    try:
+        stat = os.stat(path)
+    except OSError as e:
+        raise CatalogError(f"Cannot read control catalog {path}: {e}")
+
+    if cache_dir is None:
+        return compile_catalog(path, sector)
+    cache_name = hashlib.sha256(f"{path}:{sector or ''}".encode("utf-8")).hexdigest()[:16]
+    cache_path = os.path.join(cache_dir, f"{cache_name}.pickle")
+
+    cached = None
+    try:
+        with open(cache_path, 'rb') as f:
+            if _is_private(os.fstat(f.fileno())):
+                cached = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError):
+        cached = None
+
+    if cached and cached.get("format") == COMPILED_FORMAT_VERSION:
+        if (cached["mtime_ns"], cached["size"]) == (stat.st_mtime_ns, stat.st_size):
+            return cached["catalog"]
+        source_hash = _file_hash(path)
+        if cached["source_hash"] == source_hash:
+            _write_compiled(cache_path, cached["catalog"], stat, source_hash)
+            return cached["catalog"]
+    else:
+        source_hash = _file_hash(path)
+
+    catalog = compile_catalog(path, sector)
+    _write_compiled(cache_path, catalog, stat, source_hash)
+    return catalog
+
+
+def _is_private(stat):
+    """Whether a file or directory belongs to this user and only they can write to it."""
+    if not hasattr(os, "getuid"):
+        # No POSIX owners or modes (Windows): rely on the user profile's ACLs
+        return True
+    return stat.st_uid == os.getuid() and not stat.st_mode & 0o022
+
+
+def _private_dir(path):
+    """Create a directory private to the current user; None if it is not private."""
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return path if _is_private(stat) else None
+
+
+def _write_compiled(cache_path, catalog, stat, source_hash):
+    """Store a compiled catalog; failing to write the cache is not an error."""
+    try:
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as f:
+            pickle.dump({
+                "format": COMPILED_FORMAT_VERSION,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "source_hash": source_hash,
+                "catalog": catalog
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
@@ -0,0 +1,312 @@
+"""
+Text extraction from PDF and Word documents, optionally isolated in a child
+process.
+
+A malformed upload can make a PDF library hang or exhaust memory. With
+ExtractionLimits, each document is extracted in a short-lived child process
+(forked from a small fork server, so starting one is cheap) whose address
+space is capped, and pages are streamed back to the analyzer as they are
+extracted. A page that raises is skipped; a page that hangs or takes the
+process down is skipped by killing the child and starting a new one at the
+next page; a document that runs past its time limit keeps the pages
+extracted so far. What happened is recorded in an ExtractionStatus, which is
+reported per document in the results.
+"""
+
+import multiprocessing
+import os
+import time
+
+# Reasons a page or document failed that may not recur on another run (so
+# the partial evidence is not cached)
+RETRYABLE_REASONS = ("timeout", "memory", "crashed")
+
+# Parser of each file type. The fork server imports them once for every
+# extraction process; the analyzer process itself only imports the parsers
+# of the file types it extracts without isolation. (Only installed packages
+# can be preloaded: the fork server does not see the analyzer's sys.path.)
+PARSER_MODULES = {".pdf": "PyPDF2", ".docx": "docx", ".doc": "docx"}
+
+_context = None
+
+
+class ExtractionLimits:
+    """Per-document limits of isolated extraction."""
+
+    def __init__(self, timeout=120.0, page_timeout=30.0, max_memory_mb=2048):
+        """
+        Args:
+            timeout: Seconds a document may take in total
+            page_timeout: Seconds a single page (or, for Word documents,
+                parsing the document) may take
+            max_memory_mb: Address space of the extraction process in MB
+                (None or 0 for no limit)
+        """
+        self.timeout = timeout
+        self.page_timeout = page_timeout
+        self.max_memory_mb = max_memory_mb
+
+
+class ExtractionStatus:
+    """How the extraction of one document went."""
+
+    def __init__(self, unit):
+        """
+        Args:
+            unit: What the document's chunks are ("pages", "paragraphs" or "blocks")
+        """
+        self.unit = unit
+        self.total = None
+        self.ok = 0
+        self.failed = []
+        self.reason = None
+        self.error = None
+        self.isolated = False
+        self.restarts = 0
+
+    def page_failed(self, page, reason, error):
+        self.failed.append({"page": page, "reason": reason, "error": error})
+
+    def document_failed(self, reason, error):
+        self.reason = reason
+        self.error = error
+
+    @property
+    def retryable(self):
+        """Whether anything failed in a way that may not recur."""
+        return self.reason in RETRYABLE_REASONS or any(
+            failure["reason"] in RETRYABLE_REASONS for failure in self.failed
+        )
+
+    @property
+    def state(self):
+        if self.error is not None and not self.ok:
+            return "failed"
+        if self.error is not None or self.failed:
+            return "partial"
+        return "ok"
+
+    def to_dict(self, seconds):
+        """The status reported for the document, with its extraction time."""
+        status = {"status": self.state, "seconds": round(seconds, 4), f"{self.unit}_ok": self.ok}
+        if self.total is not None:
+            status[self.unit] = self.total
+            skipped = self.total - self.ok - len(self.failed)
+            if skipped > 0:
+                status[f"{self.unit}_skipped"] = skipped
+        if self.failed:
+            status[f"{self.unit}_failed"] = self.failed
+        if self.error is not None:
+            status["reason"] = self.reason
+            status["error"] = self.error
+        if self.isolated:
+            status["isolated"] = True
+            if self.restarts:
+                status["restarts"] = self.restarts
+        return status
+
+
+def iter_extraction_events(file_path, start_page=0):
+    """
+    Extract a PDF or Word document, yielding events:
+
+        ("total", number of pages)              PDF only, first
+        ("chunk", text, section title, page)    page is None for Word
+        ("failed", page, reason, error)         a PDF page that raised
+
+    Pages are numbered from 1; start_page (0-based) skips the pages before
+    it. Errors that affect the whole document are raised.
+    """
+    if os.path.splitext(file_path)[1].lower() == '.pdf':
+        yield from _iter_pdf_events(file_path, start_page)
+    else:
+        yield from _iter_docx_events(file_path)
+
+
+def _iter_pdf_events(pdf_path, start_page):
+    import PyPDF2
+
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        pages = reader.pages
+        yield "total", len(pages)
+        for index in range(start_page, len(pages)):
+            number = index + 1
+            try:
+                text = pages[index].extract_text()
+            except MemoryError:
+                yield "failed", number, "memory", "Memory limit exceeded"
+                continue
+            except Exception as e:
+                yield "failed", number, "error", str(e) or type(e).__name__
+                continue
+            yield "chunk", text + "\n", f"Page {number}", number
+
+
+def _iter_docx_events(docx_path):
+    import docx
+
+    doc = docx.Document(docx_path)
+    heading_styles = {
+        style.style_id for style in doc.styles
+        if style.name and (style.name == "Title" or style.name.startswith("Heading"))
+    }
+    # A paragraph in a Title or Heading style starts a section named after it
+    for para in doc.paragraphs:
+        is_heading = para._p.style in heading_styles and para.text.strip()
+        yield "chunk", para.text + "\n", para.text.strip() if is_heading else None, None
+
+
+def iter_sections(file_path, status):
+    """
+    Yield (text, section title) chunks of a PDF or Word document extracted in
+    this process, recording failures in status.
+    """
+    try:
+        for event in iter_extraction_events(file_path):
+            if event[0] == "chunk":
+                status.ok += 1
+                yield event[1], event[2]
+            else:
+                _record(status, event)
+    except MemoryError:
+        status.document_failed("memory", "Memory limit exceeded")
+    except Exception as e:
+        status.document_failed("error", str(e) or type(e).__name__)
+
+
+def _record(status, event):
+    if event[0] == "total":
+        status.total = event[1]
+    elif event[0] == "failed":
+        status.page_failed(*event[1:])
+
+
+def iter_isolated_sections(file_path, limits, status):
+    """
+    Yield (text, section title) chunks of a PDF or Word document extracted in
+    a child process under limits, recording failures in status. Closing the
+    generator early stops the child.
+    """
+    status.isolated = True
+    file_ext = os.path.splitext(file_path)[1].lower()
+    is_pdf = file_ext == '.pdf'
+    deadline = time.monotonic() + limits.timeout
+    max_memory_bytes = int(limits.max_memory_mb * 1024 * 1024) if limits.max_memory_mb else None
+    next_page = 0
+
+    while True:
+        context = process_context()
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_extract_in_child, args=(sender, file_path, next_page, max_memory_bytes), daemon=True
+        )
+        process.start()
+        sender.close()
+        started = False
+        try:
+            while True:
+                # Starting the process only counts against the document's time
+                wait = deadline - time.monotonic()
+                if started:
+                    wait = min(wait, limits.page_timeout)
+                if wait <= 0 or not receiver.poll(wait):
+                    if time.monotonic() >= deadline:
+                        status.document_failed("timeout", f"Extraction timed out after {limits.timeout:g} s")
+                        return
+                    if not (is_pdf and status.total is not None):
+                        status.document_failed("timeout", f"Reading the document timed out after {limits.page_timeout:g} s")
+                        return
+                    # A page hangs: skip it
+                    status.page_failed(next_page + 1, "timeout",
+                                       f"Page extraction timed out after {limits.page_timeout:g} s")
+                    break
+
+                try:
+                    event = receiver.recv()
+                except EOFError:
+                    process.join()
+                    error = f"Extraction process exited with code {process.exitcode}"
+                    if not started:
+                        # Not the document's fault: every other one would fail the same way
+                        raise RuntimeError(
+                            f"{error} before it started; a script that extracts in isolated processes "
+                            "needs an if __name__ == \"__main__\" guard"
+                        )
+                    if not (is_pdf and status.total is not None and next_page < status.total):
+                        status.document_failed("crashed", error)
+                        return
+                    # A page took the process down (e.g. at the memory limit): skip it
+                    status.page_failed(next_page + 1, "crashed", error)
+                    break
+
+                if event[0] == "started":
+                    started = True
+                    continue
+                if event[0] == "done":
+                    return
+                if event[0] == "error":
+                    status.document_failed(event[1], event[2])
+                    return
+                if event[0] == "chunk":
+                    status.ok += 1
+                    if event[3] is not None:
+                        next_page = event[3]
+                    yield event[1], event[2]
+                else:
+                    _record(status, event)
+                    if event[0] == "failed":
+                        next_page = event[1]
+        finally:
+            if process.is_alive():
+                process.kill()
+            process.join()
+            receiver.close()
+
+        # Continue after the skipped page in a new process
+        next_page += 1
+        if next_page >= status.total:
+            return
+        status.restarts += 1
+
+
+def _extract_in_child(sender, file_path, start_page, max_memory_bytes):
+    """Extraction process: stream the events of iter_extraction_events to the parent."""
+    if max_memory_bytes:
+        try:
+            import resource
+            resource.setrlimit(resource.RLIMIT_AS, (max_memory_bytes, max_memory_bytes))
+        except (ImportError, ValueError, OSError):
+            # No address space limits on this platform
+            pass
+
+    try:
+        sender.send(("started",))
+        for event in iter_extraction_events(file_path, start_page):
+            sender.send(event)
+        sender.send(("done",))
+    except MemoryError:
+        sender.send(("error", "memory", "Memory limit exceeded"))
+    except Exception as e:
+        sender.send(("error", "error", str(e) or type(e).__name__))
+    finally:
+        sender.close()
+
+
+def process_context():
+    """
+    The multiprocessing context extraction processes are started from, set up
+    on the first call to preload every parser.
+
+    Processes that extract in isolation themselves (such as the analyzer's
+    pool workers) must be started from it too: a process forked from one that
+    started the fork server cannot use that server.
+    """
+    global _context
+    if _context is None:
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            _context = multiprocessing.get_context("forkserver")
+            _context.set_forkserver_preload(sorted(set(PARSER_MODULES.values())))
+        else:
+            _context = multiprocessing.get_context("spawn")
+    return _context
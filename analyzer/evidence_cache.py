@@ -0,0 +1,196 @@
+import gzip
+import hashlib
+import io
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+EVIDENCE_SUFFIX = ".evidence.json.gz"
+# Extracted text stored next to the evidence by earlier versions (never read,
+# only evicted)
+TEXT_SUFFIX = ".text.gz"
+
+
+def hash_file(file_path, block_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class EvidenceCache:
+    """
+    On-disk cache of per-document evidence, keyed by the document's content
+    hash plus the analyzer/control-catalog fingerprint.
+
+    Re-analyzing an unchanged document becomes a hash and a lookup. Entries
+    are evicted least-recently-used first once the cache grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_bytes: Size limit for all entries together
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        # Size of all entries, from the last scan plus the entries stored
+        # since (None until the first scan)
+        self.size_bytes = None
+
+    def key_for(self, content_hash, fingerprint):
+        """Build the cache key for a document content hash and analyzer fingerprint."""
+        return hashlib.sha256(f"{content_hash}:{fingerprint}".encode("utf-8")).hexdigest()
+
+    def _path(self, key, suffix):
+        return os.path.join(self.cache_dir, key[:2], key + suffix)
+
+    def get(self, key):
+        """
+        Look up cached evidence for a key.
+
+        Returns:
+            The stored entry dict, or None if the key is not cached
+        """
+        path = self._path(key, EVIDENCE_SUFFIX)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # Mark the entry as recently used for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key, entry):
+        """
+        Store an evidence entry for a key.
+
+        Returns:
+            The entry's size on disk in bytes
+        """
+        path = self._path(key, EVIDENCE_SUFFIX)
+        with self._open_atomic(path) as f:
+            f.write(json.dumps(entry))
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            # Already evicted by another process
+            size = 0
+        self.record_store(size)
+        return size
+
+    @contextmanager
+    def _open_atomic(self, path):
+        """
+        Open a gzipped text file for writing that only replaces the target path
+        once complete, so concurrent workers never read partial entries.
+        """
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as gz, \
+                    io.TextIOWrapper(gz, encoding='utf-8') as f:
+                yield f
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def record_lookup(self, hit):
+        """Count a lookup result."""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def record_store(self, size):
+        """
+        Count a stored entry of size bytes: by put, or for an entry a worker
+        process's copy of the cache stored.
+        """
+        self.stores += 1
+        if self.size_bytes is not None:
+            self.size_bytes += size
+
+    def _scan_entries(self):
+        """Return a list of (last_used, size, key) for all complete entries."""
+        entries = {}
+        if not os.path.isdir(self.cache_dir):
+            return []
+
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(EVIDENCE_SUFFIX):
+                    key = name[:-len(EVIDENCE_SUFFIX)]
+                elif name.endswith(TEXT_SUFFIX):
+                    key = name[:-len(TEXT_SUFFIX)]
+                else:
+                    continue
+
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+
+                last_used, size = entries.get(key, (0, 0))
+                if name.endswith(EVIDENCE_SUFFIX):
+                    last_used = stat.st_mtime
+                entries[key] = (last_used, size + stat.st_size)
+
+        return [(last_used, size, key) for key, (last_used, size) in entries.items()]
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+        The cache directory is only scanned on the first call and once the
+        entries stored since the last scan take it past max_bytes.
+        """
+        if self.size_bytes is not None and self.size_bytes <= self.max_bytes:
+            return
+
+        entries = self._scan_entries()
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for suffix in (EVIDENCE_SUFFIX, TEXT_SUFFIX):
+                try:
+                    os.remove(self._path(key, suffix))
+                except FileNotFoundError:
+                    pass
+            total -= size
+            self.evictions += 1
+        self.size_bytes = total
+
+    def stats(self):
+        """Return a report of lookups in this process and the cache's size on disk."""
+        entries = self._scan_entries()
+        self.size_bytes = sum(size for _, size, _ in entries)
+        lookups = self.hits + self.misses
+        return {
+            "cache_dir": self.cache_dir,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes
+        }
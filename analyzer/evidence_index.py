@@ -0,0 +1,315 @@
+"""
+Persistent, section-aware index of an assessment's keyword matches.
+
+Every keyword match of every document is recorded as a posting (offsets and
+the section it falls in: a Word heading or a PDF page). The index is written
+next to results.json as one shard per document plus a manifest that routes
+control and keyword lookups to the shards that can answer them, so
+questions such as "which documents support control 3-1-1" or "where is DMZ
+mentioned" are answered without extracting any document again.
+"""
+
+import base64
+import hashlib
+import json
+import os
+from array import array
+from bisect import bisect_right
+
+INDEX_DIR = "evidence_index"
+MANIFEST_FILE = "manifest.json"
+
+# Bump when the manifest or shard layout changes
+INDEX_FORMAT_VERSION = 1
+
+
+class DocumentIndex:
+    """
+    The postings of one document: the (start, end) offsets of every match of
+    each keyword, and where the document's sections start.
+    """
+
+    __slots__ = ("sections", "postings", "_section_starts")
+
+    def __init__(self, sections=None, postings=None):
+        # Sorted list of (start offset, section title)
+        self.sections = sections or []
+        # Keyword -> array of start, end offset pairs
+        self.postings = postings or {}
+        self._section_starts = None
+
+    def add_section(self, start, title):
+        self.sections.append((start, title))
+
+    def add(self, keyword, start, end):
+        offsets = self.postings.get(keyword)
+        if offsets is None:
+            offsets = self.postings[keyword] = array("q")
+        offsets.append(start)
+        offsets.append(end)
+
+    def counts(self):
+        """Number of matches per keyword."""
+        return {keyword: len(offsets) // 2 for keyword, offsets in self.postings.items()}
+
+    def section_at(self, offset):
+        """Title of the section an offset falls in (None before the first section)."""
+        if self._section_starts is None or len(self._section_starts) != len(self.sections):
+            self._section_starts = [start for start, _ in self.sections]
+        index = bisect_right(self._section_starts, offset) - 1
+        return self.sections[index][1] if index >= 0 else None
+
+    def iter_postings(self, keyword):
+        """Yield (start, end, section title) for every match of a keyword."""
+        offsets = self.postings.get(keyword, ())
+        for i in range(0, len(offsets), 2):
+            yield offsets[i], offsets[i + 1], self.section_at(offsets[i])
+
+    def to_dict(self):
+        """Serialize for index shards and the evidence cache."""
+        return {
+            "sections": [[start, title] for start, title in self.sections],
+            "postings": {
+                keyword: base64.b64encode(offsets.tobytes()).decode("ascii")
+                for keyword, offsets in self.postings.items()
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        postings = {}
+        for keyword, encoded in data["postings"].items():
+            offsets = array("q")
+            offsets.frombytes(base64.b64decode(encoded))
+            postings[keyword] = offsets
+        return cls([tuple(section) for section in data["sections"]], postings)
+
+
+def shard_name(file_path):
+    """File name of a document's shard (stable for the document's path)."""
+    return hashlib.sha1(file_path.encode("utf-8")).hexdigest()[:16] + ".json"
+
+
+def write_index(index_dir, documents, controls, versions, fast_assessment=None):
+    """
+    Bring an assessment's index in line with its analyzed documents.
+
+    Documents analyzed in this run carry their DocumentIndex in
+    doc_info["index"]; it is written as the document's shard and dropped from
+    doc_info. Documents restored from an earlier run keep their existing
+    shard, and shards of documents no longer in the assessment are removed.
+
+    Args:
+        index_dir: Directory of the index
+        documents: The analyzer's analyzed_documents (doc_info dicts)
+        controls: Control definitions by ID
+        versions: Dict of analyzer and catalog version stored in the manifest
+        fast_assessment: The analyzer's fast_assessment_summary() if it ran a
+            fast assessment. Documents scanned after a control was settled
+            have no postings for keywords only that control (or other
+            settled ones) uses, and skipped documents are not indexed at
+            all; the manifest records both so lookups can say so.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    previous = _read_manifest(index_dir)
+    if previous is not None and previous.get("versions") != versions:
+        previous = None
+    previous_documents = previous["documents"] if previous else {}
+
+    entries = {}
+    for doc_info in documents:
+        shard = shard_name(doc_info["file_path"])
+        document_index = doc_info.pop("index", None)
+        if document_index is not None:
+            with open(os.path.join(index_dir, shard), 'w', encoding='utf-8') as f:
+                json.dump(document_index.to_dict(), f, separators=(",", ":"))
+            terms = document_index.counts()
+        elif shard in previous_documents:
+            terms = previous_documents[shard]["terms"]
+        else:
+            # Never indexed (e.g. restored from a state older than the index)
+            continue
+
+        entries[shard] = {
+            "file_path": doc_info["file_path"],
+            "file_name": doc_info["file_name"],
+            "document_type": doc_info["document_type"],
+            "terms": terms
+        }
+
+    for file_name in os.listdir(index_dir):
+        if file_name.endswith(".json") and file_name != MANIFEST_FILE and file_name not in entries:
+            os.remove(os.path.join(index_dir, file_name))
+
+    manifest = {
+        "format": INDEX_FORMAT_VERSION,
+        "versions": versions,
+        "controls": {
+            control_id: list(dict.fromkeys(control_info["keywords"]))
+            for control_id, control_info in controls.items()
+        },
+        "documents": entries
+    }
+    if fast_assessment is not None:
+        manifest["incomplete"] = {
+            "short_circuited": sorted(fast_assessment["short_circuited"]),
+            "skipped_documents": [os.path.basename(path) for path in fast_assessment["skipped_documents"]]
+        }
+    tmp_path = os.path.join(index_dir, f"{MANIFEST_FILE}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    os.replace(tmp_path, os.path.join(index_dir, MANIFEST_FILE))
+
+
+def _read_manifest(index_dir):
+    try:
+        with open(os.path.join(index_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format") == INDEX_FORMAT_VERSION else None
+
+
+class EvidenceIndex:
+    """
+    Read access to an index written by write_index.
+
+    Document and control summaries come from the manifest alone; postings
+    are read only from the shards of documents that contain the term, and
+    each shard is read at most once.
+    """
+
+    def __init__(self, index_dir):
+        """
+        Raises:
+            FileNotFoundError: If the directory holds no index (of this format)
+        """
+        self.index_dir = index_dir
+        manifest = _read_manifest(index_dir)
+        if manifest is None:
+            raise FileNotFoundError(f"No evidence index in {index_dir}")
+        self.controls = manifest["controls"]
+        self.documents = manifest["documents"]
+        # What a fast assessment left out of the index (None if nothing)
+        self.incomplete = manifest.get("incomplete")
+        self._shards = {}
+
+    def _shard(self, shard):
+        if shard not in self._shards:
+            with open(os.path.join(self.index_dir, shard), 'r', encoding='utf-8') as f:
+                self._shards[shard] = DocumentIndex.from_dict(json.load(f))
+        return self._shards[shard]
+
+    def _terms(self, term):
+        """The indexed keywords a term refers to (keywords are matched ignoring case)."""
+        term = term.lower()
+        keywords = {keyword for keywords in self.controls.values() for keyword in keywords}
+        return [keyword for keyword in sorted(keywords) if keyword.lower() == term][:1]
+
+    def missing(self, control_id=None, keyword=None):
+        """
+        What the index may be missing for a lookup of a control or keyword,
+        after a fast assessment: the keywords looked up that only settled
+        controls use (documents analyzed after they were settled were not
+        scanned for them) and the documents that were not analyzed at all.
+
+        Returns:
+            Dict with keywords and skipped_documents, or None if the answer
+            is complete
+        """
+        if self.incomplete is None:
+            return None
+        keywords = self._control_keywords(control_id) if control_id is not None else self._terms(keyword)
+        settled = set(self.incomplete["short_circuited"])
+        unscanned = [
+            keyword for keyword in keywords
+            if all(control_id in settled for control_id, control_keywords in self.controls.items()
+                   if keyword in control_keywords)
+        ]
+        if not unscanned and not self.incomplete["skipped_documents"]:
+            return None
+        return {"keywords": unscanned, "skipped_documents": self.incomplete["skipped_documents"]}
+
+    def control_documents(self, control_id):
+        """
+        List the documents with matches for a control's keywords.
+
+        Returns:
+            List of dicts with document, document_type, matches and keyword
+            counts, most matches first
+
+        Raises:
+            KeyError: If the control is not in the catalog the index was built with
+        """
+        keywords = self._control_keywords(control_id)
+        documents = []
+        for entry in self.documents.values():
+            counts = {keyword: entry["terms"][keyword] for keyword in keywords if keyword in entry["terms"]}
+            if counts:
+                documents.append({
+                    "document": entry["file_name"],
+                    "document_type": entry["document_type"],
+                    "matches": sum(counts.values()),
+                    "keywords": counts
+                })
+        documents.sort(key=lambda document: -document["matches"])
+        return documents
+
+    def keyword_postings(self, term, limit=None):
+        """
+        List where a keyword is mentioned, in document order.
+
+        Returns:
+            List of dicts with document, section, start and end
+
+        Raises:
+            KeyError: If the term is not a keyword of the catalog
+        """
+        keywords = self._terms(term)
+        if not keywords:
+            raise KeyError(f"{term!r} is not an indexed keyword")
+        return self._postings(keywords, limit)
+
+    def control_postings(self, control_id, limit=None):
+        """List every match of a control's keywords, like keyword_postings."""
+        return self._postings(self._control_keywords(control_id), limit)
+
+    def _control_keywords(self, control_id):
+        if control_id not in self.controls:
+            raise KeyError(f"{control_id!r} is not a control of the indexed catalog")
+        return self.controls[control_id]
+
+    def _postings(self, keywords, limit):
+        postings = []
+        for shard, entry in self.documents.items():
+            matched = [keyword for keyword in keywords if keyword in entry["terms"]]
+            if not matched:
+                continue
+            document_index = self._shard(shard)
+            document_postings = sorted(
+                (start, end, section, keyword)
+                for keyword in matched
+                for start, end, section in document_index.iter_postings(keyword)
+            )
+            for start, end, section, keyword in document_postings:
+                postings.append({
+                    "document": entry["file_name"],
+                    "keyword": keyword,
+                    "section": section,
+                    "start": start,
+                    "end": end
+                })
+                if limit is not None and len(postings) >= limit:
+                    return postings
+        return postings
+
+    def section_summary(self, postings):
+        """Count postings per (document, section)."""
+        counts = {}
+        for posting in postings:
+            key = (posting["document"], posting["section"])
+            counts[key] = counts.get(key, 0) + 1
+        return [
+            {"document": document, "section": section, "matches": matches}
+            for (document, section), matches in counts.items()
+        ]
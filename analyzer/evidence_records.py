@@ -0,0 +1,229 @@
+import base64
+import heapq
+from array import array
+
+
+class EvidenceRecord:
+    """
+    One match kept as evidence: its offsets in the document text, its
+    confidence and the raw text around it. Cleaned context strings and dicts
+    are only built when evidence is exported (see to_item).
+
+    The context is a copy rather than a slice of the document materialized
+    at export from the offsets: a document's text is dropped once it has been
+    scanned (and is not cached), so the offsets alone could only be resolved
+    by extracting the document again. The copies make up most of the size of
+    cached evidence and saved assessment state, which is why the records kept
+    per control are bounded (max_evidence).
+
+    The match type is "keyword" for keyword matches and "semantic" for
+    sentences similar to a control (see semantic_matching), whose keyword is
+    the control keyword closest to the sentence and whose context is the
+    sentence itself.
+    """
+
+    __slots__ = ("keyword", "start", "end", "confidence", "context", "match_type")
+
+    def __init__(self, keyword, start, end, confidence, context, match_type="keyword"):
+        self.keyword = keyword
+        self.start = start
+        self.end = end
+        self.confidence = confidence
+        self.context = context
+        self.match_type = match_type
+
+    def to_item(self, doc_info):
+        """Materialize the evidence item dict reported for this match."""
+        return {
+            "document": doc_info["file_name"],
+            "document_type": doc_info["document_type"],
+            "keyword": self.keyword,
+            "context": self.context.replace("\n", " ").strip(),
+            "confidence": self.confidence,
+            "start": self.start,
+            "end": self.end,
+            "match_type": self.match_type
+        }
+
+
+class ControlEvidence:
+    """
+    The evidence one document holds for one control.
+
+    Scoring needs every match, but only through aggregates: the confidence of
+    each match (kept in a compact array, in match order, semantic matches
+    last), the match count per keyword (keyword matches only) and which
+    required evidence terms any match context mentions.
+    Only a bounded number of the best, non-overlapping matches are kept as
+    EvidenceRecords.
+    """
+
+    __slots__ = ("confidences", "keyword_counts", "required_found", "records")
+
+    def __init__(self, confidences, keyword_counts, required_found, records):
+        self.confidences = array("d", confidences)
+        self.keyword_counts = keyword_counts
+        self.required_found = required_found
+        self.records = records
+
+    @property
+    def count(self):
+        """Number of matches (kept or not)."""
+        return len(self.confidences)
+
+    def to_dict(self):
+        """Serialize for the evidence cache and saved assessment state."""
+        return {
+            # Raw doubles keep every confidence exactly, in a fraction of the space
+            "confidences": base64.b64encode(self.confidences.tobytes()).decode("ascii"),
+            "keyword_counts": self.keyword_counts,
+            "required_found": self.required_found,
+            "records": [
+                [record.keyword, record.start, record.end, record.confidence, record.context]
+                + ([record.match_type] if record.match_type != "keyword" else [])
+                for record in self.records
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        confidences = array("d")
+        confidences.frombytes(base64.b64decode(data["confidences"]))
+        return cls(
+            confidences,
+            data["keyword_counts"],
+            data["required_found"],
+            [EvidenceRecord(*record) for record in data["records"]]
+        )
+
+
+class ControlEvidenceBuilder:
+    """
+    Builds the ControlEvidence of one control in one document from batches of
+    keyword matches that arrive in document order, holding only the
+    aggregates and the best records so far.
+
+    Matches whose keyword lies within the context of the previous kept match
+    show the same passage, so only the more confident of the two is kept. Of
+    the remaining matches, the limit most confident are kept.
+    """
+
+    __slots__ = ("keywords", "limit", "context_chars", "confidences", "semantic_confidences", "required_found",
+                 "_last", "_best")
+
+    def __init__(self, control_info, limit, context_chars):
+        """
+        Args:
+            control_info: The control definition
+            limit: Maximum number of records to keep (None keeps all)
+            context_chars: Characters of context on each side of a match
+        """
+        self.keywords = control_info["keywords"]
+        self.limit = limit
+        self.context_chars = context_chars
+        self.confidences = {keyword: array("d") for keyword in self.keywords}
+        self.semantic_confidences = array("d")
+        self.required_found = [False] * len(control_info["required_evidence"])
+        self._last = None
+        # Min-heap of (confidence, -start, is keyword match, record): the
+        # weakest kept record on top
+        self._best = []
+
+    def add(self, matches, required_found):
+        """
+        Add a batch of the control's matches.
+
+        Args:
+            matches: List of (keyword, start, end, context, confidence) sorted
+                by (start, end), all after the matches of earlier batches
+            required_found: Whether any context of the batch mentions each
+                required evidence term
+        """
+        self.required_found = [
+            found or found_now for found, found_now in zip(self.required_found, required_found)
+        ]
+
+        for match in matches:
+            keyword, start, _, _, confidence = match
+            self.confidences[keyword].append(confidence)
+
+            last = self._last
+            if last is not None and start < last[2] + self.context_chars:
+                if confidence > last[4]:
+                    self._last = match
+                continue
+            if last is not None:
+                self._keep(last)
+            self._last = match
+
+    def add_semantic(self, matches, required_found):
+        """
+        Add the control's semantic matches, after all keyword matches.
+
+        Args:
+            matches: List of (keyword, start, end, sentence, confidence) of
+                sentences that do not mention any of the control's keywords
+            required_found: Whether any of the sentences mentions each
+                required evidence term
+        """
+        self.required_found = [
+            found or found_now for found, found_now in zip(self.required_found, required_found)
+        ]
+        for match in matches:
+            self.semantic_confidences.append(match[4])
+            self._keep(match, "semantic")
+
+    def _keep(self, match, match_type="keyword"):
+        keyword, start, end, context, confidence = match
+        record = EvidenceRecord(keyword, start, end, confidence, context, match_type)
+        heapq.heappush(self._best, (confidence, -start, match_type == "keyword", record))
+        if self.limit is not None and len(self._best) > self.limit:
+            heapq.heappop(self._best)
+
+    def build(self):
+        """
+        Return the ControlEvidence, or None if the control had no matches.
+
+        Confidences are ordered by the control's keywords and then by position,
+        the order in which evidence items were always collected, so the
+        average confidence is summed in the same order; semantic matches
+        follow.
+        """
+        if self._last is None and not self.semantic_confidences:
+            return None
+        if self._last is not None:
+            self._keep(self._last)
+            self._last = None
+
+        confidences = array("d")
+        keyword_counts = {}
+        for keyword in self.keywords:
+            confidences.extend(self.confidences[keyword])
+            if self.confidences[keyword]:
+                keyword_counts[keyword] = keyword_counts.get(keyword, 0) + len(self.confidences[keyword])
+        confidences.extend(self.semantic_confidences)
+
+        records = [best[-1] for best in sorted(self._best, key=lambda best: (-best[0], -best[1]))]
+        return ControlEvidence(confidences, keyword_counts, self.required_found, records)
+
+
+def top_records(document_evidence, limit):
+    """
+    Merge the kept records of a control across documents.
+
+    Args:
+        document_evidence: List of (doc_info, ControlEvidence) in document order
+        limit: Maximum number of records to return (None returns all)
+
+    Returns:
+        List of (doc_info, EvidenceRecord), most confident first
+    """
+    candidates = [
+        (doc_info, record, position)
+        for position, (doc_info, evidence) in enumerate(document_evidence)
+        for record in evidence.records
+    ]
+    candidates.sort(key=lambda candidate: (-candidate[1].confidence, candidate[2], candidate[1].start))
+    if limit is not None:
+        candidates = candidates[:limit]
+    return [(doc_info, record) for doc_info, record, _ in candidates]
@@ -0,0 +1,152 @@
+from keyword_matcher import KeywordMatcher
+
+# numpy is imported on first use, so runs that never score a match (and
+# commands that never analyze anything) do not pay for importing it
+
+# Words that suggest the context is a policy statement rather than a passing mention
+POLICY_INDICATORS = ["shall", "must", "required", "policy", "procedure", "standard"]
+
+# Confidence of a match with no supporting terms in its context, and the cap
+BASE_CONFIDENCE = 0.5
+MAX_CONFIDENCE = 0.95
+
+
+class TermPresenceScorer:
+    """
+    Answers "which of these terms occur in which of these texts" for a batch
+    of texts at once.
+
+    All terms are compiled into one matcher; the texts are lowercased, joined
+    and scanned in a single pass, and the result is a boolean matrix
+    (texts x terms) equivalent to evaluating term.lower() in text.lower() for
+    every pair.
+    """
+
+    def __init__(self, terms):
+        """
+        Args:
+            terms: Iterable of terms the matrix columns can refer to
+        """
+        self.terms = list(dict.fromkeys(term.lower() for term in terms if term))
+        self.columns = {term: index for index, term in enumerate(self.terms)}
+        self.matcher = KeywordMatcher(self.terms, ignore_case=False)
+
+        # Only terms of several words can start matching when line breaks
+        # become spaces; their scorer is built on first use
+        self.spaced_columns = [index for index, term in enumerate(self.terms) if " " in term]
+        self._spaced_scorer = None
+
+    @classmethod
+    def from_controls(cls, controls):
+        """Build a scorer for all keywords and required evidence terms of the controls."""
+        terms = list(POLICY_INDICATORS)
+        for control_info in controls.values():
+            terms.extend(control_info["keywords"])
+            terms.extend(control_info["required_evidence"])
+        return cls(terms)
+
+    def column_indexes(self, terms):
+        """Return the matrix column of each term (repeated terms repeat columns)."""
+        return [self.columns[term.lower()] for term in terms]
+
+    def presence_matrix(self, texts):
+        """
+        Compute which terms occur in which texts.
+
+        Returns:
+            numpy bool array of shape (len(texts), len(self.terms))
+        """
+        import numpy as np
+
+        presence = np.zeros((len(texts), len(self.terms)), dtype=bool)
+        if not texts or not self.terms:
+            return presence
+
+        lowered = [text.lower() for text in texts]
+        # Terms never contain NUL, so no match can span two texts
+        joined = "\x00".join(lowered)
+        text_starts = np.cumsum([0] + [len(text) + 1 for text in lowered[:-1]])
+
+        positions = []
+        columns = []
+        for start, _, term in self.matcher.iter_occurrences(joined):
+            positions.append(start)
+            columns.append(self.columns[term])
+
+        if positions:
+            rows = np.searchsorted(text_starts, positions, side="right") - 1
+            presence[rows, columns] = True
+        return presence
+
+    def presence_with_line_breaks_as_spaces(self, texts, presence):
+        """
+        Compute the presence matrix of the texts with line breaks replaced by
+        spaces, given the presence matrix of the texts themselves.
+
+        Only terms containing a space can gain matches, so only those are
+        looked for again, and only in the texts that contain line breaks.
+        """
+        rows = [row for row, text in enumerate(texts) if "\n" in text]
+        if not rows or not self.spaced_columns:
+            return presence
+
+        import numpy as np
+
+        if self._spaced_scorer is None:
+            self._spaced_scorer = TermPresenceScorer(self.terms[index] for index in self.spaced_columns)
+
+        joined_presence = presence.copy()
+        joined_presence[np.ix_(rows, self.spaced_columns)] |= self._spaced_scorer.presence_matrix(
+            [texts[row].replace("\n", " ") for row in rows]
+        )
+        return joined_presence
+
+
+def keyword_confidences(matched_keywords, presence, scorer, control_info):
+    """
+    Calculate a confidence score for each keyword match of a control based on:
+    - Presence of the control's other keywords in the match context
+    - Presence of required evidence terms
+    - Whether the context contains policy language (shall, must, ...)
+
+    Args:
+        matched_keywords: The keyword of each match
+        presence: Term presence matrix of the match contexts (matches x terms)
+        scorer: The TermPresenceScorer that computed the matrix
+        control_info: The control definition
+
+    Returns:
+        List of confidence floats, one per match (capped at MAX_CONFIDENCE for the POC)
+    """
+    if not matched_keywords:
+        return []
+
+    import numpy as np
+
+    keywords = control_info["keywords"]
+    keyword_presence = presence[:, scorer.column_indexes(keywords)]
+    # The matched keyword itself does not count as an additional keyword
+    is_matched_keyword = np.array(matched_keywords, dtype=object)[:, None] == np.array(keywords, dtype=object)[None, :]
+    additional_keywords = (keyword_presence & ~is_matched_keyword).sum(axis=1)
+
+    evidence_terms = presence[:, scorer.column_indexes(control_info["required_evidence"])].sum(axis=1)
+    has_policy_language = presence[:, scorer.column_indexes(POLICY_INDICATORS)].any(axis=1)
+
+    # Same sequence of float operations as scoring each match on its own
+    confidence = BASE_CONFIDENCE + additional_keywords * 0.1
+    confidence = confidence + evidence_terms * 0.1
+    confidence = confidence + np.where(has_policy_language, 0.1, 0.0)
+    return np.minimum(MAX_CONFIDENCE, confidence).tolist()
+
+
+def required_evidence_found(presence, scorer, control_info):
+    """
+    Return, for each required evidence term of the control, whether any of
+    the evidence contexts mentions it.
+
+    Args:
+        presence: Term presence matrix of the evidence contexts
+        scorer: The TermPresenceScorer that computed the matrix
+        control_info: The control definition
+    """
+    return presence[:, scorer.column_indexes(control_info["required_evidence"])].any(axis=0).tolist()
@@ -0,0 +1,122 @@
+import cProfile
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Per-document figures summed into the run totals
+DOCUMENT_TOTALS = ("bytes", "chars", "matches", "evidence_items",
+                   "extract_seconds", "match_seconds", "nlp_seconds", "score_seconds")
+
+
+def peak_rss_bytes(who="self"):
+    """
+    Return the peak resident set size of this process ("self") or of its
+    terminated child processes ("children"), or None where unsupported.
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who == "self" else resource.RUSAGE_CHILDREN)
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+
+class RunMetrics:
+    """
+    Collects wall time per stage of a run (catalog and model loading,
+    document analysis, assessment, export) and the figures each analyzed
+    document reports, optionally emitting each as a JSON-ready event.
+    """
+
+    def __init__(self, emit=None):
+        """
+        Args:
+            emit: Optional callable receiving a dict event for every stage and
+                document as soon as it completes
+        """
+        self.emit = emit
+        self.stages = {}
+        self.documents = []
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage of the run; repeated stages accumulate."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - started)
+
+    def add_stage(self, name, seconds):
+        """Record the wall time of a stage timed elsewhere."""
+        with self._lock:
+            stage = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+            stage["seconds"] += seconds
+            stage["calls"] += 1
+        if self.emit:
+            self.emit({"metric": "stage", "stage": name, "seconds": round(seconds, 4)})
+
+    def record_document(self, doc_info):
+        """Record the metrics an analyzed document carries in its doc_info (if any)."""
+        if "metrics" not in doc_info:
+            return
+        document = {"document": doc_info["file_name"], **doc_info["metrics"]}
+        with self._lock:
+            self.documents.append(document)
+        if self.emit:
+            self.emit({"metric": "document", **document})
+
+    def summary(self):
+        """Return all metrics collected so far, with totals and peak memory."""
+        with self._lock:
+            documents = list(self.documents)
+            stages = {
+                name: {"seconds": round(stage["seconds"], 4), "calls": stage["calls"]}
+                for name, stage in self.stages.items()
+            }
+
+        totals = {field: 0 for field in DOCUMENT_TOTALS}
+        for document in documents:
+            for field in DOCUMENT_TOTALS:
+                totals[field] += document.get(field, 0)
+        for field in DOCUMENT_TOTALS:
+            if field.endswith("_seconds"):
+                totals[field] = round(totals[field], 4)
+        totals["documents"] = len(documents)
+        totals["cache_hits"] = sum(1 for document in documents if document.get("cached"))
+
+        return {
+            "elapsed_seconds": round(time.perf_counter() - self._started, 4),
+            "stages": stages,
+            "documents": documents,
+            "totals": totals,
+            "peak_rss_bytes": peak_rss_bytes("self"),
+            "workers_peak_rss_bytes": peak_rss_bytes("children")
+        }
+
+
+@contextmanager
+def profiled(profile_path=None):
+    """
+    Run the enclosed code under cProfile and write the pstats dump to
+    profile_path; does nothing without a path. Only the calling thread is
+    profiled, not worker processes.
+    """
+    if not profile_path:
+        yield None
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(profile_path)
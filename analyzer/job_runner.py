@@ -0,0 +1,237 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_STATES = ("queued", "running", "completed", "failed", "cancelled")
+
+# Finished jobs remembered for status queries
+FINISHED_JOBS_KEPT = 200
+
+# Recent queue waits the reported wait statistics are based on
+WAIT_SAMPLES = 100
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once it has been cancelled."""
+
+
+class AssessmentJob:
+    """An assessment job and its lifecycle in a JobRunner."""
+
+    def __init__(self, job_id, request):
+        self.job_id = job_id
+        self.request = request
+        self.state = "queued"
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self._cancel_requested = threading.Event()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel_requested.is_set()
+
+    def check_cancelled(self):
+        """
+        Raise JobCancelled if the job has been cancelled. Running jobs call
+        this at safe points (e.g. between documents) to stop early.
+        """
+        if self._cancel_requested.is_set():
+            raise JobCancelled(self.job_id)
+
+    @property
+    def wait_seconds(self):
+        """Time spent queued (so far, if the job has not started yet)."""
+        return (self.started_at or time.time()) - self.submitted_at
+
+    def to_dict(self):
+        status = {
+            "job_id": self.job_id,
+            "state": self.state,
+            "wait_seconds": round(self.wait_seconds, 3)
+        }
+        if self.started_at is not None:
+            status["run_seconds"] = round((self.finished_at or time.time()) - self.started_at, 3)
+        if self.error is not None:
+            status["error"] = self.error
+        return status
+
+
+class JobRunner:
+    """
+    Runs assessment jobs from an asyncio event loop with back-pressure.
+
+    At most max_concurrent jobs run at a time, each in a thread of the
+    executor so the event loop stays free to accept, report on and cancel
+    jobs. At most max_queued jobs wait for a free slot; submitting more
+    raises QueueFullError so callers can reject or defer work instead of
+    piling it up. Cancelling a queued job removes it; a running job is
+    asked to stop and does so at its next check_cancelled call.
+    """
+
+    def __init__(self, run_job, max_concurrent=2, max_queued=8, executor=None, on_event=None):
+        """
+        Args:
+            run_job: Callable(job) run in the executor for every job; returns
+                a dict of fields added to the completion event
+            max_concurrent: Maximum number of jobs running at once
+            max_queued: Maximum number of jobs waiting to run
+            executor: Optional executor to run jobs in (defaults to a thread
+                pool of max_concurrent threads)
+            on_event: Optional callable(job, event dict) receiving lifecycle
+                events (started, completed, failed, cancelled)
+        """
+        self.run_job = run_job
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_concurrent)
+        self.on_event = on_event
+
+        self.jobs = OrderedDict()
+        self._queue = None
+        self._workers = []
+        self._queued = 0
+        self._running = 0
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self._counts = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0, "cancelled": 0}
+
+    async def start(self):
+        """Start the job slots; call from the event loop that submits jobs."""
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.max_concurrent)]
+
+    def submit(self, job_id, request):
+        """
+        Queue a job.
+
+        Returns:
+            The AssessmentJob
+
+        Raises:
+            QueueFullError: If max_queued jobs are already waiting
+            ValueError: If a job with the same ID is queued or running
+        """
+        existing = self.jobs.get(job_id)
+        if existing is not None and existing.state in ("queued", "running"):
+            raise ValueError(f"Job {job_id} is already {existing.state}")
+        # Jobs that a free slot picks up right away do not count as waiting
+        free_slots = max(0, self.max_concurrent - self._running)
+        if self._queued >= self.max_queued + free_slots:
+            self._counts["rejected"] += 1
+            raise QueueFullError(f"Analyzer queue is full ({self._queued} jobs waiting)")
+
+        job = AssessmentJob(job_id, request)
+        self.jobs[job_id] = job
+        self.jobs.move_to_end(job_id)
+        self._queued += 1
+        self._counts["submitted"] += 1
+        self._queue.put_nowait(job)
+        return job
+
+    def status(self, job_id):
+        """Return the status dict of a job, or None if it is unknown."""
+        job = self.jobs.get(job_id)
+        return job.to_dict() if job is not None else None
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued or running job.
+
+        Returns:
+            True if the job was queued or running, False otherwise
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.state not in ("queued", "running"):
+            return False
+
+        job._cancel_requested.set()
+        if job.state == "queued":
+            # The queue entry is skipped when a slot picks it up
+            self._queued -= 1
+            self._finish(job, "cancelled")
+        return True
+
+    def stats(self):
+        """Report queue depth, running jobs, capacity and queue wait times."""
+        waiting = [job.wait_seconds for job in self.jobs.values() if job.state == "queued"]
+        waits = list(self._waits)
+        return {
+            "queued": self._queued,
+            "running": self._running,
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "oldest_wait_seconds": round(max(waiting), 3) if waiting else 0,
+            "avg_wait_seconds": round(sum(waits) / len(waits), 3) if waits else 0,
+            "max_wait_seconds": round(max(waits), 3) if waits else 0,
+            **self._counts
+        }
+
+    async def join(self):
+        """Wait until every submitted job has finished."""
+        await self._queue.join()
+
+    async def shutdown(self):
+        """Finish all submitted jobs, then stop the job slots."""
+        await self.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self.executor.shutdown(wait=True)
+
+    async def _work(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.state != "queued":
+                    continue
+
+                self._queued -= 1
+                self._running += 1
+                job.state = "running"
+                job.started_at = time.time()
+                self._waits.append(job.wait_seconds)
+                self._emit(job, {"status": "Started", "wait_seconds": round(job.wait_seconds, 3)})
+
+                try:
+                    job.result = await loop.run_in_executor(self.executor, self.run_job, job)
+                except JobCancelled:
+                    self._finish(job, "cancelled")
+                except Exception as e:
+                    job.error = str(e)
+                    self._finish(job, "failed")
+                else:
+                    self._finish(job, "completed")
+                finally:
+                    self._running -= 1
+            finally:
+                self._queue.task_done()
+
+    def _finish(self, job, state):
+        job.state = state
+        job.finished_at = time.time()
+        self._counts[state] += 1
+
+        if state == "completed":
+            self._emit(job, {"progress": 100, "status": "Assessment complete", **(job.result or {})})
+        elif state == "failed":
+            self._emit(job, {"error": job.error, "status": "Failed"})
+        else:
+            self._emit(job, {"error": "Assessment was cancelled", "status": "Cancelled"})
+
+        # Forget the oldest finished jobs
+        finished = [job_id for job_id, known in self.jobs.items() if known.state not in ("queued", "running")]
+        for job_id in finished[:max(0, len(finished) - FINISHED_JOBS_KEPT)]:
+            del self.jobs[job_id]
+
+    def _emit(self, job, event):
+        if self.on_event:
+            self.on_event(job, event)
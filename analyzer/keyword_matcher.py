@@ -0,0 +1,273 @@
+import re
+from collections import defaultdict
+
+
+class KeywordMatcher:
+    """
+    Finds every occurrence of every control keyword in a single pass over a text.
+
+    All keywords are compiled into one case-insensitive regular expression
+    shaped like a trie (shared prefixes are factored out), wrapped in a
+    lookahead so that overlapping keywords such as "backup" and
+    "backup procedure" are both reported at the same position.
+    """
+
+    def __init__(self, keywords, ignore_case=True):
+        """
+        Build the matcher.
+
+        Args:
+            keywords: Iterable of keyword strings (duplicates are ignored)
+            ignore_case: Match case-insensitively; when False the keywords are
+                expected in lowercase and matched exactly, for text that has
+                already been lowercased
+        """
+        self.keywords = [kw for kw in dict.fromkeys(keywords) if kw]
+        self._flags = re.IGNORECASE if ignore_case else 0
+
+        # Keywords that differ only in case share the same matches
+        self._by_lower = defaultdict(list)
+        for keyword in self.keywords:
+            self._by_lower[keyword.lower()].append(keyword)
+
+        lowered = sorted(self._by_lower)
+        trie = self._build_trie(lowered)
+
+        # For each keyword, the keywords that are a prefix of it (itself included).
+        # Only the longest keyword at a position is captured by the regex; any
+        # other keyword matching there must be one of its prefixes.
+        self._prefixes = {kw: self._walk_prefixes(trie, kw) for kw in lowered}
+
+        # The regex is compiled on first use, so a matcher can be pickled
+        # (e.g. in a compiled control catalog) without its compiled form
+        self._pattern_source = "(?=(" + self._build_trie_pattern(trie) + "))" if lowered else None
+        self._pattern = None
+        self._bytes_pattern = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pattern"] = None
+        state["_bytes_pattern"] = None
+        return state
+
+    @property
+    def pattern(self):
+        """The compiled lookahead regex over all keywords (None without keywords)."""
+        if self._pattern is None and self._pattern_source is not None:
+            self._pattern = re.compile(self._pattern_source, self._flags)
+        return self._pattern
+
+    @property
+    def matches_bytes(self):
+        """Whether the keywords can be matched in ASCII-compatible encoded bytes."""
+        return self._pattern_source is not None and self._pattern_source.isascii()
+
+    @property
+    def bytes_pattern(self):
+        """
+        The same regex compiled for bytes (see iter_byte_occurrences). Case is
+        ignored for ASCII letters only, which for ASCII keywords is what
+        matching the decoded text ignores as well (apart from rare characters
+        that case-fold to ASCII, such as the Kelvin sign).
+        """
+        if self._bytes_pattern is None and self.matches_bytes:
+            self._bytes_pattern = re.compile(self._pattern_source.encode("ascii"), self._flags)
+        return self._bytes_pattern
+
+    @classmethod
+    def from_controls(cls, controls):
+        """Build a matcher for the keywords of all given control definitions."""
+        return cls(
+            keyword
+            for control_info in controls.values()
+            for keyword in control_info["keywords"]
+        )
+
+    @staticmethod
+    def _build_trie(keywords):
+        """Build a character trie; a "" key marks the end of a keyword."""
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = True
+        return trie
+
+    @staticmethod
+    def _walk_prefixes(trie, keyword):
+        """Return the keywords in the trie that are prefixes of the given keyword."""
+        prefixes = []
+        node = trie
+        for i, char in enumerate(keyword):
+            node = node[char]
+            if "" in node:
+                prefixes.append(keyword[:i + 1])
+        return prefixes
+
+    @staticmethod
+    def _build_trie_pattern(trie):
+        """Compile a keyword trie into a prefix-factored regex alternation."""
+        def build(node):
+            branches = [
+                re.escape(char) + build(child)
+                for char, child in sorted(node.items())
+                if char != ""
+            ]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            if "" in node:
+                # A keyword ends here; longer keywords are tried first
+                body = "(?:" + body + ")?"
+            return body
+
+        return build(trie)
+
+    def iter_occurrences(self, text, pos=0, endpos=None):
+        """
+        Yield (start, end, keyword) for every keyword occurrence in the text,
+        including overlapping ones, in order of start offset.
+        """
+        pattern = self.pattern
+        if pattern is None:
+            return
+        if endpos is None:
+            endpos = len(text)
+
+        for match in pattern.finditer(text, pos, endpos):
+            start = match.start()
+            matched = match.group(1)
+            candidates = self._prefixes.get(matched.lower())
+
+            if candidates is None:
+                # Unusual case folding (e.g. non-ASCII text); check each keyword
+                candidates = [
+                    kw for kw in self._prefixes
+                    if re.compile(re.escape(kw), self._flags).match(text, start, endpos)
+                ]
+
+            for kw_lower in candidates:
+                for keyword in self._by_lower[kw_lower]:
+                    yield start, start + len(kw_lower), keyword
+
+    def iter_byte_occurrences(self, data, pos=0, endpos=None):
+        """
+        Yield (start, end, keyword) for every keyword occurrence in a bytes-like
+        object (bytes, or an mmap scanned in place), in order of start offset.
+        Offsets are byte offsets; requires matches_bytes.
+        """
+        pattern = self.bytes_pattern
+        if pattern is None:
+            return
+        if endpos is None:
+            endpos = len(data)
+
+        for match in pattern.finditer(data, pos, endpos):
+            start = match.start()
+            kw_matched = match.group(1).decode("ascii").lower()
+            for kw_lower in self._prefixes[kw_matched]:
+                for keyword in self._by_lower[kw_lower]:
+                    yield start, start + len(kw_lower), keyword
+
+    def find_all(self, text):
+        """
+        Find keyword matches the way a separate case-insensitive re.finditer
+        per keyword would: non-overlapping for each keyword, in offset order.
+
+        Returns:
+            Dict mapping keyword -> list of (start, end) tuples
+        """
+        hits = defaultdict(list)
+        last_end = {}
+
+        for start, end, keyword in self.iter_occurrences(text):
+            if start >= last_end.get(keyword, 0):
+                hits[keyword].append((start, end))
+                last_end[keyword] = end
+
+        return hits
+
+
+class StreamingKeywordScanner:
+    """
+    Applies a KeywordMatcher to text that arrives in chunks (pages,
+    paragraphs or file blocks) without ever holding the whole document.
+
+    Only a short tail of the text is carried over between chunks, long enough
+    for a keyword and its surrounding context to span a chunk boundary, so
+    the hits and contexts are the same as scanning the joined text with
+    KeywordMatcher.find_all.
+    """
+
+    def __init__(self, matcher, context_chars=150, min_scan_chars=64 * 1024):
+        """
+        Args:
+            matcher: The KeywordMatcher to scan with
+            context_chars: Characters of context kept on each side of a match
+            min_scan_chars: Small chunks are buffered until at least this many
+                characters are available, to avoid rescanning per paragraph
+        """
+        self.matcher = matcher
+        self.context_chars = context_chars
+        self.min_scan_chars = min_scan_chars
+        self._lookahead = max((len(kw) for kw in matcher.keywords), default=0) + context_chars
+
+        self._buffer = ""
+        self._pending = []
+        self._pending_chars = 0
+        self._base = 0          # absolute offset of the first buffered character
+        self._scanned_to = 0    # absolute offset up to which match starts are final
+        self._last_end = {}     # per-keyword end of the last reported match
+        self.total_chars = 0
+
+    def feed(self, chunk):
+        """
+        Add the next chunk of text.
+
+        Returns:
+            List of (keyword, start, end, context) hits that are now final,
+            with absolute offsets and the raw context text
+        """
+        self._pending.append(chunk)
+        self._pending_chars += len(chunk)
+        self.total_chars += len(chunk)
+        if self._pending_chars < self.min_scan_chars:
+            return []
+        return self._scan(final=False)
+
+    def finish(self):
+        """Scan whatever text remains and return its hits."""
+        return self._scan(final=True)
+
+    def _scan(self, final):
+        self._buffer += "".join(self._pending)
+        self._pending = []
+        self._pending_chars = 0
+
+        buffer_end = self._base + len(self._buffer)
+        # Matches starting before the limit have their keyword and right-hand
+        # context complete in the buffer; later ones wait for more text
+        limit = buffer_end if final else buffer_end - self._lookahead
+        if limit <= self._scanned_to:
+            return []
+
+        hits = []
+        local_limit = limit - self._base
+        for start, end, keyword in self.matcher.iter_occurrences(self._buffer, self._scanned_to - self._base):
+            if start >= local_limit:
+                break
+            absolute_start = start + self._base
+            if absolute_start < self._last_end.get(keyword, 0):
+                continue
+
+            self._last_end[keyword] = end + self._base
+            context = self._buffer[max(0, start - self.context_chars):end + self.context_chars]
+            hits.append((keyword, absolute_start, end + self._base, context))
+
+        # Keep only what later matches can still need as left-hand context
+        self._scanned_to = limit
+        cut = max(self._base, limit - self.context_chars)
+        self._buffer = self._buffer[cut - self._base:]
+        self._base = cut
+        return hits
@@ -0,0 +1,189 @@
+"""
+Keyword scanning of plain-text files in place.
+
+Large text evidence (e.g. exported SIEM or log configuration dumps) is
+memory-mapped and scanned as bytes by the keyword matcher's bytes regex;
+only the context windows around hits are decoded. The hits, offsets and
+contexts are the same as scanning the decoded text the way
+iter_text_file_chunks reads it (universal newlines included), so either
+path can analyze a file.
+"""
+
+import codecs
+import mmap
+import os
+
+# Encoding assumed for text that is not valid UTF-8 (one byte per character)
+FALLBACK_ENCODING = "cp1252"
+
+# Encodings whose ASCII characters are single ASCII bytes, so the bytes regex
+# finds the same keywords as the decoded text
+MAPPABLE_ENCODINGS = ("utf-8", "utf-8-sig", FALLBACK_ENCODING)
+
+BYTE_ORDER_MARKS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# UTF-8 continuation bytes; every other byte starts a character
+UTF8_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+# A character is at most 4 bytes, so this many bytes per context character
+# always covers the context
+MAX_BYTES_PER_CHAR = 4
+
+
+def detect_text_encoding(text_path, block_size=1024 * 1024):
+    """
+    Determine the encoding of a text file from its byte order mark, or else
+    by checking block by block whether it is valid UTF-8.
+
+    Returns:
+        "utf-32", "utf-16" or "utf-8-sig" for files with a byte order mark,
+        "utf-8" for valid UTF-8 and FALLBACK_ENCODING for anything else
+    """
+    with open(text_path, 'rb') as file:
+        head = file.read(4)
+        for bom, encoding in BYTE_ORDER_MARKS:
+            if head.startswith(bom):
+                return encoding
+
+        file.seek(0)
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        try:
+            for block in iter(lambda: file.read(block_size), b""):
+                if not (block.isascii() and decoder.getstate()[0] == b""):
+                    decoder.decode(block)
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            return FALLBACK_ENCODING
+    return "utf-8"
+
+
+class MappedTextScanner:
+    """
+    Scans a memory-mapped text file for keywords block by block.
+
+    Each block is matched in place; hits get character offsets (as in the
+    decoded text) and decoded contexts. Pages behind the scan are released
+    as it goes, so resident memory stays flat however large the file is.
+    """
+
+    def __init__(self, matcher, context_chars=150, block_bytes=1024 * 1024):
+        """
+        Args:
+            matcher: The KeywordMatcher to scan with (matcher.matches_bytes)
+            context_chars: Characters of context kept on each side of a match
+            block_bytes: Bytes scanned (and hits returned) per block
+        """
+        self.matcher = matcher
+        self.context_chars = context_chars
+        self.block_bytes = block_bytes
+        self._max_keyword_bytes = max((len(kw) for kw in matcher.keywords), default=0)
+        self.total_chars = 0
+        self.blocks = 0
+
+    def iter_hits(self, text_path, encoding):
+        """
+        Scan a file in an encoding of MAPPABLE_ENCODINGS.
+
+        Yields:
+            A list of (keyword, start, end, context) hits per block, like
+            StreamingKeywordScanner.feed returns
+        """
+        self.total_chars = 0
+        self.blocks = 0
+        if os.path.getsize(text_path) == 0:
+            return
+
+        with open(text_path, 'rb') as file, \
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                data.madvise(mmap.MADV_SEQUENTIAL)
+            yield from self._scan(data, encoding)
+
+    def _scan(self, data, encoding):
+        size = len(data)
+        utf8 = encoding != FALLBACK_ENCODING
+        data_start = len(codecs.BOM_UTF8) if encoding == "utf-8-sig" else 0
+        context_bytes = self.context_chars * MAX_BYTES_PER_CHAR + MAX_BYTES_PER_CHAR
+        last_end = {}
+        released = 0
+
+        def count_chars(start, end):
+            # Characters [start, end) decode to with line breaks normalized
+            segment = data[start:end]
+            chars = len(segment.translate(None, UTF8_CONTINUATION_BYTES)) if utf8 else len(segment)
+            return chars - segment.count(b"\r\n")
+
+        chars = 0
+        block_start = data_start
+        while block_start < size:
+            block_end = min(size, block_start + self.block_bytes)
+            block = data[block_start:block_end]
+            # In plain ASCII without carriage returns, bytes and characters coincide
+            same_offsets = block.isascii() and b"\r" not in block
+            del block
+
+            hits = []
+            position, position_chars = block_start, chars
+            for start, end, keyword in self.matcher.iter_byte_occurrences(
+                    data, block_start, min(size, block_end + self._max_keyword_bytes)):
+                if start >= block_end:
+                    break
+                if start < last_end.get(keyword, 0):
+                    continue
+                last_end[keyword] = end
+
+                if same_offsets:
+                    position_chars = chars + (start - block_start)
+                else:
+                    position_chars += count_chars(position, start)
+                position = start
+                context = self._context(data, start, end, data_start, context_bytes, encoding)
+                hits.append((keyword, position_chars, position_chars + (end - start), context))
+
+            if same_offsets:
+                chars += block_end - block_start
+            else:
+                chars = position_chars + count_chars(position, block_end)
+                # A line break split by the block boundary is one character
+                if data[block_end - 1:block_end + 1] == b"\r\n":
+                    chars -= 1
+
+            self.blocks += 1
+            self.total_chars = chars
+            yield hits
+
+            # Pages before the next block's earliest context are not needed again
+            release_to = (block_end - context_bytes) // mmap.PAGESIZE * mmap.PAGESIZE
+            if release_to > released and hasattr(mmap, "MADV_DONTNEED"):
+                data.madvise(mmap.MADV_DONTNEED, released, release_to - released)
+                released = release_to
+            block_start = block_end
+
+    def _context(self, data, start, end, data_start, context_bytes, encoding):
+        """Decode the context of a match: context_chars characters on each side."""
+        low = max(data_start, start - context_bytes)
+        high = min(len(data), end + context_bytes)
+        if encoding != FALLBACK_ENCODING:
+            # Start and end the window on character boundaries
+            while low > data_start and 0x80 <= data[low] < 0xC0:
+                low += 1
+            while high < len(data) and 0x80 <= data[high] < 0xC0:
+                high -= 1
+
+        if encoding == "utf-8-sig":
+            encoding = "utf-8"
+        before = _normalize_newlines(data[low:start].decode(encoding, "replace"))
+        after = _normalize_newlines(data[end:high].decode(encoding, "replace"))
+        keyword = data[start:end].decode("ascii")
+        return before[max(0, len(before) - self.context_chars):] + keyword + after[:self.context_chars]
+
+
+def _normalize_newlines(text):
+    """Translate line breaks the way text-mode reading does."""
+    return text.replace("\r\n", "\n").replace("\r", "\n")
@@ -1,11 +1,104 @@
 import os
-import re
-import spacy
-import pandas as pd
-import PyPDF2
-import docx
 import json
+import hashlib
+import time
+from datetime import date
 from collections import defaultdict
+from itertools import chain
+from concurrent.futures import as_completed
+from keyword_matcher import KeywordMatcher, StreamingKeywordScanner
+from evidence_scoring import keyword_confidences, required_evidence_found
+from control_catalog import load_catalog
+from evidence_cache import hash_file
+from mapped_text import MAPPABLE_ENCODINGS, MappedTextScanner, detect_text_encoding
+from evidence_records import ControlEvidence, ControlEvidenceBuilder, top_records
+from evidence_index import DocumentIndex, write_index
+from sufficiency import SufficiencyTracker, combine_strength, status_for_strength
+from instrumentation import RunMetrics
+from columnar_export import EXPORT_FORMATS, write_tables
+from document_extraction import ExtractionStatus, iter_isolated_sections, iter_sections, process_context
+from semantic_matching import SemanticMatcher, iter_sentences
+
+# spaCy, PyPDF2 and python-docx are imported on first use: a run only pays
+# for the model and the extractors its NLP mode and file types need
+
+# Bump when extraction or evidence scoring changes so cached evidence is not reused
+ANALYZER_VERSION = "0.3.3"
+
+SUPPORTED_EXTENSIONS = ['.pdf', '.docx', '.doc', '.txt', '.md']
+
+# Document types in the order fast assessments analyze them: policies state
+# controls in the policy language that raises match confidence
+DOCUMENT_TYPE_YIELD = ("policy", "procedure", "standard", "diagram", "report")
+
+# Plain-text types that can be scanned in place (see mapped_text)
+TEXT_EXTENSIONS = ('.txt', '.md')
+
+# Document info fields that only describe the run that analyzed the document
+RUN_FIELDS = ("cache", "metrics", "index")
+
+# What the extracted chunks of each file type are, for document metrics
+CHUNK_UNITS = {".pdf": "pages", ".docx": "paragraphs", ".doc": "paragraphs"}
+
+# How much of the spaCy pipeline to run on each document:
+#   none     - skip NLP entirely (evidence comes from keyword matching only)
+#   tokenize - tokenizer and word vectors only, no trained components
+#   full     - the complete en_core_web_md pipeline
+#   semantic - tokenizer and word vectors, used to also find sentences similar
+#              to each control (see semantic_matching)
+NLP_MODES = ("none", "tokenize", "full", "semantic")
+NLP_MODEL = "en_core_web_md"
+NLP_TRAINED_COMPONENTS = ["tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer", "ner"]
+NLP_BATCH_SIZE = 16
+# Characters per text segment processed by the pipeline: a batch of segments
+# is all of a document that is held as spaCy Docs at once
+NLP_SEGMENT_CHARS = 32 * 1024
+
+# Characters of context kept on each side of a keyword match
+CONTEXT_CHARS = 150
+
+# Evidence matches kept (and exported) per control; every match still counts
+# towards the score
+MAX_EVIDENCE_PER_CONTROL = 20
+
+# Block size for reading plain-text documents (bytes when scanned in place)
+TEXT_BLOCK_CHARS = 1024 * 1024
+
+# Analyzer owned by each process-pool worker, created once per worker process
+_worker_analyzer = None
+
+
+def _init_pool_worker(catalog, evidence_cache, nlp_mode, max_evidence, extraction_limits):
+    """Set up the analyzer (and its NLP model, when used) of a pool worker."""
+    global _worker_analyzer
+    _worker_analyzer = OTCCDocumentAnalyzer(
+        catalog=catalog,
+        evidence_cache=evidence_cache,
+        nlp_mode=nlp_mode,
+        max_evidence=max_evidence,
+        extraction_limits=extraction_limits
+    )
+
+
+def _counted(chunks, status):
+    """Pass chunks through, counting them as extracted in status."""
+    for chunk in chunks:
+        status.ok += 1
+        yield chunk
+
+
+def _file_size(file_path):
+    """Size of a file in bytes, or None if it cannot be read."""
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return None
+
+
+def _analyze_in_pool_worker(file_path, document_type, skip_controls=frozenset()):
+    """Analyze one document in a pool worker and return its evidence."""
+    return _worker_analyzer._analyze_document_evidence(file_path, document_type, skip_controls)
+
 
 class OTCCDocumentAnalyzer:
     """
@@ -14,106 +107,235 @@ class OTCCDocumentAnalyzer:
     evidence of OTCC control implementation.
     """
     
-    def __init__(self):
-        """Initialize the analyzer with NLP model and OTCC control definitions."""
-        # Load NLP model
-        self.nlp = spacy.load("en_core_web_md")
+    def __init__(self, nlp=None, catalog=None, evidence_cache=None, nlp_mode="none", metrics=None,
+                 max_evidence=MAX_EVIDENCE_PER_CONTROL, export_format="json",
+                 extraction_limits=None, semantic_matcher=None):
+        """
+        Initialize the analyzer with NLP model and OTCC control definitions.
+        
+        Args:
+            nlp: Optional already-loaded spaCy model to share between analyzers
+            catalog: Optional compiled ControlCatalog (defaults to the bundled catalog)
+            evidence_cache: Optional EvidenceCache for per-document evidence
+            nlp_mode: One of NLP_MODES; the model is only loaded when needed
+            metrics: Optional RunMetrics collecting stage and document timings
+            max_evidence: Evidence matches kept per control (None keeps all)
+            export_format: One of EXPORT_FORMATS: "json" nests evidence in the
+                exported results, "ndjson" and "parquet" write it as tables
+                next to them (see columnar_export)
+            extraction_limits: Optional ExtractionLimits to extract PDF and
+                Word documents in isolated processes under (see
+                document_extraction); by default they are extracted in this
+                process. Isolation starts the extraction processes from a
+                fork server, so the calling script's main module needs an
+                if __name__ == "__main__" guard.
+            semantic_matcher: SemanticMatcher of the catalog's controls for
+                the "semantic" NLP mode (built with the model when not given)
+        """
+        if nlp_mode not in NLP_MODES:
+            raise ValueError(f"Unknown NLP mode: {nlp_mode} (expected one of {', '.join(NLP_MODES)})")
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {export_format} (expected one of {', '.join(EXPORT_FORMATS)})")
+        self.nlp_mode = nlp_mode
+        self.export_format = export_format
+        self.extraction_limits = extraction_limits
+        self.metrics = metrics or RunMetrics()
+        self.max_evidence = max_evidence
+        
+        # NLP model is loaded on first use (or shared when running as a service),
+        # and so are the control embeddings of the semantic mode
+        self._nlp = nlp
+        self._semantic_matcher = semantic_matcher
         
         # Load OTCC control definitions (in a real implementation, this would be from a database)
-        self.controls = self._load_control_definitions()
+        self.catalog = catalog if catalog is not None else self._load_control_definitions()
+        self.controls = self.catalog.controls
+        
+        # All control keywords compiled into a single-pass matcher
+        self.keyword_matcher = self.catalog.keyword_matcher
+        
+        # Controls each keyword belongs to, for scoring its matches
+        self.controls_by_keyword = defaultdict(list)
+        for control_id, control_info in self.controls.items():
+            for keyword in dict.fromkeys(control_info["keywords"]):
+                self.controls_by_keyword[keyword].append(control_id)
+        
+        # Scores evidence contexts against all scoring terms in one batch
+        self.term_scorer = self.catalog.term_scorer
+        
+        # Cached evidence is only valid for the same analyzer version, controls
+        # and evidence limit, and for semantic evidence the same model
+        self.evidence_cache = evidence_cache
+        fingerprint = f"{ANALYZER_VERSION}:{self.catalog.version}:{max_evidence}"
+        if nlp_mode == "semantic":
+            fingerprint += f":semantic:{NLP_MODEL}"
+        self.cache_fingerprint = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
         
-        # Track analyzed documents
+        # Track analyzed documents, and the evidence each one contributed
         self.analyzed_documents = []
+        self.document_evidence = []
         
-        # Store evidence findings
+        # Store evidence findings: per control, (doc_info, ControlEvidence)
+        # of each document with matches, in document order
         self.evidence_map = defaultdict(list)
         
         # Final assessment results
         self.assessment_results = {}
         
-        # Store the assessment date
-        self.assessment_date = pd.Timestamp.now().strftime("%Y-%m-%d")
+        # Per control, whether each required evidence term was found
+        self.required_evidence_coverage = {}
+        
+        # Fast assessments: controls whose status was settled before every
+        # document was scanned for them, and documents not analyzed at all
+        self.short_circuited = {}
+        self.skipped_documents = []
+        
+        # The last keyword matcher built without the keywords of settled
+        # controls, as (settled control IDs, matcher)
+        self._partial_matcher = (None, None)
+        
+        # Store the assessment date (and the assessment's ID, if known, for
+        # exported tables)
+        self.assessment_date = date.today().strftime("%Y-%m-%d")
+        self.assessment_id = None
+
+    @property
+    def nlp(self):
+        """The spaCy pipeline for the NLP mode, loaded on first use (None in "none" mode)."""
+        return self.load_nlp()
 
-    def _load_control_definitions(self):
+    def load_nlp(self):
         """
-        Load OTCC control definitions from a JSON file.
-        For the POC, we're focusing on a subset of controls.
+        Load the spaCy pipeline needed by the NLP mode, if not loaded yet, and
+        in the semantic mode embed the controls with it.
         """
-        # In a real implementation, this would load from a database or external file
-        # For this POC, we'll define a few controls inline
-        return {
-            "1-1-1": {
-                "domain": "Cybersecurity Governance",
-                "subdomain": "Cybersecurity Policies and Procedures",
-                "description": "Documented, approved, and implemented cybersecurity policies and procedures for OT/ICS systems",
-                "keywords": ["OT security policy", "ICS security policy", "cybersecurity policy", 
-                            "OT/ICS policy", "security procedure", "policy approval"],
-                "required_evidence": ["policy document", "approval record", "implementation evidence"]
-            },
-            "1-1-3": {
-                "domain": "Cybersecurity Governance",
-                "subdomain": "Cybersecurity Policies and Procedures",
-                "description": "OT/ICS cybersecurity policies reviewed periodically",
-                "keywords": ["policy review", "annual review", "periodic review", "review process", 
-                            "policy update", "review date", "review schedule", "review record"],
-                "required_evidence": ["review schedule", "review records", "update history"]
-            },
-            "2-4-1": {
-                "domain": "Cybersecurity Defense",
-                "subdomain": "Network Security Management",
-                "description": "OT/ICS environment network segmentation",
-                "keywords": ["network segmentation", "air gap", "firewall", "DMZ", "security zone", 
-                             "network separation", "IT/OT segmentation", "security perimeter"],
-                "required_evidence": ["network diagram", "firewall rules", "segmentation controls"]
-            },
-            "2-11-1": {
-                "domain": "Cybersecurity Defense",
-                "subdomain": "Cybersecurity Event Logs and Monitoring Management",
-                "description": "Activation of cybersecurity event logs and audit trails",
-                "keywords": ["event log", "audit trail", "log management", "security monitoring", 
-                            "SIEM", "logging policy", "event monitoring", "log collection", "log retention"],
-                "required_evidence": ["logging configuration", "monitoring setup", "log storage policy"]
-            },
-            "3-1-1": {
-                "domain": "Cybersecurity Resilience",
-                "subdomain": "Cybersecurity Resilience Aspects of Business Continuity Management",
-                "description": "OT/ICS systems minimum operations sustainability",
-                "keywords": ["business continuity", "disaster recovery", "backup", "recovery plan", 
-                             "resilience", "continuity plan", "backup procedure", "BCP", "DRP"],
-                "required_evidence": ["continuity plan", "recovery procedures", "backup strategy"]
-            },
-            "4-1-1": {
-                "domain": "Third-Party Cybersecurity",
-                "subdomain": "Third-Party Cybersecurity",
-                "description": "Inclusion of cybersecurity requirements in OT/ICS procurement",
-                "keywords": ["vendor security", "procurement security", "third-party security", 
-                            "supplier security", "vendor management", "security requirement", "vendor assessment"],
-                "required_evidence": ["procurement policy", "vendor requirements", "security clauses"]
-            }
-        }
+        if self._nlp is None and self.nlp_mode != "none":
+            with self.metrics.stage("load_nlp"):
+                import spacy
+                if self.nlp_mode in ("tokenize", "semantic"):
+                    # Keep the tokenizer and word vectors, skip every trained component
+                    self._nlp = spacy.load(NLP_MODEL, exclude=NLP_TRAINED_COMPONENTS)
+                else:
+                    self._nlp = spacy.load(NLP_MODEL)
+        if self._semantic_matcher is None and self.nlp_mode == "semantic":
+            with self.metrics.stage("embed_controls"):
+                self._semantic_matcher = SemanticMatcher(self.controls, self._nlp, self.term_scorer)
+        return self._nlp
+
+    @property
+    def semantic_matcher(self):
+        """The SemanticMatcher of the semantic mode, built on first use (None in other modes)."""
+        self.load_nlp()
+        return self._semantic_matcher
+
+    def new_session(self, metrics=None):
+        """
+        Create a fresh analyzer for a new assessment that shares this analyzer's
+        loaded NLP model and control definitions but none of its evidence.
+        
+        Args:
+            metrics: Optional RunMetrics for the new assessment
+        """
+        return OTCCDocumentAnalyzer(
+            nlp=self.nlp,
+            nlp_mode=self.nlp_mode,
+            catalog=self.catalog,
+            evidence_cache=self.evidence_cache,
+            metrics=metrics,
+            max_evidence=self.max_evidence,
+            export_format=self.export_format,
+            extraction_limits=self.extraction_limits,
+            semantic_matcher=self.semantic_matcher
+        )
+
+    def _load_control_definitions(self, catalog_path=None, sector=None):
+        """
+        Load OTCC control definitions from a catalog file.
+        The bundled catalog covers a subset of controls for the POC.
+        
+        Returns:
+            Compiled ControlCatalog
+        """
+        return load_catalog(catalog_path, sector)
+
+    def iter_pdf_chunks(self, pdf_path):
+        """Yield the text of a PDF file one page at a time."""
+        for text, _ in self._iter_pdf_sections(pdf_path):
+            yield text
+
+    def _iter_pdf_sections(self, pdf_path, status=None):
+        """
+        Yield (text, section title) for each page of a PDF file; each page is
+        a section. Pages that cannot be extracted are skipped and recorded
+        in status (an ExtractionStatus).
+        """
+        return self._iter_extracted_sections(pdf_path, status or ExtractionStatus("pages"))
+
+    def iter_docx_chunks(self, docx_path):
+        """Yield the text of a Word document one paragraph at a time."""
+        for text, _ in self._iter_docx_sections(docx_path):
+            yield text
+
+    def _iter_docx_sections(self, docx_path, status=None):
+        """
+        Yield (text, section title) for each paragraph of a Word document. A
+        paragraph in a Title or Heading style starts a section named after
+        it; the title is None for all other paragraphs. A document that
+        cannot be read is recorded in status (an ExtractionStatus).
+        """
+        return self._iter_extracted_sections(docx_path, status or ExtractionStatus("paragraphs"))
+    
+    def _iter_extracted_sections(self, file_path, status):
+        """Extract a PDF or Word document, in an isolated process if limits are set."""
+        if self.extraction_limits is not None:
+            return iter_isolated_sections(file_path, self.extraction_limits, status)
+        return iter_sections(file_path, status)
+
+    def iter_text_file_chunks(self, text_path):
+        """
+        Yield the text of a plain-text or Markdown file in fixed-size blocks.
+        Files that are not UTF-8 (or UTF-16/32 with a byte order mark) are read
+        as Windows-1252.
+        """
+        encoding = detect_text_encoding(text_path)
+        with open(text_path, 'r', encoding=encoding, errors='replace') as file:
+            for block in iter(lambda: file.read(TEXT_BLOCK_CHARS), ""):
+                yield block
+
+    def iter_document_chunks(self, file_path, status=None):
+        """
+        Yield (offset, text, section title) chunks of a supported document:
+        pages for PDF, paragraphs for Word and fixed-size blocks for text
+        files. Joining the chunks gives the document's full text; offsets
+        index into that text. A title marks a chunk that starts a new section
+        (a PDF page or a Word heading) and is None otherwise.
+        
+        Args:
+            file_path: Path to the document
+            status: Optional ExtractionStatus recording skipped pages and errors
+        """
+        file_ext = os.path.splitext(file_path)[1].lower()
+        if file_ext == '.pdf':
+            chunks = self._iter_pdf_sections(file_path, status)
+        elif file_ext in ['.docx', '.doc']:
+            chunks = self._iter_docx_sections(file_path, status)
+        else:
+            chunks = ((block, None) for block in self.iter_text_file_chunks(file_path))
+            if status is not None:
+                chunks = _counted(chunks, status)
+
+        offset = 0
+        for chunk, title in chunks:
+            yield offset, chunk, title
+            offset += len(chunk)
 
     def extract_text_from_pdf(self, pdf_path):
         """Extract text content from a PDF file."""
-        text = ""
-        try:
-            with open(pdf_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-        except Exception as e:
-            print(f"Error extracting text from PDF {pdf_path}: {e}")
-        return text
+        return "".join(self.iter_pdf_chunks(pdf_path))
 
     def extract_text_from_docx(self, docx_path):
         """Extract text content from a Word document."""
-        text = ""
-        try:
-            doc = docx.Document(docx_path)
-            for para in doc.paragraphs:
-                text += para.text + "\n"
-        except Exception as e:
-            print(f"Error extracting text from DOCX {docx_path}: {e}")
-        return text
+        return "".join(self.iter_docx_chunks(docx_path))
 
     def analyze_document(self, file_path, document_type=None):
         """
@@ -123,97 +345,749 @@ class OTCCDocumentAnalyzer:
             file_path: Path to the document
             document_type: Optional type classification (policy, procedure, etc.)
         """
-        # Extract text based on file type
-        file_ext = os.path.splitext(file_path)[1].lower()
+        result = self._analyze_document_evidence(file_path, document_type)
+        if result is not None:
+            self._add_document_result(result)
+    
+    def _analyze_document_evidence(self, file_path, document_type=None, skip_controls=frozenset()):
+        """
+        Extract a document and collect its evidence without touching the
+        analyzer's accumulated state, so it can also run in a worker process.
         
-        if file_ext == '.pdf':
-            text = self.extract_text_from_pdf(file_path)
-        elif file_ext in ['.docx', '.doc']:
-            text = self.extract_text_from_docx(file_path)
-        elif file_ext in ['.txt', '.md']:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                text = file.read()
-        else:
+        Args:
+            file_path: Path to the document
+            document_type: Optional type classification (policy, procedure, etc.)
+            skip_controls: Controls not to collect evidence for (settled
+                controls of a fast assessment); their keywords are only
+                matched if other controls share them
+        
+        Returns:
+            Tuple of (doc_info, evidence by control ID), or None if the file
+            type is not supported
+        """
+        file_ext = os.path.splitext(file_path)[1].lower()
+        if file_ext not in SUPPORTED_EXTENSIONS:
             print(f"Unsupported file type: {file_ext}")
-            return
+            return None
         
-        # Store document in analyzed list
+        started = time.perf_counter()
         doc_info = {
             "file_path": file_path, 
             "file_name": os.path.basename(file_path),
-            "document_type": document_type or self._guess_document_type(os.path.basename(file_path)),
-            "text_length": len(text)
+            "document_type": document_type or self._guess_document_type(os.path.basename(file_path))
         }
-        self.analyzed_documents.append(doc_info)
+        file_size = _file_size(file_path)
+        doc_metrics = {"bytes": file_size or 0}
+        doc_info["metrics"] = doc_metrics
+        if file_size is None:
+            error = "File not found" if not os.path.exists(file_path) else "File cannot be read"
+            return self._unreadable_document_result(doc_info, file_ext, error, started)
         
-        # Process with NLP
-        doc = self.nlp(text)
+        # An unchanged document is just a hash and a cache lookup
+        cache_key = None
+        if self.evidence_cache is not None:
+            try:
+                doc_info["content_hash"] = hash_file(file_path)
+            except OSError as e:
+                # Nothing can be cached (or extracted) for a file that cannot be read
+                return self._unreadable_document_result(doc_info, file_ext, e.strerror or str(e), started)
+            cache_key = self.evidence_cache.key_for(doc_info["content_hash"], self.cache_fingerprint)
+            cached = self.evidence_cache.get(cache_key)
+            # A partial scan is not cached, but cached evidence can be used for it
+            if skip_controls:
+                cache_key = None
+            if cached is not None:
+                doc_info["text_length"] = cached["text_length"]
+                doc_info["extraction"] = cached["extraction"]
+                doc_info["index"] = DocumentIndex.from_dict(cached["index"])
+                doc_info["cache"] = "hit"
+                evidence = {
+                    control_id: ControlEvidence.from_dict(control_evidence)
+                    for control_id, control_evidence in cached["evidence"].items()
+                    if control_id not in skip_controls
+                }
+                doc_metrics.update({
+                    "cached": True,
+                    "chars": doc_info["text_length"],
+                    "evidence_items": sum(len(item.records) for item in evidence.values()),
+                    "seconds": round(time.perf_counter() - started, 4)
+                })
+                return doc_info, evidence
         
-        # For each control, check for keyword matches and extract context
-        for control_id, control_info in self.controls.items():
-            self._find_evidence_for_control(control_id, control_info, doc, text, doc_info)
+        builders = {}
+        matcher = self._keyword_matcher_without(skip_controls)
+        # Every match (not only the evidence kept) goes into the document's index
+        document_index = DocumentIndex()
+        
+        # Extraction, matching, scoring and NLP are interleaved per chunk, so
+        # each is timed separately; NLP gets whatever the others did not use
+        timings = {"extract": 0.0, "match": 0.0, "score": 0.0, "chunks": 0, "matches": 0}
+        extraction = ExtractionStatus(CHUNK_UNITS.get(file_ext, "blocks"))
+        
+        def score(hits):
+            scan_finished = time.perf_counter()
+            for keyword, start, end, _ in hits:
+                document_index.add(keyword, start, end)
+            self._score_matches(hits, builders, skip_controls)
+            timings["score"] += time.perf_counter() - scan_finished
+            timings["matches"] += len(hits)
+            return scan_finished
+        
+        detect_started = time.perf_counter()
+        mapped_encoding = self._mapped_text_encoding(file_path, file_ext, matcher)
+        timings["extract"] += time.perf_counter() - detect_started
+        if mapped_encoding is not None:
+            # Large plain-text evidence is scanned in place, block by block,
+            # without decoding it
+            scanner = MappedTextScanner(matcher, CONTEXT_CHARS, TEXT_BLOCK_CHARS)
+            scan_started = time.perf_counter()
+            for hits in scanner.iter_hits(file_path, mapped_encoding):
+                timings["match"] += score(hits) - scan_started
+                scan_started = time.perf_counter()
+            timings["chunks"] = extraction.ok = scanner.blocks
+            text_length, nlp_seconds = scanner.total_chars, 0.0
+        else:
+            text_length, nlp_seconds, semantic_matches = self._scan_document_chunks(
+                file_path, timings, score, document_index, matcher, extraction, skip_controls
+            )
+            if semantic_matches:
+                score_started = time.perf_counter()
+                self._score_semantic_matches(semantic_matches, builders)
+                timings["score"] += time.perf_counter() - score_started
+        
+        doc_info["text_length"] = text_length
+        doc_info["extraction"] = extraction.to_dict(timings["extract"])
+        doc_info["index"] = document_index
+        
+        # Evidence of each control, in catalog order
+        evidence = {}
+        for control_id in self.controls:
+            if control_id in builders:
+                control_evidence = builders[control_id].build()
+                if control_evidence is not None:
+                    evidence[control_id] = control_evidence
+        
+        doc_metrics.update({
+            CHUNK_UNITS.get(file_ext, "blocks"): timings["chunks"],
+            "chars": doc_info["text_length"],
+            "matches": timings["matches"],
+            "evidence_items": sum(len(item.records) for item in evidence.values()),
+            "extract_seconds": round(timings["extract"], 4),
+            "match_seconds": round(timings["match"], 4),
+            "nlp_seconds": round(max(0.0, nlp_seconds), 4),
+            "score_seconds": round(timings["score"], 4)
+        })
+        if skip_controls:
+            doc_metrics["skipped_controls"] = len(skip_controls)
+        
+        if self.evidence_cache is not None:
+            doc_info["cache"] = "miss"
+        # A timeout or crash may not happen again, so that evidence is not kept
+        if cache_key is not None and not extraction.retryable:
+            doc_metrics["cache_bytes"] = self.evidence_cache.put(cache_key, {
+                "text_length": doc_info["text_length"],
+                "extraction": doc_info["extraction"],
+                "index": document_index.to_dict(),
+                "evidence": {
+                    control_id: control_evidence.to_dict()
+                    for control_id, control_evidence in evidence.items()
+                }
+            })
+        
+        doc_metrics["seconds"] = round(time.perf_counter() - started, 4)
+        return doc_info, evidence
     
-    def _find_evidence_for_control(self, control_id, control_info, nlp_doc, full_text, doc_info):
-        """Find evidence for a specific control within the document text."""
+    def _unreadable_document_result(self, doc_info, file_ext, error, started):
+        """
+        Result of a document that cannot be read at all: no evidence, and an
+        extraction status that reports it as failed, so the rest of the
+        assessment goes on without it.
+        """
+        extraction = ExtractionStatus(CHUNK_UNITS.get(file_ext, "blocks"))
+        extraction.document_failed("error", error)
+        doc_info["text_length"] = 0
+        doc_info["extraction"] = extraction.to_dict(0.0)
+        doc_info["index"] = DocumentIndex()
+        doc_info["metrics"].update({"chars": 0, "seconds": round(time.perf_counter() - started, 4)})
+        return doc_info, {}
+    
+    def _mapped_text_encoding(self, file_path, file_ext, matcher):
+        """
+        Return the encoding to scan a plain-text file in place with, or None
+        if it has to be read as text: the NLP pipeline needs the decoded text,
+        and only ASCII-compatible encodings can be matched as bytes.
+        """
+        if file_ext not in TEXT_EXTENSIONS or self.nlp_mode != "none" or not matcher.matches_bytes:
+            return None
+        encoding = detect_text_encoding(file_path)
+        return encoding if encoding in MAPPABLE_ENCODINGS else None
+    
+    def _scan_document_chunks(self, file_path, timings, score, document_index, matcher, extraction,
+                              skip_controls=frozenset()):
+        """
+        Stream a document's text chunk by chunk: each chunk is scanned by
+        matcher for the keywords of every control in a single pass, handed to
+        the NLP pipeline, and then dropped. Matches are scored as they are
+        found (by score), so only the evidence kept per control outlives its
+        batch. Section starts go into document_index, and pages that could
+        not be extracted into extraction.
         
-        # Check for keyword matches
-        for keyword in control_info["keywords"]:
-            # Look for the keyword in the text (case insensitive)
-            matches = re.finditer(re.escape(keyword), full_text, re.IGNORECASE)
-            
-            for match in matches:
-                # Get some context around the match
-                start = max(0, match.start() - 150)
-                end = min(len(full_text), match.end() + 150)
-                context = full_text[start:end]
+        In the semantic mode, the chunks are split into sentences that are
+        matched against the controls (except skip_controls) instead.
+        
+        Returns:
+            Tuple of (text length, NLP seconds, semantic matches as returned
+            by SemanticMatcher.match, empty in other modes)
+        """
+        scanner = StreamingKeywordScanner(matcher, CONTEXT_CHARS)
+        
+        def scanned_chunks():
+            chunks = self.iter_document_chunks(file_path, extraction)
+            while True:
+                chunk_started = time.perf_counter()
+                next_chunk = next(chunks, None)
+                scan_started = time.perf_counter()
+                timings["extract"] += scan_started - chunk_started
+                if next_chunk is None:
+                    break
                 
-                # Add to evidence map
-                self.evidence_map[control_id].append({
-                    "document": doc_info["file_name"],
-                    "document_type": doc_info["document_type"],
-                    "keyword": keyword,
-                    "context": context.replace("\n", " ").strip(),
-                    "confidence": self._calculate_confidence(keyword, context, control_info)
-                })
+                offset, chunk, title = next_chunk
+                if title is not None:
+                    document_index.add_section(offset, title)
+                timings["chunks"] += 1
+                hits = scanner.feed(chunk)
+                timings["match"] += score(hits) - scan_started
+                yield chunk
+            
+            scan_started = time.perf_counter()
+            timings["match"] += score(scanner.finish()) - scan_started
+        
+        # Process with NLP (the chunks are only scanned in "none" mode)
+        nlp_started = time.perf_counter()
+        semantic_matches = {}
+        if self.nlp_mode == "semantic":
+            semantic_matches = self.semantic_matcher.match(
+                self.nlp, iter_sentences(scanned_chunks()), skip_controls
+            )
+        else:
+            self._process_nlp(scanned_chunks())
+        nlp_seconds = (time.perf_counter() - nlp_started
+                       - timings["extract"] - timings["match"] - timings["score"])
+        
+        return scanner.total_chars, nlp_seconds, semantic_matches
     
-    def _calculate_confidence(self, keyword, context, control_info):
+    def _process_nlp(self, chunks):
         """
-        Calculate a confidence score for the evidence based on:
-        - Presence of multiple keywords in the context
-        - Presence of required evidence terms
-        - Whether the context appears to be a header, policy statement, etc.
+        Run the NLP pipeline for the configured mode over a document's chunks.
         
-        This is a simplified version for the POC.
+        Chunks are combined into segments of up to NLP_SEGMENT_CHARS (longer
+        chunks are split) and processed in batches with nlp.pipe, so memory use
+        does not grow with the document. The chunk iterator is always
+        consumed, even in "none" mode.
+        
+        Returns:
+            Number of spaCy Docs processed
+        """
+        if self.nlp_mode == "none":
+            for _ in chunks:
+                pass
+            return 0
+        
+        nlp = self.nlp
+        max_length = min(nlp.max_length, NLP_SEGMENT_CHARS)
+        
+        def segments():
+            segment = []
+            segment_length = 0
+            for chunk in chunks:
+                for piece in self._split_for_nlp(chunk, max_length):
+                    if segment and segment_length + len(piece) > max_length:
+                        yield "".join(segment)
+                        segment = []
+                        segment_length = 0
+                    segment.append(piece)
+                    segment_length += len(piece)
+            if segment:
+                yield "".join(segment)
+        
+        # The Docs are not kept; evidence comes from the keyword scan
+        processed = 0
+        for _ in nlp.pipe(segments(), batch_size=NLP_BATCH_SIZE):
+            processed += 1
+        return processed
+    
+    def _split_for_nlp(self, text, max_length):
+        """Split text into chunks of at most max_length characters, at line breaks where possible."""
+        chunks = []
+        start = 0
+        while len(text) - start > max_length:
+            end = text.rfind("\n", start, start + max_length)
+            if end <= start:
+                end = start + max_length
+            else:
+                end += 1
+            chunks.append(text[start:end])
+            start = end
+        chunks.append(text[start:])
+        return chunks
+    
+    def _add_document_result(self, result):
+        """Record an analyzed document and merge its evidence into the evidence map."""
+        doc_info, evidence = result
+        
+        # Store document in analyzed list
+        self.analyzed_documents.append(doc_info)
+        self.document_evidence.append(evidence)
+        self.metrics.record_document(doc_info)
+        
+        if self.evidence_cache is not None and "cache" in doc_info:
+            hit = doc_info["cache"] == "hit"
+            self.evidence_cache.record_lookup(hit)
+            if not hit:
+                self.evidence_cache.evict()
+        
+        for control_id, control_evidence in evidence.items():
+            self.evidence_map[control_id].append((doc_info, control_evidence))
+    
+    def remove_document(self, file_path):
+        """
+        Retract an analyzed document and the evidence it contributed.
+        
+        Returns:
+            Set of control IDs whose evidence changed
+        """
+        affected = set()
+        kept_documents = []
+        kept_evidence = []
+        for doc_info, evidence in zip(self.analyzed_documents, self.document_evidence):
+            if doc_info["file_path"] == file_path:
+                affected.update(evidence)
+            else:
+                kept_documents.append(doc_info)
+                kept_evidence.append(evidence)
+        
+        self.analyzed_documents = kept_documents
+        self.document_evidence = kept_evidence
+        
+        # Rebuild the evidence of the affected controls in document order
+        for control_id in affected:
+            control_evidence = [
+                (doc_info, evidence[control_id])
+                for doc_info, evidence in zip(self.analyzed_documents, self.document_evidence)
+                if control_id in evidence
+            ]
+            if control_evidence:
+                self.evidence_map[control_id] = control_evidence
+            else:
+                self.evidence_map.pop(control_id, None)
+        
+        return affected
+    
+    def save_state(self, state_path):
+        """
+        Persist the per-document evidence and control results, so the
+        assessment can later be updated incrementally with restore_state.
+        """
+        state = {
+            "analyzer_version": ANALYZER_VERSION,
+            "catalog_version": self.catalog.version,
+            "max_evidence": self.max_evidence,
+            "semantic": self.nlp_mode == "semantic",
+            "documents": [
+                {
+                    "doc_info": {field: value for field, value in doc_info.items() if field not in RUN_FIELDS},
+                    "evidence": {
+                        control_id: control_evidence.to_dict()
+                        for control_id, control_evidence in evidence.items()
+                    }
+                }
+                for doc_info, evidence in zip(self.analyzed_documents, self.document_evidence)
+            ],
+            "control_results": self.assessment_results,
+            "required_evidence_coverage": self.required_evidence_coverage,
+            "short_circuited": self.short_circuited,
+            "skipped_documents": self.skipped_documents
+        }
+        
+        with open(state_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, separators=(",", ":"))
+        
+        return state_path
+    
+    def save_index(self, index_dir):
+        """
+        Write the evidence index of the analyzed documents (see evidence_index),
+        replacing the shards of documents analyzed in this run and removing
+        those of documents no longer in the assessment. The index of a fast
+        assessment is marked as incomplete.
+        """
+        write_index(
+            index_dir,
+            self.analyzed_documents,
+            self.controls,
+            {"analyzer_version": ANALYZER_VERSION, "catalog_version": self.catalog.version},
+            self.fast_assessment_summary() if self.short_circuited or self.skipped_documents else None
+        )
+        return index_dir
+    
+    def restore_state(self, state):
+        """
+        Restore documents, evidence and control results saved by save_state.
+        
+        Args:
+            state: The state dict read from a save_state file
+        
+        Returns:
+            True if restored; False if the state was produced by a different
+            analyzer version, control catalog or evidence limit, with or
+            without semantic evidence unlike this analyzer, or by a fast
+            assessment that did not collect all evidence (nothing is
+            restored then)
+        """
+        saved = (state.get("analyzer_version"), state.get("catalog_version"), state.get("max_evidence"),
+                 state.get("semantic", False))
+        if saved != (ANALYZER_VERSION, self.catalog.version, self.max_evidence, self.nlp_mode == "semantic"):
+            return False
+        if state.get("short_circuited") or state.get("skipped_documents"):
+            return False
+        
+        for document in state["documents"]:
+            self._add_document_result((document["doc_info"], {
+                control_id: ControlEvidence.from_dict(control_evidence)
+                for control_id, control_evidence in document["evidence"].items()
+            }))
+        
+        self.assessment_results = dict(state["control_results"])
+        self.required_evidence_coverage = dict(state.get("required_evidence_coverage", {}))
+        return True
+    
+    def _keyword_matcher_without(self, skip_controls):
+        """The keyword matcher for every control except skip_controls."""
+        if not skip_controls:
+            return self.keyword_matcher
+        # Settled controls only grow during an assessment, so one is kept
+        if self._partial_matcher[0] != skip_controls:
+            self._partial_matcher = (skip_controls, KeywordMatcher.from_controls({
+                control_id: control_info
+                for control_id, control_info in self.controls.items()
+                if control_id not in skip_controls
+            }))
+        return self._partial_matcher[1]
+    
+    def _score_matches(self, hits, builders, skip_controls=frozenset()):
+        """
+        Score a batch of keyword matches from the scanner and add them to the
+        evidence builders of the controls they belong to.
+        
+        Args:
+            hits: List of (keyword, start, end, context) in document order
+            builders: Dict of control ID -> ControlEvidenceBuilder, extended
+                with builders for controls matched for the first time
+            skip_controls: Controls whose matches are not scored
         """
-        confidence = 0.5  # Base confidence for a keyword match
+        if not hits:
+            return
+        hits = sorted(hits, key=lambda hit: (hit[1], hit[2]))
+        contexts = [context for _, _, _, context in hits]
         
-        # Check for multiple keywords
-        additional_keywords = sum(1 for kw in control_info["keywords"] 
-                                if kw != keyword and kw.lower() in context.lower())
-        confidence += additional_keywords * 0.1  # Boost for each additional keyword
+        # Term presence of every match context, computed once for the batch
+        presence = self.term_scorer.presence_matrix(contexts)
         
-        # Check for required evidence terms
-        evidence_terms = sum(1 for term in control_info["required_evidence"] 
-                           if term.lower() in context.lower())
-        confidence += evidence_terms * 0.1
+        # Evidence is reported with line breaks turned into spaces, which can
+        # join a term across lines
+        clean_presence = self.term_scorer.presence_with_line_breaks_as_spaces(contexts, presence)
         
-        # Look for policy language indicators
-        policy_indicators = ["shall", "must", "required", "policy", "procedure", "standard"]
-        if any(indicator in context.lower() for indicator in policy_indicators):
-            confidence += 0.1
+        rows_by_keyword = defaultdict(list)
+        for row, hit in enumerate(hits):
+            rows_by_keyword[hit[0]].append(row)
         
-        return min(0.95, confidence)  # Cap at 0.95 for POC
+        matched_controls = dict.fromkeys(
+            control_id for keyword in rows_by_keyword for control_id in self.controls_by_keyword[keyword]
+            if control_id not in skip_controls
+        )
+        for control_id in matched_controls:
+            control_info = self.controls[control_id]
+            rows = sorted(
+                row for keyword in dict.fromkeys(control_info["keywords"]) for row in rows_by_keyword.get(keyword, ())
+            )
+            confidences = keyword_confidences(
+                [hits[row][0] for row in rows], presence[rows], self.term_scorer, control_info
+            )
+            
+            builder = builders.get(control_id)
+            if builder is None:
+                builder = builders[control_id] = ControlEvidenceBuilder(control_info, self.max_evidence, CONTEXT_CHARS)
+            builder.add(
+                [(*hits[row], confidence) for row, confidence in zip(rows, confidences)],
+                required_evidence_found(clean_presence[rows], self.term_scorer, control_info)
+            )
     
-    def analyze_directory(self, directory_path):
-        """Analyze all supported documents in a directory."""
-        supported_extensions = ['.pdf', '.docx', '.doc', '.txt', '.md']
+    def _score_semantic_matches(self, matches, builders):
+        """
+        Add a document's semantic matches to the evidence builders of their
+        controls, with confidences derived from their similarity.
         
+        Args:
+            matches: Dict of control ID -> list of (keyword, start, end,
+                sentence, similarity) from SemanticMatcher.match
+            builders: Dict of control ID -> ControlEvidenceBuilder, extended
+                with builders for controls matched for the first time
+        """
+        for control_id, control_matches in matches.items():
+            control_info = self.controls[control_id]
+            sentences = [sentence for _, _, _, sentence, _ in control_matches]
+            presence = self.term_scorer.presence_with_line_breaks_as_spaces(
+                sentences, self.term_scorer.presence_matrix(sentences)
+            )
+            
+            builder = builders.get(control_id)
+            if builder is None:
+                builder = builders[control_id] = ControlEvidenceBuilder(control_info, self.max_evidence, CONTEXT_CHARS)
+            builder.add_semantic(
+                [(keyword, start, end, sentence, self.semantic_matcher.confidence(similarity))
+                 for keyword, start, end, sentence, similarity in control_matches],
+                required_evidence_found(presence, self.term_scorer, control_info)
+            )
+    
+    def get_evidence_items(self, control_id):
+        """
+        Build the evidence item dicts reported for a control: its most
+        confident matches across all documents, up to max_evidence.
+        """
+        return [
+            record.to_item(doc_info)
+            for doc_info, record in top_records(self.evidence_map.get(control_id, []), self.max_evidence)
+        ]
+    
+    def analyze_directory(self, directory_path, workers=1, progress_callback=None):
+        """
+        Analyze all supported documents in a directory.
+        
+        Args:
+            directory_path: Directory containing the documents
+            workers: Number of worker processes to analyze documents in
+            progress_callback: Optional callable, see analyze_documents
+        """
+        file_paths = []
+        document_types = []
         for filename in os.listdir(directory_path):
             file_path = os.path.join(directory_path, filename)
-            if os.path.isfile(file_path) and any(filename.lower().endswith(ext) for ext in supported_extensions):
+            if os.path.isfile(file_path) and any(filename.lower().endswith(ext) for ext in SUPPORTED_EXTENSIONS):
+                file_paths.append(file_path)
                 # Make a basic guess about document type from filename
-                doc_type = self._guess_document_type(filename)
-                self.analyze_document(file_path, doc_type)
+                document_types.append(self._guess_document_type(filename))
+        
+        self.analyze_documents(file_paths, document_types, workers, progress_callback)
+    
+    def create_process_pool(self, workers):
+        """
+        Create a process pool whose workers each load the NLP model once and
+        analyze documents against this analyzer's control definitions.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Workers that extract in isolation are started from the extraction
+        # processes' context (see document_extraction.process_context)
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=process_context() if self.extraction_limits is not None else None,
+            initializer=_init_pool_worker,
+            initargs=(self.catalog, self.evidence_cache, self.nlp_mode, self.max_evidence, self.extraction_limits)
+        )
+    
+    def analyze_documents(self, file_paths, document_types=None, workers=1,
+                          progress_callback=None, executor=None):
+        """
+        Analyze several documents, optionally in parallel worker processes.
+        
+        Evidence is always merged in input order, so results do not depend on
+        which worker finishes first.
+        
+        Args:
+            file_paths: List of document paths
+            document_types: Optional list of document types matching file_paths
+            workers: Number of worker processes (1 analyzes in this process)
+            progress_callback: Optional callable(completed, total, file_path)
+                invoked each time a document finishes
+            executor: Optional existing pool from create_process_pool to use
+                instead of starting one
+        """
+        for result in self.iter_document_results(file_paths, document_types, workers, progress_callback, executor):
+            if result is not None:
+                self._add_document_result(result)
+    
+    def analyze_documents_fast(self, file_paths, document_types=None, workers=1,
+                               progress_callback=None, executor=None):
+        """
+        Analyze documents for a fast assessment. Documents are analyzed in
+        order of likely yield (see order_by_yield) while the evidence of each
+        control is tracked, and controls whose status the remaining documents
+        can no longer change are not scanned for any more. Once every control
+        is settled, the remaining documents are skipped.
+        
+        Statuses are the same as after analyze_documents; the evidence,
+        strength and confidence of short-circuited controls reflect only the
+        documents analyzed before they were settled. Short-circuited controls
+        are recorded in short_circuited and skipped documents in
+        skipped_documents.
+        
+        Args:
+            Like analyze_documents. With several workers, documents are
+            analyzed in rounds of one document per worker and controls are
+            settled between rounds.
+        """
+        ordered = self.order_by_yield(file_paths, document_types)
+        total = len(ordered)
+        tracker = SufficiencyTracker(self.controls)
+        for doc_info, evidence in zip(self.analyzed_documents, self.document_evidence):
+            tracker.add(doc_info, evidence)
+        
+        pool = executor
+        if pool is None and workers > 1 and total > 1:
+            pool = self.create_process_pool(min(workers, total))
+        round_size = max(1, workers) if pool is not None else 1
+        
+        try:
+            for round_start in range(0, total, round_size):
+                remaining = ordered[round_start:]
+                for control_id in tracker.settle({document_type for _, document_type in remaining}):
+                    self.short_circuited[control_id] = {
+                        "status": tracker.settled[control_id],
+                        "after_documents": round_start
+                    }
+                if len(tracker.settled) == len(self.controls):
+                    self.skipped_documents = [file_path for file_path, _ in remaining]
+                    break
+                
+                round_documents = ordered[round_start:round_start + round_size]
+                
+                def round_progress(completed, _, file_path):
+                    if progress_callback:
+                        progress_callback(round_start + completed, total, file_path)
+                
+                for result in self.iter_document_results(
+                        [file_path for file_path, _ in round_documents],
+                        [document_type for _, document_type in round_documents],
+                        workers, round_progress, pool, frozenset(tracker.settled)):
+                    if result is not None:
+                        self._add_document_result(result)
+                        tracker.add(*result)
+        finally:
+            if executor is None and pool is not None:
+                pool.shutdown(cancel_futures=True)
+    
+    def order_by_yield(self, file_paths, document_types=None):
+        """
+        Order documents by how much they are likely to settle: one document
+        of each type before a second of any type (each new type adds to the
+        diversity of every control it has evidence for), types in
+        DOCUMENT_TYPE_YIELD order, and the larger documents of a type first.
+        
+        Returns:
+            List of (file path, document type) tuples
+        """
+        if document_types is None:
+            document_types = [None] * len(file_paths)
+        
+        paths_by_type = defaultdict(list)
+        for file_path, document_type in zip(file_paths, document_types):
+            document_type = document_type or self._guess_document_type(os.path.basename(file_path))
+            paths_by_type[document_type].append(file_path)
+        for paths in paths_by_type.values():
+            # Unreadable files go last (analyzing them reports the error)
+            paths.sort(key=lambda path: _file_size(path) or 0, reverse=True)
+        
+        ranked_types = sorted(paths_by_type, key=lambda document_type: (
+            DOCUMENT_TYPE_YIELD.index(document_type) if document_type in DOCUMENT_TYPE_YIELD
+            else len(DOCUMENT_TYPE_YIELD)
+        ))
+        ordered = []
+        for position in range(max(map(len, paths_by_type.values()), default=0)):
+            for document_type in ranked_types:
+                if position < len(paths_by_type[document_type]):
+                    ordered.append((paths_by_type[document_type][position], document_type))
+        return ordered
+    
+    def iter_document_results(self, file_paths, document_types=None, workers=1,
+                              progress_callback=None, executor=None, skip_controls=frozenset()):
+        """
+        Analyze several documents like analyze_documents, but yield each
+        document's (doc_info, evidence) result (None for unsupported files) in
+        input order instead of adding it to this analyzer.
+        
+        Args:
+            skip_controls: Controls not to collect evidence for (see
+                analyze_documents_fast)
+        """
+        total = len(file_paths)
+        if document_types is None:
+            document_types = [None] * total
+        
+        if executor is None and (workers <= 1 or total <= 1):
+            for i, (file_path, document_type) in enumerate(zip(file_paths, document_types)):
+                result = self._analyze_document_evidence(file_path, document_type, skip_controls)
+                if progress_callback:
+                    progress_callback(i + 1, total, file_path)
+                yield result
+            return
+        
+        pool = executor or self.create_process_pool(min(workers, total))
+        futures = {}
+        try:
+            futures = {
+                pool.submit(_analyze_in_pool_worker, file_path, document_type, skip_controls): i
+                for i, (file_path, document_type) in enumerate(zip(file_paths, document_types))
+            }
+            
+            # Buffer out-of-order results and yield each as soon as every
+            # document before it has been yielded
+            pending = {}
+            next_index = 0
+            for completed, future in enumerate(as_completed(futures), start=1):
+                index = futures[future]
+                pending[index] = future.result()
+                # The worker's copy of the cache counted its store, this one did not
+                if self.evidence_cache is not None and pending[index] is not None:
+                    stored = pending[index][0]["metrics"].get("cache_bytes")
+                    if stored is not None:
+                        self.evidence_cache.record_store(stored)
+                if progress_callback:
+                    progress_callback(completed, total, file_paths[index])
+                
+                while next_index in pending:
+                    yield pending.pop(next_index)
+                    next_index += 1
+        finally:
+            if executor is None:
+                pool.shutdown(cancel_futures=True)
+            else:
+                # Stopped early (e.g. the job was cancelled): free the shared pool
+                for future in futures:
+                    future.cancel()
+    
+    def add_analyzed_document(self, result, file_path, document_type=None):
+        """
+        Record a document analyzed by another analyzer with the same catalog
+        and settings (e.g. once for several assessments of a batch), under
+        this assessment's path and document type. The evidence is shared, not
+        copied.
+        
+        Args:
+            result: (doc_info, evidence) from iter_document_results
+            file_path: The document's path in this assessment
+            document_type: Its type in this assessment (default: guessed from
+                the file name)
+        """
+        doc_info, evidence = result
+        file_name = os.path.basename(file_path)
+        # The cache lookup belongs to the analyzer that analyzed the document
+        doc_info = dict(
+            {field: value for field, value in doc_info.items() if field != "cache"},
+            file_path=file_path,
+            file_name=file_name,
+            document_type=document_type or self._guess_document_type(file_name)
+        )
+        self._add_document_result((doc_info, evidence))
     
     def _guess_document_type(self, filename):
         """Make a basic guess about document type from filename."""
@@ -232,33 +1106,57 @@ class OTCCDocumentAnalyzer:
         else:
             return "unknown"
     
-    def generate_assessment(self):
+    def generate_assessment(self, control_ids=None):
         """
         Generate assessment results based on the evidence collected.
         For each control, determine compliance status and confidence.
+        
+        Args:
+            control_ids: Optional collection of controls whose evidence changed;
+                only these are re-evaluated and the other results are kept
+                (all controls are evaluated when there are no earlier results)
         """
+        if control_ids is None or not self.assessment_results:
+            control_ids = set(self.controls)
+            previous_results = {}
+        else:
+            control_ids = set(control_ids)
+            previous_results = self.assessment_results
+        
         results = {}
+        for control_id in control_ids:
+            self.required_evidence_coverage.pop(control_id, None)
         
         for control_id, control_info in self.controls.items():
-            evidence_items = self.evidence_map.get(control_id, [])
+            if control_id not in control_ids and control_id in previous_results:
+                results[control_id] = previous_results[control_id]
+                continue
             
-            if not evidence_items:
+            control_evidence = self.evidence_map.get(control_id, [])
+            evidence_count = sum(evidence.count for _, evidence in control_evidence)
+            
+            if not evidence_count:
                 # No evidence found
                 status = "Non-compliant"
                 confidence = 0.9  # High confidence that it's non-compliant (nothing found)
                 evidence_strength = 0
             else:
+                # Which required evidence terms any evidence context mentions
+                self.required_evidence_coverage[control_id] = [
+                    any(found) for found in zip(*(evidence.required_found for _, evidence in control_evidence))
+                ]
+                
                 # Analyze the collected evidence
-                evidence_strength = self._evaluate_evidence_strength(evidence_items, control_info)
+                evidence_strength = self._evaluate_evidence_strength(
+                    control_evidence, control_info, self.required_evidence_coverage[control_id]
+                )
                 
-                if evidence_strength >= 0.7:
-                    status = "Compliant"
+                status = status_for_strength(evidence_strength)
+                if status == "Compliant":
                     confidence = min(0.9, evidence_strength)
-                elif evidence_strength >= 0.3:
-                    status = "Partial"
+                elif status == "Partial":
                     confidence = 0.7
                 else:
-                    status = "Non-compliant"
                     confidence = 0.8
             
             # Store results
@@ -270,45 +1168,46 @@ class OTCCDocumentAnalyzer:
                 "status": status,
                 "confidence": confidence,
                 "evidence_strength": evidence_strength,
-                "evidence_count": len(evidence_items),
-                "evidence_items": evidence_items
+                "evidence_count": evidence_count,
+                "keyword_counts": self._count_keywords(control_evidence)
             }
+            if control_id in self.short_circuited:
+                results[control_id]["short_circuited"] = True
         
         self.assessment_results = results
         return results
     
-    def _evaluate_evidence_strength(self, evidence_items, control_info):
+    def _count_keywords(self, control_evidence):
+        """Total matches per keyword of a control across documents."""
+        keyword_counts = defaultdict(int)
+        for _, evidence in control_evidence:
+            for keyword, count in evidence.keyword_counts.items():
+                keyword_counts[keyword] += count
+        return dict(keyword_counts)
+    
+    def _evaluate_evidence_strength(self, control_evidence, control_info, required_found):
         """
         Evaluate the strength of the collected evidence for a control.
         This is a simplified version for the POC.
+        
+        Args:
+            control_evidence: List of (doc_info, ControlEvidence) of the control
+            required_found: Whether any evidence context mentions each
+                required evidence term
         """
-        if not evidence_items:
+        evidence_count = sum(evidence.count for _, evidence in control_evidence)
+        if not evidence_count:
             return 0
         
-        # Get the average confidence of the evidence items
-        avg_confidence = sum(item["confidence"] for item in evidence_items) / len(evidence_items)
+        # Get the average confidence of all matches (summed in match order)
+        avg_confidence = sum(chain.from_iterable(evidence.confidences for _, evidence in control_evidence)) / evidence_count
         
         # Check for evidence diversity (different document types)
-        doc_types = set(item["document_type"] for item in evidence_items if item["document_type"] != "unknown")
-        type_diversity = min(1.0, len(doc_types) / 3)  # Normalize to max of 1.0
-        
-        # Check for required evidence types
-        required_count = 0
-        for req in control_info["required_evidence"]:
-            # Check if any evidence context contains this required element
-            if any(req.lower() in item["context"].lower() for item in evidence_items):
-                required_count += 1
-        
-        required_coverage = required_count / len(control_info["required_evidence"])
-        
-        # Calculate overall strength (weighted average)
-        strength = (
-            avg_confidence * 0.4 +
-            type_diversity * 0.3 +
-            required_coverage * 0.3
-        )
+        doc_types = set(doc_info["document_type"] for doc_info, _ in control_evidence if doc_info["document_type"] != "unknown")
         
-        return strength
+        # Weighted average with the coverage of the required evidence types
+        # (any evidence context containing each element)
+        return combine_strength(avg_confidence, doc_types, required_found)
     
     def generate_recommendations(self):
         """
@@ -349,13 +1248,11 @@ class OTCCDocumentAnalyzer:
             
         elif result["status"] == "Partial":
             # Identify what evidence is missing
-            found_evidence = set()
-            for item in result["evidence_items"]:
-                for req in control_info["required_evidence"]:
-                    if req.lower() in item["context"].lower():
-                        found_evidence.add(req)
+            required_found = self.required_evidence_coverage[control_id]
             
-            missing_evidence = [req for req in control_info["required_evidence"] if req not in found_evidence]
+            missing_evidence = [
+                req for req, found in zip(control_info["required_evidence"], required_found) if not found
+            ]
             
             if missing_evidence:
                 recommendation = f"Enhance existing documentation with: {', '.join(missing_evidence)}."
@@ -407,8 +1304,19 @@ class OTCCDocumentAnalyzer:
             for domain, scores in domain_scores.items()
         }
     
+    def fast_assessment_summary(self):
+        """Which controls a fast assessment short-circuited and which documents it skipped."""
+        return {
+            "short_circuited": self.short_circuited,
+            "skipped_documents": self.skipped_documents
+        }
+    
     def export_results_to_json(self, output_path):
-        """Export assessment results to a JSON file."""
+        """
+        Export assessment results to a JSON file. With a columnar export
+        format, control results and evidence items are written as tables
+        next to it instead, and the file only references them.
+        """
         if not self.assessment_results:
             self.generate_assessment()
         
@@ -417,15 +1325,32 @@ class OTCCDocumentAnalyzer:
         
         export_data = {
             "overall_compliance": overall_compliance,
-            "assessment_date": pd.Timestamp.now().strftime("%Y-%m-%d"),
+            "assessment_date": date.today().strftime("%Y-%m-%d"),
             "controls_assessed": len(self.assessment_results),
             "documents_analyzed": len(self.analyzed_documents),
-            "control_results": self.assessment_results,
+            "document_extraction": [
+                {"document": doc_info["file_name"], **doc_info["extraction"]}
+                for doc_info in self.analyzed_documents
+            ],
             "recommendations": recommendations
         }
+        if self.export_format == "json":
+            export_data["control_results"] = {
+                control_id: {**result, "evidence_items": self.get_evidence_items(control_id)}
+                for control_id, result in self.assessment_results.items()
+            }
+        else:
+            export_data["tables"] = write_tables(
+                self, os.path.dirname(os.path.abspath(output_path)), self.export_format, self.assessment_id
+            )
+        if self.short_circuited or self.skipped_documents:
+            export_data["fast_assessment"] = self.fast_assessment_summary()
         
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2)
+            if self.export_format == "json":
+                json.dump(export_data, f, indent=2)
+            else:
+                json.dump(export_data, f, separators=(",", ":"))
         
         return output_path
 
@@ -0,0 +1,262 @@
+"""
+Sentence-level semantic evidence.
+
+Keyword matching only finds evidence that uses a control's exact keywords. In
+the "semantic" NLP mode, each sentence of a document is also compared with
+every control by word-vector similarity. The description and keywords of all
+controls are embedded once, when the model is loaded. A document's sentences
+are embedded in batches with nlp.pipe, and each batch is scored against all
+controls in a single matrix product. Per control, only the most similar
+sentences (above a threshold) are kept, so memory does not grow with the
+document. They become evidence with match type "semantic".
+
+Sentences that already mention one of a control's keywords are left to the
+keyword scan, so a passage is never counted twice for the same control.
+"""
+
+import re
+
+from evidence_scoring import BASE_CONFIDENCE, MAX_CONFIDENCE
+
+# numpy is imported on first use, like in evidence_scoring
+
+# Cosine similarity a sentence needs to a control's description or keywords
+SEMANTIC_THRESHOLD = 0.8
+
+# Most similar sentences kept per control and document
+SEMANTIC_TOP_K = 5
+
+# Sentences embedded and scored at a time
+SENTENCE_BATCH_SIZE = 256
+
+# Sentences shorter than this (in words) carry too little meaning to compare
+MIN_SENTENCE_WORDS = 4
+
+# Longer runs of text without a sentence break are compared in pieces
+MAX_SENTENCE_CHARS = 1000
+
+# A sentence ends at ., ! or ? followed by white space, or at a blank line
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+
+def iter_sentences(chunks):
+    """
+    Split a document's text, given as the chunks that join to it, into
+    sentences.
+
+    Yields:
+        (start, end, text) of each sentence, with offsets into the joined text
+    """
+    offset = 0
+    pending = ""
+    for chunk in chunks:
+        pending += chunk
+        last = 0
+        unfinished = len(pending)
+        for match in SENTENCE_BREAK.finditer(pending):
+            # A break at the very end may continue into the next chunk
+            if match.end() == len(pending):
+                unfinished = match.start()
+                break
+            yield from _sentences(pending, last, match.start(), offset)
+            last = match.end()
+        # Pieces of an overlong sentence need not wait for its end
+        while unfinished - last > MAX_SENTENCE_CHARS:
+            yield from _sentences(pending, last, last + MAX_SENTENCE_CHARS, offset)
+            last += MAX_SENTENCE_CHARS
+        offset += last
+        pending = pending[last:]
+    yield from _sentences(pending, 0, len(pending), offset)
+
+
+def _sentences(text, start, end, offset):
+    """
+    Yield the stripped sentence text[start:end], in pieces of at most
+    MAX_SENTENCE_CHARS, skipping pieces that are too short.
+    """
+    for piece_start in range(start, end, MAX_SENTENCE_CHARS):
+        sentence = text[piece_start:min(end, piece_start + MAX_SENTENCE_CHARS)]
+        stripped = sentence.strip()
+        if len(stripped.split()) < MIN_SENTENCE_WORDS:
+            continue
+        sentence_start = offset + piece_start + len(sentence) - len(sentence.lstrip())
+        yield sentence_start, sentence_start + len(stripped), stripped
+
+
+def _unit_rows(vectors):
+    """Scale each row to unit length (rows without a vector stay zero)."""
+    import numpy as np
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+class SemanticMatcher:
+    """
+    Precomputed embeddings of every control's description and keywords, used
+    to find the sentences of a document most similar to each control.
+    """
+
+    def __init__(self, controls, nlp, term_scorer, threshold=SEMANTIC_THRESHOLD, top_k=SEMANTIC_TOP_K):
+        """
+        Args:
+            controls: Control definitions by ID
+            nlp: spaCy pipeline with word vectors
+            term_scorer: The catalog's TermPresenceScorer, used to find
+                sentences that mention a control's keywords
+
+        Raises:
+            ValueError: If the pipeline has no word vectors
+        """
+        import numpy as np
+
+        if not nlp.vocab.vectors_length:
+            raise ValueError("Semantic matching needs a spaCy model with word vectors")
+
+        self.control_ids = list(controls)
+        self.threshold = threshold
+        self.top_k = top_k
+        self.term_scorer = term_scorer
+
+        # One row per description and keyword, grouped by control
+        self.labels = []
+        row_starts = []
+        keyword_columns = np.zeros((len(term_scorer.terms), len(self.control_ids)), dtype=np.float32)
+        for index, control_info in enumerate(controls.values()):
+            keywords = list(dict.fromkeys(control_info["keywords"]))
+            row_starts.append(len(self.labels))
+            self.labels.append(None)
+            self.labels.extend(keywords)
+            keyword_columns[term_scorer.column_indexes(keywords), index] = 1
+        self.row_starts = np.array(row_starts)
+        self.keyword_columns = keyword_columns
+
+        texts = []
+        for control_info in controls.values():
+            texts.append(control_info["description"])
+            texts.extend(dict.fromkeys(control_info["keywords"]))
+        self.vectors = self.embed(nlp, texts)
+
+    def confidence(self, similarity):
+        """
+        Confidence of a semantic match: the threshold similarity counts as much
+        as a bare keyword match, and identical meaning as much as the best one.
+        """
+        scale = (similarity - self.threshold) / (1 - self.threshold) if self.threshold < 1 else 1.0
+        return min(MAX_CONFIDENCE, BASE_CONFIDENCE + max(0.0, scale) * (MAX_CONFIDENCE - BASE_CONFIDENCE))
+
+    def embed(self, nlp, texts):
+        """
+        Unit vectors of texts, tokenized with nlp.pipe (texts x dimensions).
+
+        The direction of each text's Doc.vector (the mean of its word
+        vectors), but the word vectors of all texts are looked up and summed
+        at once instead of token by token.
+        """
+        import numpy as np
+        from spacy.attrs import ORTH
+
+        docs = list(nlp.pipe(texts, batch_size=SENTENCE_BATCH_SIZE))
+        table = nlp.vocab.vectors
+        if table.mode != "default":
+            # Subword (floret) vectors are only computed per token
+            return _unit_rows(np.array([doc.vector for doc in docs], dtype=np.float32).reshape(len(docs), -1))
+
+        keys = [doc.to_array(ORTH) for doc in docs]
+        lengths = np.array([len(doc_keys) for doc_keys in keys])
+        sums = np.zeros((len(docs), table.shape[1]), dtype=np.float32)
+        if lengths.sum():
+            rows = table.find(keys=np.concatenate(keys))
+            token_vectors = np.asarray(table.data)[rows]
+            token_vectors[rows < 0] = 0
+            # Each text's tokens are a contiguous run; empty texts have none
+            starts = (np.cumsum(lengths) - lengths)[lengths > 0]
+            sums[lengths > 0] = np.add.reduceat(token_vectors, starts, axis=0)
+        return _unit_rows(sums)
+
+    def similarities(self, sentence_vectors, texts):
+        """
+        Similarity of each sentence to each control: the highest cosine
+        similarity to its description or any of its keywords, or -inf if
+        the sentence mentions one of its keywords (sentences x controls).
+        """
+        import numpy as np
+
+        by_control = np.maximum.reduceat(sentence_vectors @ self.vectors.T, self.row_starts, axis=1)
+        mentions = self.term_scorer.presence_matrix(texts).astype(np.float32) @ self.keyword_columns
+        by_control[mentions > 0] = -np.inf
+        return by_control
+
+    def match(self, nlp, sentences, skip_controls=frozenset()):
+        """
+        Find the sentences most similar to each control.
+
+        Args:
+            nlp: The spaCy pipeline the controls were embedded with
+            sentences: Iterable of (start, end, text), e.g. from iter_sentences
+            skip_controls: Controls not to find sentences for
+
+        Returns:
+            Dict of control ID -> list of (label, start, end, text, similarity),
+            most similar first, for controls with a sentence above the
+            threshold. The label is the keyword closest to the sentence.
+        """
+        import numpy as np
+
+        controls = len(self.control_ids)
+        skipped = [index for index, control_id in enumerate(self.control_ids) if control_id in skip_controls]
+        top_scores = np.full((0, controls), -np.inf, dtype=np.float32)
+        top_ids = np.zeros((0, controls), dtype=np.int64)
+        # Sentence ID -> (start, end, text, unit vector), for sentences in top_ids
+        kept = {}
+        counted = 0
+
+        def score(batch):
+            nonlocal top_scores, top_ids, kept, counted
+            texts = [text for _, _, text in batch]
+            vectors = self.embed(nlp, texts)
+            by_control = self.similarities(vectors, texts)
+            by_control[by_control < self.threshold] = -np.inf
+            by_control[:, skipped] = -np.inf
+
+            ids = np.arange(counted, counted + len(batch))
+            for sentence_id, sentence, vector in zip(ids.tolist(), batch, vectors):
+                kept[sentence_id] = (*sentence, vector)
+            counted += len(batch)
+
+            scores = np.vstack([top_scores, by_control])
+            candidates = np.vstack([top_ids, np.repeat(ids[:, None], controls, axis=1)])
+            if len(scores) > self.top_k:
+                best = np.argpartition(-scores, self.top_k - 1, axis=0)[:self.top_k]
+                scores = np.take_along_axis(scores, best, axis=0)
+                candidates = np.take_along_axis(candidates, best, axis=0)
+            top_scores, top_ids = scores, candidates
+            live = set(top_ids[np.isfinite(top_scores)].tolist())
+            kept = {sentence_id: kept[sentence_id] for sentence_id in live}
+
+        batch = []
+        for sentence in sentences:
+            batch.append(sentence)
+            if len(batch) == SENTENCE_BATCH_SIZE:
+                score(batch)
+                batch = []
+        if batch:
+            score(batch)
+
+        matches = {}
+        for index, control_id in enumerate(self.control_ids):
+            found = [
+                (float(similarity), sentence_id)
+                for similarity, sentence_id in zip(top_scores[:, index].tolist(), top_ids[:, index].tolist())
+                if similarity != -np.inf
+            ]
+            if not found:
+                continue
+            found.sort(key=lambda item: (-item[0], item[1]))
+            rows = slice(self.row_starts[index] + 1, self.row_starts[index + 1] if index + 1 < controls else None)
+            matches[control_id] = []
+            for similarity, sentence_id in found:
+                start, end, text, vector = kept[sentence_id]
+                label = self.labels[rows][int(np.argmax(self.vectors[rows] @ vector))]
+                matches[control_id].append((label, start, end, text, similarity))
+        return matches
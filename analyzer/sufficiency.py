@@ -0,0 +1,138 @@
+"""
+Evidence strength of a control, and how far it can still move.
+
+A control's strength is a weighted sum of the average confidence of its
+keyword matches, the diversity of the document types they were found in and
+the coverage of its required evidence terms; the strength decides its status.
+Coverage and diversity only grow as documents are added, and every match
+confidence lies between BASE_CONFIDENCE and MAX_CONFIDENCE, so while an
+assessment is under way the strength of each control is bounded by what has
+been found so far and by the types of the documents still to be analyzed.
+SufficiencyTracker uses these bounds for fast assessments: once both fall
+within the same status the control's status is settled, and its keywords no
+longer need to be scanned for.
+"""
+
+from collections import defaultdict
+
+from evidence_scoring import BASE_CONFIDENCE, MAX_CONFIDENCE
+
+# Weights of the strength components
+CONFIDENCE_WEIGHT = 0.4
+DIVERSITY_WEIGHT = 0.3
+COVERAGE_WEIGHT = 0.3
+
+# Number of distinct (known) document types that counts as full diversity
+DIVERSE_DOCUMENT_TYPES = 3
+
+# Minimum strength of each status, strongest first
+COMPLIANT_STRENGTH = 0.7
+PARTIAL_STRENGTH = 0.3
+
+
+def combine_strength(avg_confidence, doc_types, required_found):
+    """
+    Strength of a control's evidence.
+
+    Args:
+        avg_confidence: Average confidence of the control's matches
+        doc_types: Set of the known document types the matches were found in
+        required_found: Whether any evidence context mentions each required
+            evidence term
+    """
+    type_diversity = min(1.0, len(doc_types) / DIVERSE_DOCUMENT_TYPES)
+    required_coverage = sum(required_found) / len(required_found)
+    return (
+        avg_confidence * CONFIDENCE_WEIGHT +
+        type_diversity * DIVERSITY_WEIGHT +
+        required_coverage * COVERAGE_WEIGHT
+    )
+
+
+def status_for_strength(evidence_strength):
+    """The compliance status an evidence strength amounts to."""
+    if evidence_strength >= COMPLIANT_STRENGTH:
+        return "Compliant"
+    if evidence_strength >= PARTIAL_STRENGTH:
+        return "Partial"
+    return "Non-compliant"
+
+
+class SufficiencyTracker:
+    """
+    Running evidence aggregates per control while documents are analyzed,
+    used to tell which controls' statuses can no longer change.
+    """
+
+    def __init__(self, controls):
+        """
+        Args:
+            controls: Control definitions by ID
+        """
+        self.controls = controls
+        self._counts = defaultdict(int)
+        self._confidence_sums = defaultdict(float)
+        self._doc_types = defaultdict(set)
+        self._required_found = {
+            control_id: [False] * len(control_info["required_evidence"])
+            for control_id, control_info in controls.items()
+        }
+        # Control ID -> status, for controls whose status is settled
+        self.settled = {}
+
+    def add(self, doc_info, evidence):
+        """Add the evidence (ControlEvidence by control ID) of an analyzed document."""
+        for control_id, control_evidence in evidence.items():
+            if control_id not in self.controls or not control_evidence.count:
+                continue
+            self._counts[control_id] += control_evidence.count
+            self._confidence_sums[control_id] += sum(control_evidence.confidences)
+            if doc_info["document_type"] != "unknown":
+                self._doc_types[control_id].add(doc_info["document_type"])
+            self._required_found[control_id] = [
+                found or found_now
+                for found, found_now in zip(self._required_found[control_id], control_evidence.required_found)
+            ]
+
+    def bounds(self, control_id, remaining_types):
+        """
+        Lowest and highest strength a control can end up with.
+
+        Args:
+            control_id: The control
+            remaining_types: Set of the document types still to be analyzed
+                (empty when no documents remain)
+        """
+        count = self._counts[control_id]
+        doc_types = self._doc_types[control_id]
+        required_found = self._required_found[control_id]
+        if not remaining_types:
+            current = combine_strength(self._confidence_sums[control_id] / count, doc_types, required_found) \
+                if count else 0
+            return current, current
+
+        # More matches can pull the average confidence down to the base
+        # confidence, but cannot take away document types or required terms
+        lowest = combine_strength(BASE_CONFIDENCE, doc_types, required_found) if count else 0
+        reachable_types = doc_types | {doc_type for doc_type in remaining_types if doc_type != "unknown"}
+        highest = combine_strength(MAX_CONFIDENCE, reachable_types, [True] * len(required_found))
+        return lowest, highest
+
+    def settle(self, remaining_types):
+        """
+        Settle every control whose status the remaining documents can no
+        longer change.
+
+        Returns:
+            List of the control IDs settled by this call, in catalog order
+        """
+        newly_settled = []
+        for control_id in self.controls:
+            if control_id in self.settled:
+                continue
+            lowest, highest = self.bounds(control_id, remaining_types)
+            status = status_for_strength(lowest)
+            if status == status_for_strength(highest):
+                self.settled[control_id] = status
+                newly_settled.append(control_id)
+        return newly_settled
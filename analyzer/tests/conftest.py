@@ -0,0 +1,59 @@
+"""
+Shared fixtures of the analyzer's regression tests.
+
+The analyzer modules are imported the way analyzer_cli imports them (from
+the analyzer directory), and test documents come from the benchmark's
+synthetic corpus generator.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+ANALYZER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ANALYZER_DIR)
+sys.path.insert(0, os.path.join(ANALYZER_DIR, "benchmarks"))
+
+from control_catalog import load_catalog  # noqa: E402
+from synthetic_corpus import generate_corpus  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def catalog():
+    """The bundled control catalog."""
+    return load_catalog()
+
+
+@pytest.fixture(scope="session")
+def corpus_terms(catalog):
+    """Every keyword and required evidence term of the catalog."""
+    return sorted({
+        term
+        for control_info in catalog.controls.values()
+        for term in control_info["keywords"] + control_info["required_evidence"]
+    })
+
+
+@pytest.fixture(scope="session")
+def text_corpus(tmp_path_factory, corpus_terms):
+    """Paths of plain-text and Markdown documents of every document kind."""
+    directory = tmp_path_factory.mktemp("corpus")
+    documents = generate_corpus(str(directory), corpus_terms, ("txt", "md"), (8, 24), density=0.03)
+    return [path for path, _ in documents]
+
+
+@pytest.fixture(scope="session")
+def few_controls_catalog(tmp_path_factory, catalog):
+    """
+    A catalog of two of the bundled controls, which the text corpus settles
+    after a few documents.
+    """
+    path = tmp_path_factory.mktemp("catalog") / "catalog.json"
+    path.write_text(json.dumps({
+        "name": "Test catalog",
+        "version": "test",
+        "controls": {control_id: catalog.controls[control_id] for control_id in ("1-1-3", "3-1-1")}
+    }), encoding="utf-8")
+    return load_catalog(str(path))
@@ -0,0 +1,71 @@
+"""Batch assessments against single runs of the same documents."""
+
+import json
+import os
+
+import pytest
+
+from analyzer_cli import run_assessment, run_batch
+from evidence_cache import EvidenceCache
+from otcc_document_analyzer import OTCCDocumentAnalyzer
+
+
+def quiet(event):
+    pass
+
+
+def write_manifest(directory, assessment_id, documents):
+    directory.mkdir()
+    path = directory / "manifest.json"
+    path.write_text(json.dumps({
+        "assessmentId": assessment_id,
+        "documents": [{"path": document} for document in documents]
+    }), encoding="utf-8")
+    return str(path)
+
+
+def comparable_results(output_dir):
+    """results.json without the timings that differ between runs."""
+    with open(os.path.join(output_dir, "results.json"), 'r', encoding='utf-8') as f:
+        results = json.load(f)
+    results.pop("metrics")
+    for document in results["documentExtraction"]:
+        document.pop("seconds")
+    return results
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_results_match_single_runs(catalog, text_corpus, tmp_path, workers):
+    missing = str(tmp_path / "missing_policy.txt")
+    packs = {
+        "first": text_corpus[:5] + [missing],
+        "second": text_corpus[3:8] + [missing]
+    }
+    manifests = [write_manifest(tmp_path / name, name, documents) for name, documents in packs.items()]
+
+    summary = run_batch(OTCCDocumentAnalyzer(catalog=catalog), manifests, str(tmp_path / "batch"), quiet,
+                        workers=workers)
+
+    for name, documents in packs.items():
+        single = OTCCDocumentAnalyzer(catalog=catalog)
+        single.assessment_id = name
+        run_assessment(single, documents, str(tmp_path / f"single-{name}"), quiet)
+        assert comparable_results(str(tmp_path / name)) == comparable_results(str(tmp_path / f"single-{name}"))
+    assert [assessment["documents"] for assessment in summary["assessments"]] == [6, 6]
+    assert all(not assessment["skipped_documents"] for assessment in summary["assessments"])
+
+
+def test_batch_keeps_the_cache_within_its_limit(catalog, text_corpus, tmp_path):
+    manifests = [
+        write_manifest(tmp_path / "first", "first", text_corpus[:12]),
+        write_manifest(tmp_path / "second", "second", text_corpus[8:])
+    ]
+    full = EvidenceCache(str(tmp_path / "full"))
+    OTCCDocumentAnalyzer(catalog=catalog, evidence_cache=full).analyze_documents(text_corpus)
+    max_bytes = full.stats()["size_bytes"] // 3
+
+    cache = EvidenceCache(str(tmp_path / "cache"), max_bytes=max_bytes)
+    run_batch(OTCCDocumentAnalyzer(catalog=catalog, evidence_cache=cache), manifests, str(tmp_path / "batch"), quiet)
+    stats = cache.stats()
+    assert stats["evictions"] > 0
+    assert 0 < stats["size_bytes"] <= max_bytes
@@ -0,0 +1,30 @@
+"""The benchmark's baseline comparison."""
+
+from bench_analyzer import compare
+
+
+def result(docs_per_sec, stages):
+    return {
+        "throughput": {"docs_per_sec": docs_per_sec},
+        "stages": {stage: {"p50_ms": p50, "p90_ms": p50} for stage, p50 in stages.items()}
+    }
+
+
+def regressed(rows):
+    return [row[0] for row in rows if row[4]]
+
+
+def test_sub_millisecond_noise_is_not_a_regression():
+    baseline = result(20.0, {"analyze_document": 40.0, "generate_recommendations": 0.023})
+    current = result(19.0, {"analyze_document": 42.0, "generate_recommendations": 0.027})
+    assert regressed(compare(current, baseline, 0.15)) == []
+
+
+def test_slower_stages_and_throughput_are_regressions():
+    baseline = result(20.0, {"analyze_document": 40.0, "generate_recommendations": 0.023})
+    current = result(15.0, {"analyze_document": 50.0, "generate_recommendations": 2.0})
+    assert regressed(compare(current, baseline, 0.15)) == [
+        "docs_per_sec",
+        "analyze_document.p50_ms", "analyze_document.p90_ms",
+        "generate_recommendations.p50_ms", "generate_recommendations.p90_ms"
+    ]
@@ -0,0 +1,43 @@
+"""The compiled catalog cache."""
+
+import os
+import pickle
+
+from control_catalog import COMPILED_FORMAT_VERSION, ControlCatalog, DEFAULT_CATALOG_PATH, load_catalog
+
+
+def plant_cached_catalog(cache_dir, replacement):
+    """Overwrite the cached compiled catalog with replacement, keeping it current."""
+    (cache_path,) = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)]
+    stat = os.stat(DEFAULT_CATALOG_PATH)
+    with open(cache_path, 'wb') as f:
+        pickle.dump({
+            "format": COMPILED_FORMAT_VERSION,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "source_hash": None,
+            "catalog": replacement
+        }, f)
+    return cache_path
+
+
+def test_catalog_cache_is_private_and_reused(tmp_path):
+    cache_dir = str(tmp_path / "catalogs")
+    catalog = load_catalog(cache_dir=cache_dir)
+
+    assert isinstance(catalog, ControlCatalog)
+    assert os.stat(cache_dir).st_mode & 0o777 == 0o700
+    assert all(os.stat(os.path.join(cache_dir, name)).st_mode & 0o077 == 0 for name in os.listdir(cache_dir))
+    plant_cached_catalog(cache_dir, "cached")
+    assert load_catalog(cache_dir=cache_dir) == "cached"
+
+
+def test_catalog_cache_writable_by_others_is_not_loaded(tmp_path):
+    cache_dir = str(tmp_path / "catalogs")
+    catalog = load_catalog(cache_dir=cache_dir)
+    os.chmod(plant_cached_catalog(cache_dir, "tampered"), 0o666)
+    assert load_catalog(cache_dir=cache_dir).version == catalog.version
+
+    plant_cached_catalog(cache_dir, "tampered")
+    os.chmod(cache_dir, 0o777)
+    assert load_catalog(cache_dir=cache_dir).version == catalog.version
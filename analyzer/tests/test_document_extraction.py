@@ -0,0 +1,44 @@
+"""Extraction statuses of documents that are missing or cannot be parsed."""
+
+import os
+
+import pytest
+
+from document_extraction import ExtractionLimits
+from otcc_document_analyzer import OTCCDocumentAnalyzer
+
+
+def extraction_statuses(analyzer):
+    return {doc_info["file_name"]: doc_info["extraction"] for doc_info in analyzer.analyzed_documents}
+
+
+@pytest.mark.parametrize("extraction_limits", [None, ExtractionLimits()], ids=["in-process", "isolated"])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_unreadable_documents_fail_and_the_rest_are_analyzed(catalog, text_corpus, tmp_path,
+                                                             extraction_limits, workers):
+    corrupt = tmp_path / "corrupt_policy.pdf"
+    corrupt.write_bytes(os.urandom(4096))
+    missing = [str(tmp_path / name) for name in ("missing_policy.pdf", "missing_procedure.docx", "missing_log.txt")]
+    documents = text_corpus[:4] + [str(corrupt)] + missing
+
+    analyzer = OTCCDocumentAnalyzer(catalog=catalog, extraction_limits=extraction_limits)
+    analyzer.analyze_documents(documents, workers=workers)
+    statuses = extraction_statuses(analyzer)
+
+    assert [doc_info["file_path"] for doc_info in analyzer.analyzed_documents] == documents
+    for path in missing:
+        assert statuses[os.path.basename(path)]["status"] == "failed"
+        assert statuses[os.path.basename(path)]["error"] == "File not found"
+    assert statuses[corrupt.name]["status"] == "failed"
+    assert statuses[corrupt.name]["reason"] == "error"
+    for path in text_corpus[:4]:
+        assert statuses[os.path.basename(path)]["status"] == "ok"
+
+    # The readable documents still count towards the assessment
+    reference = OTCCDocumentAnalyzer(catalog=catalog)
+    reference.analyze_documents(text_corpus[:4])
+    assert {
+        control_id: result["evidence_count"] for control_id, result in analyzer.generate_assessment().items()
+    } == {
+        control_id: result["evidence_count"] for control_id, result in reference.generate_assessment().items()
+    }
@@ -0,0 +1,42 @@
+"""Evidence cache bookkeeping: stores, tracked size and eviction."""
+
+import pytest
+
+from evidence_cache import EvidenceCache
+from otcc_document_analyzer import OTCCDocumentAnalyzer
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_stores_and_size_match_the_cache_on_disk(catalog, text_corpus, tmp_path, workers):
+    cache = EvidenceCache(str(tmp_path / "cache"))
+    documents = text_corpus[:6] + [str(tmp_path / "missing_policy.txt")]
+    OTCCDocumentAnalyzer(catalog=catalog, evidence_cache=cache).analyze_documents(documents, workers=workers)
+
+    tracked = cache.size_bytes
+    stats = cache.stats()
+    # Only the readable documents were stored, each counted once
+    assert stats["stores"] == stats["entries"] == len(text_corpus[:6])
+    if workers == 1:
+        assert tracked == stats["size_bytes"]
+    else:
+        # Workers may store entries that a scan sees before their results are
+        # counted; counting them twice only makes eviction rescan sooner
+        assert tracked >= stats["size_bytes"]
+
+    # A second run only hits the cache
+    cache = EvidenceCache(str(tmp_path / "cache"))
+    OTCCDocumentAnalyzer(catalog=catalog, evidence_cache=cache).analyze_documents(documents, workers=workers)
+    assert (cache.hits, cache.misses, cache.stores) == (len(text_corpus[:6]), 0, 0)
+
+
+def test_eviction_keeps_the_cache_within_its_limit(catalog, text_corpus, tmp_path):
+    full = EvidenceCache(str(tmp_path / "full"))
+    OTCCDocumentAnalyzer(catalog=catalog, evidence_cache=full).analyze_documents(text_corpus)
+    max_bytes = full.stats()["size_bytes"] // 3
+
+    cache = EvidenceCache(str(tmp_path / "cache"), max_bytes=max_bytes)
+    OTCCDocumentAnalyzer(catalog=catalog, evidence_cache=cache).analyze_documents(text_corpus)
+    stats = cache.stats()
+    assert stats["evictions"] > 0
+    assert stats["entries"] + stats["evictions"] == len(text_corpus)
+    assert 0 < stats["size_bytes"] <= max_bytes
@@ -0,0 +1,68 @@
+"""Evidence index lookups against scanning the documents directly."""
+
+import os
+
+from analyzer_cli import query_index, run_assessment
+from keyword_matcher import KeywordMatcher
+from otcc_document_analyzer import OTCCDocumentAnalyzer
+
+
+def quiet(event):
+    pass
+
+
+def scanned_postings(paths, keywords):
+    """Every match of keywords in the documents, in document and offset order."""
+    matcher = KeywordMatcher(keywords)
+    postings = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as file:
+            hits = matcher.find_all(file.read())
+        postings.extend(sorted(
+            (os.path.basename(path), start, end, keyword)
+            for keyword in keywords
+            for start, end in hits.get(keyword, ())
+        ))
+    return postings
+
+
+def answer_postings(answer):
+    return [(match["document"], match["start"], match["end"], match["keyword"]) for match in answer["matches"]]
+
+
+def test_lookups_match_a_direct_scan(catalog, text_corpus, tmp_path):
+    analyzer = OTCCDocumentAnalyzer(catalog=catalog)
+    run_assessment(analyzer, text_corpus, str(tmp_path), quiet)
+
+    for control_id, control_info in catalog.controls.items():
+        keywords = list(dict.fromkeys(control_info["keywords"]))
+        answer = query_index(str(tmp_path), control_id=control_id)
+        assert "partial" not in answer
+        assert answer_postings(answer) == scanned_postings(text_corpus, keywords)
+        assert sum(document["matches"] for document in answer["documents"]) == \
+            analyzer.assessment_results[control_id]["evidence_count"]
+
+    keyword = catalog.controls["2-4-1"]["keywords"][0]
+    answer = query_index(str(tmp_path), keyword=keyword.upper())
+    assert answer_postings(answer) == scanned_postings(text_corpus, [keyword])
+
+
+def test_fast_assessment_index_is_marked_partial(few_controls_catalog, text_corpus, tmp_path):
+    analyzer = OTCCDocumentAnalyzer(catalog=few_controls_catalog)
+    run_assessment(analyzer, text_corpus, str(tmp_path), quiet, fast=True)
+    assert analyzer.skipped_documents
+
+    skipped = [os.path.basename(path) for path in analyzer.skipped_documents]
+    for control_id, control_info in few_controls_catalog.controls.items():
+        answer = query_index(str(tmp_path), control_id=control_id)
+        assert answer["partial"] == {
+            "keywords": list(dict.fromkeys(control_info["keywords"])),
+            "skipped_documents": skipped
+        }
+        # What the index does hold is right
+        indexed = {document for document, _, _, _ in answer_postings(answer)}
+        assert not indexed & set(skipped)
+
+    # A full run over the same output replaces the partial index
+    run_assessment(OTCCDocumentAnalyzer(catalog=few_controls_catalog), text_corpus, str(tmp_path), quiet)
+    assert "partial" not in query_index(str(tmp_path), control_id="3-1-1")
@@ -0,0 +1,42 @@
+"""Bounded evidence per control against keeping every record."""
+
+import json
+
+import pytest
+
+from evidence_records import ControlEvidence
+from otcc_document_analyzer import OTCCDocumentAnalyzer
+
+
+def analyze(catalog, paths, max_evidence):
+    analyzer = OTCCDocumentAnalyzer(catalog=catalog, max_evidence=max_evidence)
+    analyzer.analyze_documents(paths)
+    analyzer.generate_assessment()
+    return analyzer
+
+
+@pytest.mark.parametrize("max_evidence", [1, 3, 20])
+def test_bounded_evidence_keeps_scores_and_best_items(catalog, text_corpus, max_evidence):
+    unbounded = analyze(catalog, text_corpus, None)
+    bounded = analyze(catalog, text_corpus, max_evidence)
+
+    # Every match still counts towards the score
+    assert bounded.assessment_results == unbounded.assessment_results
+    for control_id in catalog.controls:
+        for _, evidence in bounded.evidence_map[control_id]:
+            assert len(evidence.records) <= max_evidence
+        # The items kept are the most confident of all records
+        items = bounded.get_evidence_items(control_id)
+        assert items == unbounded.get_evidence_items(control_id)[:max_evidence]
+        confidences = [item["confidence"] for item in items]
+        assert confidences == sorted(confidences, reverse=True)
+
+
+def test_evidence_round_trips_through_its_serialized_form(catalog, text_corpus):
+    analyzer = analyze(catalog, text_corpus[:3], 5)
+    for evidence in analyzer.document_evidence:
+        for control_evidence in evidence.values():
+            data = json.loads(json.dumps(control_evidence.to_dict()))
+            restored = ControlEvidence.from_dict(data)
+            assert restored.to_dict() == control_evidence.to_dict()
+            assert list(restored.confidences) == list(control_evidence.confidences)
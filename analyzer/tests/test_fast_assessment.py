@@ -0,0 +1,53 @@
+"""Fast assessment statuses against a full run."""
+
+import pytest
+
+from otcc_document_analyzer import OTCCDocumentAnalyzer
+
+
+def statuses(analyzer):
+    return {control_id: result["status"] for control_id, result in analyzer.generate_assessment().items()}
+
+
+@pytest.mark.parametrize("catalog_fixture", ["catalog", "few_controls_catalog"])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_fast_statuses_match_a_full_run(request, text_corpus, catalog_fixture, workers):
+    catalog = request.getfixturevalue(catalog_fixture)
+    full = OTCCDocumentAnalyzer(catalog=catalog)
+    full.analyze_documents(text_corpus)
+
+    fast = OTCCDocumentAnalyzer(catalog=catalog)
+    fast.analyze_documents_fast(text_corpus, workers=workers)
+
+    assert statuses(fast) == statuses(full)
+    # The corpus settles controls early, so this compares a real fast run
+    assert fast.short_circuited
+    if catalog_fixture == "few_controls_catalog":
+        assert fast.skipped_documents
+        assert len(fast.analyzed_documents) + len(fast.skipped_documents) == len(text_corpus)
+
+    # Controls that were never settled got every document's evidence (in
+    # another document order, so sums may differ in the last bit)
+    for control_id, result in fast.assessment_results.items():
+        if control_id not in fast.short_circuited:
+            expected = full.assessment_results[control_id]
+            assert result["evidence_count"] == expected["evidence_count"]
+            assert result["keyword_counts"] == expected["keyword_counts"]
+            assert result["evidence_strength"] == pytest.approx(expected["evidence_strength"], rel=1e-12)
+
+
+def test_fast_statuses_with_cached_evidence(catalog, text_corpus, tmp_path):
+    from evidence_cache import EvidenceCache
+
+    full = OTCCDocumentAnalyzer(catalog=catalog)
+    full.analyze_documents(text_corpus)
+
+    # Half the documents come from the cache, the rest are scanned partially
+    cached = OTCCDocumentAnalyzer(catalog=catalog, evidence_cache=EvidenceCache(str(tmp_path)))
+    cached.analyze_documents(text_corpus[::2])
+    cache = EvidenceCache(str(tmp_path))
+    fast = OTCCDocumentAnalyzer(catalog=catalog, evidence_cache=cache)
+    fast.analyze_documents_fast(text_corpus)
+
+    assert cache.hits == len(text_corpus[::2])
+    assert statuses(fast) == statuses(full)
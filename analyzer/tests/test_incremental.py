@@ -0,0 +1,61 @@
+"""An incremental --added/--removed update against a full rerun of the same documents."""
+
+import json
+import os
+
+from analyzer_cli import load_state, run_assessment, run_incremental_assessment
+from otcc_document_analyzer import OTCCDocumentAnalyzer
+
+
+def quiet(event):
+    pass
+
+
+def comparable_results(output_dir):
+    """results.json without the timings that differ between runs."""
+    with open(os.path.join(output_dir, "results.json"), 'r', encoding='utf-8') as f:
+        results = json.load(f)
+    results.pop("metrics")
+    for document in results["documentExtraction"]:
+        document.pop("seconds")
+    return results
+
+
+def evidence_items(analyzer):
+    return {control_id: analyzer.get_evidence_items(control_id) for control_id in analyzer.controls}
+
+
+def test_incremental_update_matches_full_rerun(catalog, text_corpus, tmp_path):
+    kept, removed, added = text_corpus[:6], text_corpus[6:8], text_corpus[8:10]
+
+    first = OTCCDocumentAnalyzer(catalog=catalog, max_evidence=5)
+    run_assessment(first, kept + removed, str(tmp_path / "incremental"), quiet)
+
+    incremental = OTCCDocumentAnalyzer(catalog=catalog, max_evidence=5)
+    events = []
+    run_incremental_assessment(incremental, load_state(str(tmp_path / "incremental")),
+                               str(tmp_path / "incremental"), added, removed, events.append)
+    # Only the added documents were analyzed; the others come from the saved state
+    assert [event["document"] for event in events if "document" in event] == [os.path.basename(path) for path in added]
+    assert [doc_info["file_path"] for doc_info in incremental.analyzed_documents] == kept + added
+
+    full = OTCCDocumentAnalyzer(catalog=catalog, max_evidence=5)
+    run_assessment(full, kept + added, str(tmp_path / "full"), quiet)
+
+    assert incremental.assessment_results == full.assessment_results
+    assert evidence_items(incremental) == evidence_items(full)
+    assert comparable_results(str(tmp_path / "incremental")) == comparable_results(str(tmp_path / "full"))
+
+
+def test_readding_a_document_replaces_it(catalog, text_corpus, tmp_path):
+    documents = text_corpus[:4]
+    output_dir = str(tmp_path / "out")
+    run_assessment(OTCCDocumentAnalyzer(catalog=catalog), documents, output_dir, quiet)
+
+    incremental = OTCCDocumentAnalyzer(catalog=catalog)
+    run_incremental_assessment(incremental, load_state(output_dir), output_dir, documents[1:2], [], quiet)
+    full = OTCCDocumentAnalyzer(catalog=catalog)
+    run_assessment(full, documents[:1] + documents[2:] + documents[1:2], str(tmp_path / "full"), quiet)
+
+    assert incremental.assessment_results == full.assessment_results
+    assert evidence_items(incremental) == evidence_items(full)
@@ -0,0 +1,52 @@
+import random
+import re
+
+from keyword_matcher import KeywordMatcher
+
+
+def finditer_per_keyword(keywords, text):
+    """The matches of a separate case-insensitive re.finditer per keyword."""
+    hits = {}
+    for keyword in dict.fromkeys(keywords):
+        matches = [match.span() for match in re.finditer(re.escape(keyword), text, re.IGNORECASE)]
+        if matches:
+            hits[keyword] = matches
+    return hits
+
+
+def random_text(rng, pieces, words):
+    parts = []
+    for _ in range(words):
+        piece = rng.choice(pieces)
+        if rng.random() < 0.2:
+            piece = piece.upper()
+        parts.append(piece)
+    # Glue some words together so keywords also start and end mid-word
+    return "".join(part + rng.choice([" ", " ", "\n", "", "-"]) for part in parts)
+
+
+def test_catalog_keywords_match_like_finditer(catalog):
+    keywords = [keyword for control_info in catalog.controls.values() for keyword in control_info["keywords"]]
+    matcher = KeywordMatcher(keywords)
+    rng = random.Random(7)
+    pieces = keywords + ["the", "plant", "policy", "review", "backup", "access"]
+    for _ in range(50):
+        text = random_text(rng, pieces, rng.randint(0, 200))
+        assert dict(matcher.find_all(text)) == finditer_per_keyword(keywords, text)
+
+
+def test_overlapping_and_repeated_keywords():
+    keywords = ["backup", "backup procedure", "procedure", "aa", "aaa", "AA", "a.b", "a+b"]
+    matcher = KeywordMatcher(keywords)
+    rng = random.Random(11)
+    for _ in range(200):
+        text = random_text(rng, ["a", "aa", "b", ".", "+", "backup", "procedure", "Backup Procedure"],
+                           rng.randint(0, 40))
+        assert dict(matcher.find_all(text)) == finditer_per_keyword(keywords, text)
+
+
+def test_non_ascii_case_folding():
+    keywords = ["straße", "STRASSE", "café", "ÉTÉ"]
+    matcher = KeywordMatcher(keywords)
+    text = "Straße and STRAßE, Café, été and ÉTÉ; strasse"
+    assert dict(matcher.find_all(text)) == finditer_per_keyword(keywords, text)
@@ -0,0 +1,68 @@
+"""Scanning text files in place against decoding and streaming them."""
+
+import random
+
+import pytest
+
+from keyword_matcher import KeywordMatcher, StreamingKeywordScanner
+from mapped_text import MAPPABLE_ENCODINGS, MappedTextScanner, detect_text_encoding
+from otcc_document_analyzer import OTCCDocumentAnalyzer
+
+CONTEXT_CHARS = 150
+
+
+def write_document(path, rng, keywords, encoding, line_break, extra_chars, words=3000):
+    pieces = keywords + ["plant", "operator", "shift", "review"] + extra_chars
+    text = " ".join(rng.choice(pieces) + (line_break if rng.random() < 0.1 else "") for _ in range(words))
+    data = text.encode("utf-8" if encoding == "utf-8-sig" else encoding)
+    if encoding == "utf-8-sig":
+        data = b"\xef\xbb\xbf" + data
+    path.write_bytes(data)
+
+
+def streamed_hits(matcher, path):
+    encoding = detect_text_encoding(str(path))
+    scanner = StreamingKeywordScanner(matcher, CONTEXT_CHARS, min_scan_chars=1000)
+    hits = []
+    with open(path, 'r', encoding=encoding, errors='replace') as file:
+        for block in iter(lambda: file.read(777), ""):
+            hits.extend(scanner.feed(block))
+    hits.extend(scanner.finish())
+    return hits, scanner.total_chars
+
+
+@pytest.mark.parametrize("encoding, extra_chars", [
+    ("utf-8", []),
+    ("utf-8", ["café", "naïve", "—", "€", "😀"]),
+    ("utf-8-sig", ["café", "😀"]),
+    ("cp1252", ["café", "€", "—"]),
+])
+@pytest.mark.parametrize("line_break", ["\n", "\r\n", "\r"])
+@pytest.mark.parametrize("block_bytes", [101, 4096])
+def test_mapped_scan_matches_streaming_scan(catalog, tmp_path, encoding, extra_chars, line_break, block_bytes):
+    keywords = sorted({keyword for control_info in catalog.controls.values() for keyword in control_info["keywords"]})
+    matcher = KeywordMatcher(keywords)
+    path = tmp_path / "evidence.txt"
+    write_document(path, random.Random(3), keywords, encoding, line_break, extra_chars)
+    assert detect_text_encoding(str(path)) == encoding
+    assert encoding in MAPPABLE_ENCODINGS
+
+    scanner = MappedTextScanner(matcher, CONTEXT_CHARS, block_bytes)
+    mapped = [hit for hits in scanner.iter_hits(str(path), encoding) for hit in hits]
+    streamed, total_chars = streamed_hits(matcher, path)
+
+    assert mapped == streamed
+    assert scanner.total_chars == total_chars
+
+
+def test_mapped_documents_give_the_same_evidence(catalog, text_corpus, monkeypatch):
+    mapped = OTCCDocumentAnalyzer(catalog=catalog)
+    mapped.analyze_documents(text_corpus)
+
+    streamed = OTCCDocumentAnalyzer(catalog=catalog)
+    monkeypatch.setattr(streamed, "_mapped_text_encoding", lambda *args: None)
+    streamed.analyze_documents(text_corpus)
+
+    assert mapped.generate_assessment() == streamed.generate_assessment()
+    for control_id in catalog.controls:
+        assert mapped.get_evidence_items(control_id) == streamed.get_evidence_items(control_id)
@@ -0,0 +1,39 @@
+"""Text segments the NLP pipeline processes."""
+
+import pytest
+
+from otcc_document_analyzer import NLP_SEGMENT_CHARS, OTCCDocumentAnalyzer
+
+spacy = pytest.importorskip("spacy")
+from spacy.language import Language  # noqa: E402
+
+segment_lengths = []
+
+
+@Language.component("record_segment_length")
+def record_segment_length(doc):
+    segment_lengths.append(len(doc.text))
+    return doc
+
+
+def test_long_documents_are_processed_in_bounded_segments(catalog, text_corpus, tmp_path):
+    path = tmp_path / "long_policy.txt"
+    with open(text_corpus[0], 'r', encoding='utf-8') as f:
+        sample = f.read()
+    text = sample * (3 * NLP_SEGMENT_CHARS // len(sample) + 1) + "x" * (2 * NLP_SEGMENT_CHARS)
+    path.write_text(text, encoding="utf-8")
+
+    nlp = spacy.blank("en")
+    nlp.add_pipe("record_segment_length")
+    segment_lengths.clear()
+    analyzer = OTCCDocumentAnalyzer(nlp=nlp, catalog=catalog, nlp_mode="tokenize")
+    analyzer.analyze_document(str(path))
+
+    assert sum(segment_lengths) == len(text)
+    assert len(segment_lengths) > 4
+    assert max(segment_lengths) <= NLP_SEGMENT_CHARS
+
+    # The evidence does not depend on the NLP mode
+    keyword_only = OTCCDocumentAnalyzer(catalog=catalog)
+    keyword_only.analyze_document(str(path))
+    assert analyzer.generate_assessment() == keyword_only.generate_assessment()
@@ -0,0 +1,79 @@
+"""
+Control scores against the scoring of the original analyzer, which kept a
+dict per keyword match and scored each one with string searches.
+"""
+
+import os
+import re
+
+import pytest
+
+from otcc_document_analyzer import OTCCDocumentAnalyzer
+
+POLICY_INDICATORS = ["shall", "must", "required", "policy", "procedure", "standard"]
+
+
+def baseline_confidence(keyword, context, control_info):
+    confidence = 0.5
+    additional_keywords = sum(1 for kw in control_info["keywords"]
+                              if kw != keyword and kw.lower() in context.lower())
+    confidence += additional_keywords * 0.1
+    evidence_terms = sum(1 for term in control_info["required_evidence"] if term.lower() in context.lower())
+    confidence += evidence_terms * 0.1
+    if any(indicator in context.lower() for indicator in POLICY_INDICATORS):
+        confidence += 0.1
+    return min(0.95, confidence)
+
+
+def baseline_results(analyzer, paths):
+    """Evidence strength, status and evidence count per control, scored the original way."""
+    evidence = {control_id: [] for control_id in analyzer.controls}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as file:
+            text = file.read()
+        document_type = analyzer._guess_document_type(os.path.basename(path))
+        for control_id, control_info in analyzer.controls.items():
+            for keyword in control_info["keywords"]:
+                for match in re.finditer(re.escape(keyword), text, re.IGNORECASE):
+                    context = text[max(0, match.start() - 150):min(len(text), match.end() + 150)]
+                    evidence[control_id].append({
+                        "document_type": document_type,
+                        "context": context.replace("\n", " ").strip(),
+                        "confidence": baseline_confidence(keyword, context, control_info)
+                    })
+
+    results = {}
+    for control_id, control_info in analyzer.controls.items():
+        items = evidence[control_id]
+        if not items:
+            results[control_id] = ("Non-compliant", 0.9, 0, 0)
+            continue
+        avg_confidence = sum(item["confidence"] for item in items) / len(items)
+        doc_types = set(item["document_type"] for item in items if item["document_type"] != "unknown")
+        required = control_info["required_evidence"]
+        required_count = sum(1 for req in required if any(req.lower() in item["context"].lower() for item in items))
+        strength = avg_confidence * 0.4 + min(1.0, len(doc_types) / 3) * 0.3 + required_count / len(required) * 0.3
+        if strength >= 0.7:
+            status, confidence = "Compliant", min(0.9, strength)
+        elif strength >= 0.3:
+            status, confidence = "Partial", 0.7
+        else:
+            status, confidence = "Non-compliant", 0.8
+        results[control_id] = (status, confidence, strength, len(items))
+    return results
+
+
+@pytest.mark.parametrize("documents", [slice(0, 1), slice(0, 5), slice(None)])
+def test_scores_match_baseline(catalog, text_corpus, documents):
+    paths = text_corpus[documents]
+    analyzer = OTCCDocumentAnalyzer(catalog=catalog)
+    analyzer.analyze_documents(paths)
+    results = analyzer.generate_assessment()
+
+    expected = baseline_results(analyzer, paths)
+    for control_id, (status, confidence, strength, count) in expected.items():
+        result = results[control_id]
+        assert result["status"] == status, control_id
+        assert result["evidence_count"] == count, control_id
+        assert result["evidence_strength"] == pytest.approx(strength, rel=1e-12, abs=1e-12), control_id
+        assert result["confidence"] == pytest.approx(confidence, rel=1e-12), control_id
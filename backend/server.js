@@ -215,10 +215,29 @@ app.get('/api/assessment/:id/status', (req, res) => {
     status: assessment.status,
     progress: assessment.progress,
     startedAt: assessment.startedAt,
-    completedAt: assessment.completedAt
+    completedAt: assessment.completedAt,
+    analyzerQueue: analyzerWorker.queue
   });
 });
 
+app.post('/api/assessment/:id/cancel', (req, res) => {
+  const assessment = db.assessments.find(a => a.id === req.params.id);
+  
+  if (!assessment) {
+    return res.status(404).json({ error: 'Assessment not found' });
+  }
+  
+  if (!['queued', 'processing'].includes(assessment.status)) {
+    return res.status(400).json({ error: `Assessment is already ${assessment.status}` });
+  }
+  
+  assessment.status = 'cancelled';
+  assessment.completedAt = new Date();
+  cancelAnalyzerJob(assessment.id);
+  
+  res.json({ id: assessment.id, status: assessment.status });
+});
+
 app.get('/api/assessment/:id/results', (req, res) => {
   const assessment = db.assessments.find(a => a.id === req.params.id);
   
@@ -319,6 +338,11 @@ function processAssessment(assessment) {
       console.log(`Assessment ${assessment.id} completed successfully with real analysis`);
     })
     .catch(error => {
+      if (assessment.status === 'cancelled') {
+        console.log(`Assessment ${assessment.id} was cancelled`);
+        return;
+      }
+      
       console.error(`Assessment analysis failed: ${error}`);
       // Fallback to sample results in case of error
       const results = generateSampleResults();
@@ -333,7 +357,7 @@ function processAssessment(assessment) {
 
 function updateAssessmentProgress(assessmentId, progress, status) {
   const assessment = db.assessments.find(a => a.id === assessmentId);
-  if (assessment) {
+  if (assessment && assessment.status !== 'cancelled') {
     assessment.progress = progress;
     assessment.status = progress >= 100 ? 'completed' : 'processing';
     
@@ -342,81 +366,238 @@ function updateAssessmentProgress(assessmentId, progress, status) {
   }
 }
 
+// Long-lived Python analyzer worker shared by all assessments. The model and
+// control catalog are loaded once; jobs are sent as JSON lines on stdin and
+// progress comes back as JSON lines tagged with the job ID. The worker runs a
+// bounded number of jobs and queues a bounded number more; jobs it rejects
+// because its queue is full are retried after a delay instead of piling up.
+const analyzerWorker = {
+  process: null,
+  buffer: '',
+  jobs: new Map(),
+  // Latest queue depth and wait times reported by the worker
+  queue: null
+};
+
+const ANALYZER_RETRY_MS = parseInt(process.env.ANALYZER_RETRY_MS || '5000', 10);
+const ANALYZER_MAX_RETRIES = parseInt(process.env.ANALYZER_MAX_RETRIES || '12', 10);
+
+function getAnalyzerWorker() {
+  if (analyzerWorker.process) {
+    return analyzerWorker.process;
+  }
+
+  // Determine the Python executable (python3 on Unix, python on Windows)
+  const pythonExe = process.platform === 'win32' ? 'python' : 'python3';
+
+  // Path to the analyzer script (adjust the path as needed)
+  const analyzerScript = path.join(__dirname, '../analyzer/analyzer_cli.py');
+  const maxJobs = process.env.ANALYZER_MAX_JOBS || '2';
+  const maxQueued = process.env.ANALYZER_MAX_QUEUED || '8';
+  const workers = process.env.ANALYZER_WORKERS || '1';
+
+  console.log(`Starting analyzer worker: ${pythonExe} ${analyzerScript} --serve`);
+
+  const analyzerArgs = [
+    analyzerScript,
+    '--serve',
+    '--max-jobs', maxJobs,
+    '--max-queued', maxQueued,
+    '--workers', workers
+  ];
+
+  // Control catalog (and sector overlay) to assess against
+  if (process.env.ANALYZER_CATALOG) {
+    analyzerArgs.push('--catalog', process.env.ANALYZER_CATALOG);
+  }
+  if (process.env.ANALYZER_SECTOR) {
+    analyzerArgs.push('--sector', process.env.ANALYZER_SECTOR);
+  }
+
+  // Also write control results and evidence as ndjson or parquet tables
+  if (process.env.ANALYZER_EXPORT_FORMAT) {
+    analyzerArgs.push('--export-format', process.env.ANALYZER_EXPORT_FORMAT);
+  }
+
+  // Seconds a PDF or Word document may take to extract
+  if (process.env.ANALYZER_EXTRACT_TIMEOUT) {
+    analyzerArgs.push('--extract-timeout', process.env.ANALYZER_EXTRACT_TIMEOUT);
+  }
+
+  // Reuse extracted text and evidence of documents uploaded to earlier assessments
+  if (process.env.ANALYZER_CACHE_DIR) {
+    analyzerArgs.push('--cache-dir', process.env.ANALYZER_CACHE_DIR);
+  }
+
+  // Report stage and per-document timings on the progress stream
+  if (process.env.ANALYZER_EMIT_METRICS === '1') {
+    analyzerArgs.push('--emit-metrics');
+  }
+
+  const worker = spawn(pythonExe, analyzerArgs);
+  analyzerWorker.process = worker;
+  analyzerWorker.buffer = '';
+
+  worker.stdout.on('data', (data) => {
+    analyzerWorker.buffer += data.toString();
+
+    // Handle complete lines only; keep any partial line for the next chunk
+    const lines = analyzerWorker.buffer.split('\n');
+    analyzerWorker.buffer = lines.pop();
+    lines.forEach(handleAnalyzerMessage);
+  });
+
+  worker.stderr.on('data', (data) => {
+    console.error(`Python error: ${data}`);
+  });
+
+  worker.on('close', (code) => {
+    console.error(`Analyzer worker exited with code ${code}`);
+    analyzerWorker.process = null;
+
+    // Fail any jobs that were still running so they fall back to sample results
+    analyzerWorker.jobs.forEach(job => {
+      clearTimeout(job.retryTimer);
+      job.reject(`Analyzer worker exited with code ${code}`);
+    });
+    analyzerWorker.jobs.clear();
+    analyzerWorker.queue = null;
+  });
+
+  return worker;
+}
+
+function handleAnalyzerMessage(line) {
+  if (!line.trim()) {
+    return;
+  }
+
+  let message;
+  try {
+    message = JSON.parse(line);
+  } catch (e) {
+    // Not JSON data, just standard output
+    console.log(`Python output: ${line}`);
+    return;
+  }
+
+  if (message.queue) {
+    analyzerWorker.queue = message.queue;
+  }
+
+  const job = analyzerWorker.jobs.get(message.job_id);
+  if (!job) {
+    console.log(`Python output: ${line}`);
+    return;
+  }
+
+  if (message.status === 'Rejected') {
+    // The worker's queue is full: defer the job and submit it again later
+    if (job.retries >= ANALYZER_MAX_RETRIES) {
+      analyzerWorker.jobs.delete(message.job_id);
+      job.reject(`Analyzer is busy: ${message.error}`);
+      return;
+    }
+    job.retries += 1;
+    setAssessmentStatus(message.job_id, 'queued');
+    console.log(`Analyzer queue full, retrying ${message.job_id} in ${ANALYZER_RETRY_MS} ms`);
+    job.retryTimer = setTimeout(() => submitAnalyzerJob(message.job_id), ANALYZER_RETRY_MS);
+    return;
+  }
+
+  if (message.status === 'Queued' || message.status === 'Started') {
+    setAssessmentStatus(message.job_id, message.status === 'Queued' ? 'queued' : 'processing');
+    return;
+  }
+
+  if (message.error) {
+    analyzerWorker.jobs.delete(message.job_id);
+    job.reject(message.error);
+    return;
+  }
+
+  if (message.metric) {
+    console.log(`Analyzer metrics for ${message.job_id}: ${line}`);
+    return;
+  }
+
+  if (message.progress) {
+    updateAssessmentProgress(message.job_id, message.progress, message.status || 'Processing');
+  }
+
+  if (message.results_path) {
+    analyzerWorker.jobs.delete(message.job_id);
+
+    // Read results file
+    try {
+      const results = JSON.parse(fs.readFileSync(message.results_path, 'utf8'));
+      console.log(`Successfully read results from ${message.results_path}`);
+      job.resolve(results);
+    } catch (error) {
+      console.error(`Error reading results: ${error.message}`);
+      job.reject(`Error reading results: ${error.message}`);
+    }
+  }
+}
+
 function callDocumentAnalyzer(assessmentId, documentPaths, outputDir) {
   return new Promise((resolve, reject) => {
     console.log(`Calling Python analyzer for assessment ${assessmentId}`);
-    
-    // Format document paths for the Python script
-    const documentsJson = JSON.stringify(documentPaths);
-    
-    // Determine the Python executable (python3 on Unix, python on Windows)
-    const pythonExe = process.platform === 'win32' ? 'python' : 'python3';
-    
-    // Path to the analyzer script (adjust the path as needed)
-    const analyzerScript = path.join(__dirname, '../analyzer/analyzer_cli.py');
-    
-    console.log(`Running: ${pythonExe} ${analyzerScript}`);
-    console.log(`With documents: ${documentsJson.substring(0, 100)}...`);
-    
-    // Spawn the Python process
-    const python = spawn(pythonExe, [
-      analyzerScript,
-      '--assessment-id', assessmentId,
-      '--documents', documentsJson,
-      '--output-dir', outputDir
-    ]);
-    
-    // Collect output from the Python script
-    let dataString = '';
-    
-    python.stdout.on('data', (data) => {
-      dataString += data.toString();
-      console.log(`Python output: ${data}`);
-      
-      // Try to parse progress updates
-      try {
-        const progressData = JSON.parse(data.toString());
-        if (progressData.progress) {
-          updateAssessmentProgress(
-            assessmentId, 
-            progressData.progress, 
-            progressData.status || 'Processing'
-          );
-        }
-      } catch (e) {
-        // Not JSON data, just standard output
-      }
-    });
-    
-    python.stderr.on('data', (data) => {
-      console.error(`Python error: ${data}`);
-    });
-    
-    python.on('close', (code) => {
-      if (code !== 0) {
-        console.error(`Python process exited with code ${code}`);
-        reject(`Process exited with code ${code}`);
-        return;
-      }
-      
-      // Read results file
-      try {
-        const resultsPath = path.join(outputDir, 'results.json');
-        if (fs.existsSync(resultsPath)) {
-          const results = JSON.parse(fs.readFileSync(resultsPath, 'utf8'));
-          console.log(`Successfully read results from ${resultsPath}`);
-          resolve(results);
-        } else {
-          reject(`Results file not found at ${resultsPath}`);
-        }
-      } catch (error) {
-        console.error(`Error reading results: ${error.message}`);
-        reject(`Error reading results: ${error.message}`);
-      }
+    console.log(`With documents: ${JSON.stringify(documentPaths).substring(0, 100)}...`);
+
+    analyzerWorker.jobs.set(assessmentId, {
+      resolve,
+      reject,
+      request: {
+        job_id: assessmentId,
+        assessment_id: assessmentId,
+        documents: documentPaths,
+        output_dir: path.resolve(outputDir),
+        // Stop scanning for controls once their status is settled
+        fast: process.env.ANALYZER_FAST === '1'
+      },
+      retries: 0,
+      retryTimer: null
     });
+    submitAnalyzerJob(assessmentId);
   });
 }
 
+function submitAnalyzerJob(jobId) {
+  const job = analyzerWorker.jobs.get(jobId);
+  if (!job) {
+    return;
+  }
+
+  job.retryTimer = null;
+  getAnalyzerWorker().stdin.write(JSON.stringify(job.request) + '\n');
+}
+
+function cancelAnalyzerJob(jobId) {
+  const job = analyzerWorker.jobs.get(jobId);
+  if (!job) {
+    return;
+  }
+
+  if (job.retryTimer) {
+    // Deferred and not submitted again yet: nothing to cancel in the worker
+    clearTimeout(job.retryTimer);
+    analyzerWorker.jobs.delete(jobId);
+    job.reject('Assessment was cancelled');
+    return;
+  }
+
+  // The worker answers with a "Cancelled" error event once the job has stopped
+  getAnalyzerWorker().stdin.write(JSON.stringify({ command: 'cancel', job_id: jobId }) + '\n');
+}
+
+function setAssessmentStatus(assessmentId, status) {
+  const assessment = db.assessments.find(a => a.id === assessmentId);
+  if (assessment && assessment.status !== 'cancelled') {
+    assessment.status = status;
+  }
+}
+
 // Fallback sample results in case the analyzer fails
 function generateSampleResults() {
   const overallScore = Math.floor(Math.random() * 20) + 40;